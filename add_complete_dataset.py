@@ -10,6 +10,9 @@ sys.path.append(str(BASE_DIR))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'new_valley_hub.settings')
 django.setup()
 
+from django.db import transaction
+
+from core.signals import bulk_changed
 from tourism.models import Attraction
 from hospitality.models import Hotel
 from services.models import Service, ServiceCategory
@@ -223,86 +226,100 @@ def process_all_items():
         "new_innovation": 0
     }
 
-    # Get or create service categories
-    restaurant_cat, _ = ServiceCategory.objects.get_or_create(
-        name="Restaurant", 
-        defaults={"slug": "restaurant"}
-    )
-    pharmacy_cat, _ = ServiceCategory.objects.get_or_create(
-        name="Pharmacy", 
-        defaults={"slug": "pharmacy"}
-    )
-    innovation_cat, _ = ServiceCategory.objects.get_or_create(
-        name="Innovation Hub", 
-        defaults={"slug": "innovation-hub"}
-    )
+    with transaction.atomic():
+        # Get or create service categories
+        restaurant_cat, _ = ServiceCategory.objects.get_or_create(
+            name="Restaurant",
+            defaults={"slug": "restaurant"}
+        )
+        pharmacy_cat, _ = ServiceCategory.objects.get_or_create(
+            name="Pharmacy",
+            defaults={"slug": "pharmacy"}
+        )
+        innovation_cat, _ = ServiceCategory.objects.get_or_create(
+            name="Innovation Hub",
+            defaults={"slug": "innovation-hub"}
+        )
+
+        # Existing names are read once instead of one exists() query per item
+        names = {
+            model: [name.lower() for name in model.objects.values_list('name', flat=True)]
+            for model in (Service, Hotel, Attraction, Product)
+        }
+        new_rows = {model: [] for model in names}
+
+        def is_new(model, name, exact=True):
+            if exact:
+                return name.lower() not in names[model]
+            # Same loose rule as before: no existing name contains the first word
+            word = name.split()[0].lower()
+            return not any(word in existing for existing in names[model])
+
+        def add(model, stat, label, **fields):
+            row = model(**fields)
+            if hasattr(row, 'refresh_geohash'):
+                row.refresh_geohash()
+            new_rows[model].append(row)
+            names[model].append(fields["name"].lower())
+            stats[stat] += 1
+            print(f"✓ NEW {label}: {fields['name']}")
 
-    for item in COMPLETE_DATASET:
-        category = item.get("category", "")
-        sub_category = item.get("sub_category", "")
-        name_en = item.get("name_en", "")
-        description = item.get("description", "")
-        location = item.get("location", "New Valley, Egypt")
-        address = item.get("address", location)
+        for item in COMPLETE_DATASET:
+            category = item.get("category", "")
+            sub_category = item.get("sub_category", "")
+            name_en = item.get("name_en", "")
+            description = item.get("description", "")
+            location = item.get("location", "New Valley, Egypt")
+            address = item.get("address", location)
 
-        try:
             # RESTAURANTS
             if category == "Dining":
-                if not Service.objects.filter(name=name_en).exists():
-                    Service.objects.create(
+                if is_new(Service, name_en):
+                    add(Service, "new_restaurants", "Restaurant",
                         name=name_en,
                         description=description,
                         category=restaurant_cat,
                         phone_number="+20 92 XXX XXXX",
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=address
-                    )
-                    stats["new_restaurants"] += 1
-                    print(f"✓ NEW Restaurant: {name_en}")
+                        latitude=Decimal("25.4400"),
+                        longitude=Decimal("30.5500"),
+                        address=address)
 
             # PHARMACIES
             elif sub_category == "Pharmacies":
-                if not Service.objects.filter(name=name_en).exists():
-                    Service.objects.create(
+                if is_new(Service, name_en):
+                    add(Service, "new_pharmacies", "Pharmacy",
                         name=name_en,
                         description=description or "Pharmacy services",
                         category=pharmacy_cat,
                         phone_number="+20 92 XXX XXXX",
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=address
-                    )
-                    stats["new_pharmacies"] += 1
-                    print(f"✓ NEW Pharmacy: {name_en}")
+                        latitude=Decimal("25.4400"),
+                        longitude=Decimal("30.5500"),
+                        address=address)
 
             # HOTELS
             elif category == "Accommodation":
-                if not Hotel.objects.filter(name__icontains=name_en.split()[0]).exists():
+                if is_new(Hotel, name_en, exact=False):
                     rating_str = item.get("rating", "3 Stars")
                     try:
                         stars = int(rating_str.split()[0]) if rating_str else 3
-                    except:
+                    except (IndexError, ValueError):
                         stars = 3
 
-                    Hotel.objects.create(
+                    add(Hotel, "new_hotels", "Hotel",
                         name=name_en,
                         description=description or f"Hotel in {location}",
                         stars=stars,
                         price_range="$$" if stars >= 3 else "$",
                         phone_number=item.get("contact", "+20 92 XXX XXXX"),
                         booking_url="https://www.booking.com/searchresults.html?ss=New+Valley+Egypt",
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=location
-                    )
-                    stats["new_hotels"] += 1
-                    print(f"✓ NEW Hotel: {name_en}")
+                        latitude=Decimal("25.4400"),
+                        longitude=Decimal("30.5500"),
+                        address=location)
 
             # ATTRACTIONS
             elif category in ["Culture & Museums", "Historical & Heritage"]:
-                if not Attraction.objects.filter(name__icontains=name_en.split()[0]).exists():
-                    Attraction.objects.create(
+                if is_new(Attraction, name_en, exact=False):
+                    add(Attraction, "new_attractions", "Attraction",
                         name=name_en,
                         description=description,
                         attraction_type="cultural" if "Culture" in category else "historical",
@@ -310,43 +327,37 @@ def process_all_items():
                         opening_time="09:00",
                         closing_time="17:00",
                         ticket_price=Decimal("0.00"),
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=location
-                    )
-                    stats["new_attractions"] += 1
-                    print(f"✓ NEW Attraction: {name_en}")
+                        latitude=Decimal("25.4400"),
+                        longitude=Decimal("30.5500"),
+                        address=location)
 
             # INNOVATION HUBS
             elif category == "Innovation & Education":
-                if not Service.objects.filter(name=name_en).exists():
-                    Service.objects.create(
+                if is_new(Service, name_en):
+                    add(Service, "new_innovation", "Innovation Hub",
                         name=name_en,
                         description=description,
                         category=innovation_cat,
                         phone_number="+20 100 XXX XXXX",
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=address
-                    )
-                    stats["new_innovation"] += 1
-                    print(f"✓ NEW Innovation Hub: {name_en}")
+                        latitude=Decimal("25.4400"),
+                        longitude=Decimal("30.5500"),
+                        address=address)
 
             # LOCAL PRODUCTS
             elif category == "Local Industry":
-                if not Product.objects.filter(name__icontains=name_en.split()[0]).exists():
-                    Product.objects.create(
+                if is_new(Product, name_en, exact=False):
+                    add(Product, "new_products", "Product",
                         name=name_en,
                         description=description,
                         price=Decimal("20.00"),
                         seller_name="New Valley Crafts",
-                        seller_contact="+20 100 XXX XXXX"
-                    )
-                    stats["new_products"] += 1
-                    print(f"✓ NEW Product: {name_en}")
+                        seller_contact="+20 100 XXX XXXX")
 
-        except Exception as e:
-            print(f"✗ ERROR: {name_en} - {e}")
+        # One INSERT per model; bulk_changed brings the derived indexes up to date
+        for model, rows in new_rows.items():
+            if rows:
+                created = model.objects.bulk_create(rows)
+                bulk_changed.send(sender=model, pks=[row.pk for row in created])
 
     return stats
 
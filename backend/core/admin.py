@@ -1,3 +1,19 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ImageStatus, POIIndex
+
+
+@admin.register(ImageStatus)
+class ImageStatusAdmin(admin.ModelAdmin):
+    list_display = ('doc_type', 'object_id', 'ok', 'status_code', 'width', 'height', 'size_bytes', 'checked_at')
+    list_filter = ('ok', 'doc_type', 'status_code')
+    search_fields = ('url', 'error')
+    readonly_fields = [field.name for field in ImageStatus._meta.fields]
+
+
+@admin.register(POIIndex)
+class POIIndexAdmin(admin.ModelAdmin):
+    list_display = ('name', 'poi_type', 'object_id', 'category', 'latitude', 'longitude', 'updated_at')
+    list_filter = ('poi_type',)
+    search_fields = ('name', 'category')
+    readonly_fields = [field.name for field in POIIndex._meta.fields]
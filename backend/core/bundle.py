@@ -0,0 +1,177 @@
+"""
+Offline data bundle for the PWA.
+
+One part per app (tourism, hospitality, services, marketplace), each a
+columnar JSON document: ``{"attraction": {"count": 2, "columns": {"id":
+[1, 2], "name": [...]}}}``. Parts are named after a hash of their content
+(``tourism.3f2a9c1d04be.json``) next to ``.gz`` and, when the brotli
+package is installed, ``.br`` siblings for servers that serve
+precompressed files (nginx gzip_static/brotli_static). Hashed names never
+change content, so they can be cached forever; only ``manifest.json``
+must be revalidated.
+
+A part is rebuilt only when its app's fingerprint (row count, max id and
+max updated_at per model) differs from the one in the manifest.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz files are written without it
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+
+_POI_FIELDS = ('id', 'name', 'description', 'image', 'latitude', 'longitude', 'address')
+BUNDLE_PARTS = {
+    'tourism': {
+        'attraction': ('tourism.Attraction', _POI_FIELDS + (
+            'attraction_type', 'visit_duration_minutes', 'opening_time', 'closing_time', 'ticket_price',
+        )),
+    },
+    'hospitality': {
+        'hotel': ('hospitality.Hotel', _POI_FIELDS + (
+            'stars', 'price_range', 'booking_url', 'google_map_url',
+        )),
+    },
+    'services': {
+        'category': ('services.ServiceCategory', (
+            'id', 'name', 'slug', 'parent_id', 'order', 'description', 'service_count', 'total_services',
+        )),
+        'service': ('services.Service', _POI_FIELDS + (
+            'category_id', 'phone_number', 'website', 'email', 'is_emergency', 'is_24_hours',
+            'opening_time', 'closing_time',
+        )),
+    },
+    'marketplace': {
+        'product': ('marketplace.Product', (
+            'id', 'name', 'description', 'price', 'image', 'seller_name', 'seller_contact',
+        )),
+    },
+}
+
+
+def bundle_dir():
+    return getattr(settings, 'OFFLINE_BUNDLE_DIR', os.path.join(settings.MEDIA_ROOT, 'offline'))
+
+
+def _compact(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def fingerprint(app_label):
+    """Cheap change detector for one part: aggregates only, no rows."""
+    parts = []
+    for doc_type, (model_label, _) in sorted(BUNDLE_PARTS[app_label].items()):
+        summary = apps.get_model(model_label).objects.order_by().aggregate(
+            count=Count('pk'), last_id=Max('pk'), last_update=Max('updated_at'),
+        )
+        last_update = summary['last_update'].isoformat() if summary['last_update'] else ''
+        parts.append(f"{doc_type}:{summary['count']}:{summary['last_id']}:{last_update}")
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:HASH_LENGTH]
+
+
+def build_part(app_label):
+    """Columnar document for one app as compact UTF-8 JSON bytes, plus row counts."""
+    document = {}
+    for doc_type, (model_label, fields) in BUNDLE_PARTS[app_label].items():
+        columns = {field: [] for field in fields}
+        rows = apps.get_model(model_label).objects.order_by('pk').values_list(*fields)
+        for row in rows.iterator(chunk_size=2000):
+            for field, value in zip(fields, row):
+                columns[field].append(_compact(value))
+        document[doc_type] = {"count": len(columns['id']), "columns": columns}
+    payload = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode()
+    return payload, {doc_type: part["count"] for doc_type, part in document.items()}
+
+
+def _write(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_part(directory, app_label, payload):
+    """Write the part and its compressed siblings; returns its manifest entry."""
+    digest = hashlib.sha256(payload).hexdigest()
+    name = f'{app_label}.{digest[:HASH_LENGTH]}.json'
+    entry = {"file": name, "sha256": digest, "bytes": len(payload)}
+    _write(os.path.join(directory, name), payload)
+    # mtime=0 keeps the .gz byte-identical across rebuilds of the same data
+    gzipped = gzip.compress(payload, compresslevel=9, mtime=0)
+    _write(os.path.join(directory, name + '.gz'), gzipped)
+    entry["gzip_bytes"] = len(gzipped)
+    if brotli is not None:
+        compressed = brotli.compress(payload, quality=11)
+        _write(os.path.join(directory, name + '.br'), compressed)
+        entry["brotli_bytes"] = len(compressed)
+    return entry
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"version": 0, "parts": {}}
+
+
+def build_bundle(app_labels=None, force=False):
+    """
+    Rebuild the parts whose data changed (or ``app_labels`` with ``force``)
+    and rewrite the manifest. Returns (manifest, rebuilt app labels).
+    """
+    directory = bundle_dir()
+    os.makedirs(directory, exist_ok=True)
+    manifest = read_manifest(directory)
+    parts = dict(manifest.get("parts", {}))
+    rebuilt = []
+    for app_label in app_labels or BUNDLE_PARTS:
+        current = fingerprint(app_label)
+        previous = parts.get(app_label)
+        if not force and previous and previous.get("fingerprint") == current \
+                and os.path.exists(os.path.join(directory, previous["file"])):
+            continue
+        payload, counts = build_part(app_label)
+        entry = write_part(directory, app_label, payload)
+        entry["fingerprint"] = current
+        entry["counts"] = counts
+        parts[app_label] = entry
+        rebuilt.append(app_label)
+
+    if rebuilt or not os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+        manifest = {
+            "version": manifest.get("version", 0) + 1,
+            "generated_at": timezone.now().isoformat(),
+            "parts": parts,
+        }
+        _write(os.path.join(directory, MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+        _remove_stale(directory, {entry["file"] for entry in parts.values()})
+    return manifest, rebuilt
+
+
+def _remove_stale(directory, keep):
+    for name in os.listdir(directory):
+        if name == MANIFEST_NAME:
+            continue
+        base = name.removesuffix('.gz').removesuffix('.br')
+        if base not in keep:
+            os.remove(os.path.join(directory, name))
@@ -0,0 +1,188 @@
+"""
+Response caching for read-heavy catalog endpoints.
+
+Serialized response data is stored in Django's cache under a key built
+from the absolute URL (path + query string) and a generation counter per
+app. Any post_save/post_delete in an app bumps its generation, which
+orphans every cached response depending on it; stale entries then age
+out through the cache's own eviction.
+
+In front of that, list and retrieve answer conditional GETs: a weak ETag
+is derived from Max(updated_at) + Count over the filtered queryset (plus
+the generations, which also catch related-model edits) without
+serializing anything, and a matching If-None-Match / If-Modified-Since
+gets a 304.
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+GENERATION_KEY = 'api-generation:{}'
+# Apps whose post_save/post_delete bump the generation (see core.signals)
+CACHED_APPS = ('tourism', 'hospitality', 'services', 'marketplace')
+
+
+def _fresh_generation():
+    # Seeded from the clock rather than 1: if a counter is evicted, restarting
+    # it must not revive responses cached under an old value
+    return time.time_ns()
+
+
+def get_generation(app_label):
+    key = GENERATION_KEY.format(app_label)
+    generation = cache.get(key)
+    if generation is None:
+        generation = _fresh_generation()
+        cache.add(key, generation, timeout=None)
+        generation = cache.get(key, generation)
+    return generation
+
+
+def generations():
+    return {app_label: get_generation(app_label) for app_label in CACHED_APPS}
+
+
+def bump_generation(app_label):
+    key = GENERATION_KEY.format(app_label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_generation(), timeout=None)
+
+
+class CacheStats:
+    """Process-local hit/miss counters per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def record(self, endpoint, hit):
+        with self._lock:
+            self._counts[endpoint]['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = {name: dict(c) for name, c in self._counts.items()}
+        for c in counts.values():
+            total = c['hits'] + c['misses']
+            c['hit_ratio'] = round(c['hits'] / total, 4) if total else 0.0
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+def cache_response(method):
+    """
+    Cache a GET viewset action's 200 response data. The view's
+    ``cache_apps`` (defaults to the queryset model's app) lists the apps
+    whose changes invalidate it.
+    """
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return method(self, request, *args, **kwargs)
+
+        apps = self.get_cache_apps()
+        generations = ':'.join(f'{app}{get_generation(app)}' for app in apps)
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f'api-response:{generations}:{url}'
+        endpoint = f'{self.basename}-{self.action}'.replace('_', '-')
+
+        data = cache.get(key)
+        if data is not None:
+            stats.record(endpoint, hit=True)
+            return Response(data)
+
+        stats.record(endpoint, hit=False)
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+    return wrapper
+
+
+def has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+class CachedResponseMixin:
+    """
+    Conditional GET plus response caching for list and retrieve; decorate
+    extra GET actions with cache_response.
+    """
+    cache_apps = None
+
+    def get_cache_apps(self):
+        if self.cache_apps is not None:
+            return self.cache_apps
+        return (self.queryset.model._meta.app_label,)
+
+    def get_validators(self, queryset, detail=False):
+        """
+        (etag, last_modified) for ``queryset`` as the current request would
+        render it. Last-Modified is only given for single objects: a list's
+        Max(updated_at) does not move when a row is deleted.
+        """
+        parts = [self.request.get_full_path(), self.request.accepted_renderer.format]
+        parts += [f'{app}{get_generation(app)}' for app in self.get_cache_apps()]
+        last_modified = None
+        if has_updated_at(queryset.model):
+            summary = queryset.order_by().aggregate(last=Max('updated_at'), count=Count('pk'))
+            parts += [summary['count'], summary['last'].isoformat() if summary['last'] else '']
+            if detail and summary['last']:
+                last_modified = int(summary['last'].timestamp())
+        etag = 'W/"%s"' % hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+        return etag, last_modified
+
+    def conditional(self, request, queryset, view, detail=False):
+        etag, last_modified = self.get_validators(queryset, detail)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = view()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(request, queryset, lambda: self._cached_list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup; let get_object() answer with its 404
+            return self._cached_retrieve(request, *args, **kwargs)
+        return self.conditional(
+            request, queryset, lambda: self._cached_retrieve(request, *args, **kwargs), detail=True,
+        )
+
+    @cache_response
+    def _cached_list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def _cached_retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,267 @@
+"""
+Synthetic catalog for load testing.
+
+``generate(scale)`` bulk-creates ``scale`` attractions and services,
+``scale / 4`` hotels, ``scale / 2`` products and a three-level service
+category tree that grows with the scale, scattered around the New Valley
+oasis towns. Rows are seeded, so the same scale and seed always produce
+the same catalog. Every description starts with FAKE_MARKER and every
+category slug with FAKE_SLUG_PREFIX, which is how ``clear()`` finds them.
+
+bulk_create skips save() and the per-row signals, so geohashes are set
+here and the category tree, map grid, POI index and search index are
+rebuilt once at the end. ``clear()`` deletes the same way: raw DELETEs,
+tombstones written in bulk, then one rebuild.
+"""
+import datetime
+import random
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models.functions import Now
+
+from hospitality.models import Hotel
+from marketplace.models import Product
+from services.models import Service, ServiceCategory
+from tourism.models import Attraction, DigitalArtifact
+from . import sync
+from .models import Tombstone
+from .seeding import rebuild_derived
+
+FAKE_MARKER = "[synthetic]"
+FAKE_SLUG_PREFIX = 'fake-'
+BATCH_SIZE = 2000
+
+# (town, latitude, longitude, share of the rows)
+TOWNS = [
+    ("Kharga", 25.4390, 30.5586, 0.35),
+    ("Mut", 25.4947, 28.9790, 0.25),
+    ("Farafra", 27.0583, 27.9703, 0.15),
+    ("Baris", 24.6700, 30.6000, 0.1),
+    ("Balat", 25.5630, 29.2660, 0.1),
+    ("Abu Minqar", 26.5000, 27.6500, 0.05),
+]
+# Rows fall this far (degrees, one standard deviation) from the town centre
+TOWN_SPREAD = 0.08
+# Attractions partly lie out in the desert, anywhere in the governorate
+DESERT_BOUNDS = (22.0, 28.5, 27.0, 31.5)
+
+CATEGORY_TREE = {
+    "Medical": ["Hospitals", "Clinics", "Pharmacies", "Laboratories"],
+    "Dining": ["Restaurants", "Cafes", "Bakeries", "Street Food"],
+    "Transport": ["Bus Stations", "Taxis", "Car Rental", "Fuel Stations"],
+    "Banking": ["Banks", "ATMs", "Exchange Offices", "Post Offices"],
+    "Government": ["Civil Registry", "Traffic Units", "Police Stations", "Municipal Offices"],
+    "Shopping": ["Markets", "Supermarkets", "Handicrafts", "Date Shops"],
+    "Education": ["Schools", "Institutes", "Libraries", "Training Centres"],
+    "Emergency": ["Ambulance Points", "Fire Stations", "Civil Defence", "Desert Rescue"],
+}
+EMERGENCY_ROOTS = {"Medical", "Emergency"}
+
+ATTRACTION_NOUNS = {
+    'historical': ["Temple", "Necropolis", "Fortress", "Tombs", "Monastery", "Old Town"],
+    'natural': ["Spring", "Dunes", "Rock Formations", "Oasis Lake", "Canyon", "Palm Grove"],
+    'cultural': ["Museum", "Cultural Palace", "Crafts Village", "Heritage House", "Gallery"],
+}
+HOTEL_NOUNS = ["Hotel", "Eco Lodge", "Camp", "Resort", "Guest House", "Inn"]
+PRODUCT_NOUNS = ["Dates", "Palm Basket", "Pottery Jar", "Embroidered Dress", "Olive Oil", "Carpet", "Hibiscus Tea"]
+ADJECTIVES = ["Ancient", "Golden", "Hidden", "Great", "White", "Blue", "Sunset", "Desert", "Royal", "Green"]
+PHRASES = [
+    "popular with visitors in winter",
+    "reachable by paved road",
+    "best visited early in the morning",
+    "run by a local family",
+    "close to the hot springs",
+    "with views over the palm groves",
+    "open throughout the year",
+]
+
+
+def catalog_sizes(scale):
+    """Rows per model for ``scale``."""
+    return {
+        'attraction': scale,
+        'hotel': max(1, scale // 4),
+        'service': scale,
+        'product': max(1, scale // 2),
+        'category': max(len(CATEGORY_TREE) * 5, scale // 100),
+    }
+
+
+def _point(rng, desert_share=0.0):
+    """(town, latitude, longitude) near one of TOWNS, or anywhere in DESERT_BOUNDS."""
+    if rng.random() < desert_share:
+        south, north, west, east = DESERT_BOUNDS
+        return ("New Valley Desert", *_coordinates(rng.uniform(south, north), rng.uniform(west, east)))
+    town, latitude, longitude, _ = rng.choices(TOWNS, weights=[t[3] for t in TOWNS])[0]
+    return (town, *_coordinates(rng.gauss(latitude, TOWN_SPREAD), rng.gauss(longitude, TOWN_SPREAD)))
+
+
+def _coordinates(latitude, longitude):
+    return Decimal(f"{latitude:.6f}"), Decimal(f"{longitude:.6f}")
+
+
+def _description(rng, subject, town):
+    return f"{FAKE_MARKER} {subject} in {town}, {rng.choice(PHRASES)}."
+
+
+def _image(rng, kind, i):
+    # A fifth of the rows have no image, like the hand-entered catalog
+    return f"https://picsum.photos/seed/nvh-{kind}-{i}/800/600" if rng.random() < 0.8 else ""
+
+
+def _attraction(rng, i):
+    attraction_type = rng.choice(list(ATTRACTION_NOUNS))
+    town, latitude, longitude = _point(rng, desert_share=0.3)
+    name = f"{rng.choice(ADJECTIVES)} {rng.choice(ATTRACTION_NOUNS[attraction_type])} {i}"
+    opening = rng.choice([6, 7, 8, 9])
+    return Attraction(
+        name=name, description=_description(rng, name, town), image=_image(rng, 'attraction', i),
+        latitude=latitude, longitude=longitude, address=f"{town}, New Valley",
+        attraction_type=attraction_type, visit_duration_minutes=rng.choice([30, 60, 90, 120, 180]),
+        opening_time=datetime.time(opening), closing_time=datetime.time(opening + rng.choice([8, 9, 10, 12])),
+        ticket_price=rng.choice([0, 0, 20, 40, 60, 100]),
+    )
+
+
+def _hotel(rng, i):
+    town, latitude, longitude = _point(rng)
+    name = f"{rng.choice(ADJECTIVES)} {town} {rng.choice(HOTEL_NOUNS)} {i}"
+    stars = rng.choice([1, 2, 3, 3, 3, 4, 4, 5])
+    return Hotel(
+        name=name, description=_description(rng, name, town), image=_image(rng, 'hotel', i),
+        latitude=latitude, longitude=longitude, address=f"{town}, New Valley", stars=stars,
+        price_range='$' if stars <= 2 else '$$' if stars <= 4 else '$$$',
+        booking_url=f"https://www.booking.com/hotel/eg/nvh-{i}.html", phone_number=f"092{rng.randrange(10**7):07d}",
+    )
+
+
+def _service(rng, i, category_id, category_name, emergency):
+    town, latitude, longitude = _point(rng)
+    name = f"{town} {category_name} {i}"
+    always_open = emergency or rng.random() < 0.1
+    return Service(
+        name=name, description=_description(rng, name, town), category_id=category_id,
+        phone_number=f"092{rng.randrange(10**7):07d}", address=f"{town}, New Valley",
+        latitude=latitude, longitude=longitude, is_emergency=emergency and rng.random() < 0.5,
+        is_24_hours=always_open, opening_time=None if always_open else datetime.time(9),
+        closing_time=None if always_open else datetime.time(rng.choice([15, 17, 22])), image=_image(rng, 'service', i),
+    )
+
+
+def _product(rng, i):
+    town, _, _ = _point(rng)
+    name = f"{rng.choice(ADJECTIVES)} {rng.choice(PRODUCT_NOUNS)} {i}"
+    return Product(
+        name=name, description=_description(rng, name, town), price=Decimal(rng.randrange(500, 250000)) / 100,
+        image=_image(rng, 'product', i) or None, seller_name=f"{town} Cooperative",
+        seller_contact=f"010{rng.randrange(10**8):08d}",
+    )
+
+
+def _bulk_create(model, rows):
+    """Insert ``rows`` (a generator) in batches; returns the number created."""
+    batch = []
+    created = 0
+    for row in rows:
+        if hasattr(row, 'refresh_geohash'):
+            row.refresh_geohash()
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            created += len(model.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        created += len(model.objects.bulk_create(batch))
+    return created
+
+
+def _create_categories(rng, total):
+    """
+    The CATEGORY_TREE roots and subcategories, plus generated categories
+    below the subcategories up to ``total``. Returns (id, name, emergency)
+    for every category without children, which is where services go.
+    """
+    roots = ServiceCategory.objects.bulk_create([
+        ServiceCategory(name=name, slug=f"{FAKE_SLUG_PREFIX}{order}", order=order,
+                        description=f"{FAKE_MARKER} {name} services")
+        for order, name in enumerate(CATEGORY_TREE)
+    ])
+    children = ServiceCategory.objects.bulk_create([
+        ServiceCategory(name=name, slug=f"{FAKE_SLUG_PREFIX}{root.order}-{order}", parent=root, order=order,
+                        description=f"{FAKE_MARKER} {name}")
+        for root in roots
+        for order, name in enumerate(CATEGORY_TREE[root.name])
+    ])
+    grandchildren = ServiceCategory.objects.bulk_create(
+        [
+            ServiceCategory(name=f"{rng.choice(ADJECTIVES)} {parent.name} {i}", slug=f"{FAKE_SLUG_PREFIX}leaf-{i}",
+                            parent=parent, order=i // len(children), description=f"{FAKE_MARKER} {parent.name}")
+            for i, parent in ((i, children[i % len(children)]) for i in range(total - len(roots) - len(children)))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    emergency = {c.pk for c in children if c.parent.name in EMERGENCY_ROOTS}
+    emergency.update(c.pk for c in grandchildren if c.parent_id in emergency)
+    parents = {c.parent_id for c in grandchildren}
+    return [(c.pk, c.name, c.pk in emergency) for c in children + grandchildren if c.pk not in parents]
+
+
+def generate(scale, seed=0):
+    """Create a synthetic catalog of ``scale`` (see catalog_sizes). Returns rows created per model."""
+    rng = random.Random(seed)
+    sizes = catalog_sizes(scale)
+    created = {}
+    with transaction.atomic():
+        leaves = _create_categories(rng, sizes['category'])
+        created['category'] = sizes['category']
+        created['attraction'] = _bulk_create(Attraction, (_attraction(rng, i) for i in range(sizes['attraction'])))
+        created['hotel'] = _bulk_create(Hotel, (_hotel(rng, i) for i in range(sizes['hotel'])))
+        created['service'] = _bulk_create(
+            Service, (_service(rng, i, *rng.choice(leaves)) for i in range(sizes['service'])),
+        )
+        created['product'] = _bulk_create(Product, (_product(rng, i) for i in range(sizes['product'])))
+        rebuild_derived()
+    return created
+
+
+def clear():
+    """
+    Delete every synthetic row. QuerySet.delete() would load each row and
+    send its post_delete signals (a map grid, POI index and search update
+    per row); the rows are deleted with raw DELETEs instead, doing by hand
+    what the ON DELETE rules and tombstone signal would, and the derived
+    data is rebuilt once. Returns rows deleted per model.
+    """
+    querysets = {
+        # Services under a synthetic category would go with it (CASCADE)
+        'service': Service.objects.filter(description__startswith=FAKE_MARKER)
+        | Service.objects.filter(category__slug__startswith=FAKE_SLUG_PREFIX),
+        'attraction': Attraction.objects.filter(description__startswith=FAKE_MARKER),
+        'hotel': Hotel.objects.filter(description__startswith=FAKE_MARKER),
+        'product': Product.objects.filter(description__startswith=FAKE_MARKER),
+        'category': ServiceCategory.objects.filter(slug__startswith=FAKE_SLUG_PREFIX),
+    }
+    deleted = {}
+    with transaction.atomic():
+        DigitalArtifact.objects.filter(related_attraction__in=querysets['attraction']).update(
+            related_attraction=None, updated_at=Now(),
+        )
+        for name, queryset in querysets.items():
+            model = queryset.model
+            # Collected first: a raw DELETE cannot filter across a join
+            pks = list(queryset.values_list('pk', flat=True))
+            _bulk_create(Tombstone, (Tombstone(doc_type=sync.sync_type_for_model(model), object_id=pk) for pk in pks))
+            deleted[name] = 0
+            # Plain SQL: no per-row signals, and the ON DELETE rules above are
+            # already handled. Chunks stay below SQLite's bound parameter limit.
+            table = connection.ops.quote_name(model._meta.db_table)
+            column = connection.ops.quote_name(model._meta.pk.column)
+            with connection.cursor() as cursor:
+                for start in range(0, len(pks), BATCH_SIZE):
+                    batch = pks[start:start + BATCH_SIZE]
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(batch))})", batch,
+                    )
+                    deleted[name] += cursor.rowcount
+        rebuild_derived()
+    return deleted
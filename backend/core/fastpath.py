@@ -0,0 +1,233 @@
+"""
+Read-only fast path for list payloads.
+
+``ModelSerializer(queryset, many=True).data`` builds a model instance per
+row and walks every field's get_attribute/to_representation on it. For the
+plain column fields of the catalog serializers the result is a function of
+the ``queryset.values()`` row alone, so ``compile_plan`` turns a serializer
+(after SparseFieldsetMixin has trimmed it) into a ValuesPlan: the columns
+to select and one generated function that builds the output dict straight
+from a values() row, with a converter per field type (Decimal -> str,
+time/datetime -> ISO 8601) inlined and identity fields copied as they are.
+
+SerializerMethodFields are computed from the row when the serializer
+declares them in ``values_methods`` ({field: (columns, function of the
+row)}); a function with a ``prepare`` attribute also gets what
+``prepare()`` returned, called once per list (e.g. a lookup table). A serializer with any other field (nested serializers, files,
+properties, nullable relations in a dotted source) gets no plan and the
+caller keeps the DRF path. The output is the same JSON byte for byte; see
+FastPathTests.
+"""
+import threading
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Plans per (serializer class, field names); sparse fieldsets make the key
+# client-controlled, so the least recently used plan is dropped past this
+MAX_PLANS = 256
+_MISSING = object()
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+def _decimal(field):
+    if field.localize or field.normalize_output or field.decimal_places is None \
+            or not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING):
+        return field.to_representation
+    exponent = -field.decimal_places
+    slow = field.to_representation
+
+    def convert(value):
+        # Database values already have the column's scale; quantize the rest
+        if type(value) is Decimal and value.as_tuple().exponent == exponent:
+            return f'{value:f}'
+        return slow(value)
+    return convert
+
+
+def _datetime(field):
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != drf_fields.ISO_8601 or not settings.USE_TZ:
+        return field.to_representation
+    fixed = getattr(field, 'timezone', None)
+    slow = field.to_representation
+
+    def convert(value, current):
+        # DRF's enforce_timezone looks the current timezone up per value; it
+        # is resolved once per rows() call instead
+        if value.utcoffset() is None:
+            return slow(value)
+        text = value.astimezone(fixed or current).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    convert.takes_timezone = True
+    return convert
+
+
+def _time(field):
+    if getattr(field, 'format', api_settings.TIME_FORMAT) != drf_fields.ISO_8601:
+        return field.to_representation
+    return lambda value: value.isoformat()
+
+
+def _choice(field):
+    choices = field.choice_strings_to_values
+    return lambda value: choices.get(str(value), value)
+
+
+# (DRF field class, converter factory); a factory given as model field classes
+# copies the column value as it is when the model field is one of them (the
+# value is then what the DRF field's to_representation would return)
+CONVERTERS = (
+    (drf_fields.BooleanField, (models.BooleanField,)),
+    (drf_fields.IntegerField, (models.IntegerField, models.AutoField)),
+    (drf_fields.CharField, (models.CharField, models.TextField)),
+    (drf_fields.DecimalField, _decimal),
+    (drf_fields.DateTimeField, _datetime),
+    (drf_fields.TimeField, _time),
+    (drf_fields.ChoiceField, _choice),
+    (relations.PrimaryKeyRelatedField, (models.ForeignKey,)),
+)
+
+
+class ValuesPlan:
+    """
+    Columns to select and the function building one output dict from a
+    values() row, the current timezone and the prepared method contexts.
+    """
+
+    def __init__(self, columns, build, prepares=()):
+        self.columns = columns
+        self.build = build
+        self.prepares = prepares
+
+    def rows(self, rows):
+        current = timezone.get_current_timezone() if settings.USE_TZ else None
+        contexts = [prepare() for prepare in self.prepares]
+        build = self.build
+        return [build(row, current, contexts) for row in rows]
+
+
+def _column(model, source):
+    """(values() lookup, model field) for a source such as 'category.name', or None if unsupported."""
+    path = source.split('.')
+    for name in path[:-1]:
+        try:
+            relation = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        # DRF leaves the key out when a nullable relation is empty
+        if not relation.many_to_one or relation.null:
+            return None
+        model = relation.related_model
+    try:
+        field = model._meta.get_field(path[-1])
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.many_to_many:
+        return None
+    return '__'.join(path), field
+
+
+def compile_plan(serializer):
+    """ValuesPlan for ``serializer``'s fields, or None if one of them needs the model instance."""
+    serializer_class = type(serializer)
+    key = (serializer_class, tuple(serializer.fields))
+    with _plans_lock:
+        plan = _plans.pop(key, _MISSING)
+        if plan is not _MISSING:
+            _plans[key] = plan
+            return plan
+
+    model = serializer.Meta.model
+    methods = getattr(serializer_class, 'values_methods', {})
+    columns = []
+    namespace = {}
+    items = []
+    prepares = []
+    plan = None
+    for number, (name, field) in enumerate(serializer.fields.items()):
+        if field.write_only:
+            continue
+        if isinstance(field, drf_fields.SerializerMethodField):
+            if name not in methods:
+                break
+            method_columns, function = methods[name]
+            columns += method_columns
+            namespace[f'_m{number}'] = function
+            if hasattr(function, 'prepare'):
+                prepares.append(function.prepare)
+                items.append(f'{name!r}: _m{number}(row, contexts[{len(prepares) - 1}])')
+            else:
+                items.append(f'{name!r}: _m{number}(row)')
+            continue
+        for field_class, factory in CONVERTERS:
+            if isinstance(field, field_class):
+                break
+        else:
+            break
+        if getattr(field, 'pk_field', None) is not None:
+            break
+        found = _column(model, field.source)
+        if found is None:
+            break
+        column, model_field = found
+        columns.append(column)
+        value = f'row[{column!r}]'
+        if isinstance(factory, tuple) and isinstance(model_field, factory):
+            items.append(f'{name!r}: {value}')
+        else:
+            convert = namespace[f'_c{number}'] = factory(field) if callable(factory) else field.to_representation
+            arguments = 'v, tz' if getattr(convert, 'takes_timezone', False) else 'v'
+            items.append(f'{name!r}: (None if (v := {value}) is None else _c{number}({arguments}))')
+    else:
+        # One function per plan; a dict display is much cheaper than a loop over the fields
+        build = eval(f"lambda row, tz, contexts: {{{', '.join(items)}}}", namespace)
+        plan = ValuesPlan(tuple(dict.fromkeys(columns)), build, tuple(prepares))
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > MAX_PLANS:
+            del _plans[next(iter(_plans))]
+    return plan
+
+
+def serialize_list(serializer, queryset):
+    """``serializer.to_representation`` of every row of ``queryset``, or None without a plan."""
+    plan = compile_plan(serializer)
+    if plan is None:
+        return None
+    return plan.rows(queryset.values(*plan.columns))
+
+
+class FastListMixin:
+    """
+    List responses built with core.fastpath where the serializer allows
+    it; goes before the DRF viewset class. Views with extra list-like
+    actions call ``list_response(queryset)``.
+    """
+    fast_list = True
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset):
+        plan = compile_plan(self.get_serializer()) if self.fast_list else None
+        if plan is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(self.get_serializer(page, many=True).data)
+            return Response(self.get_serializer(queryset, many=True).data)
+
+        # Cursor pagination reads its position (the pk) from dict rows as well
+        queryset = queryset.values(*dict.fromkeys(plan.columns + (queryset.model._meta.pk.name,)))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.rows(page))
+        return Response(plan.rows(queryset))
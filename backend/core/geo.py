@@ -0,0 +1,147 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Stored precision of the geohash column (~5m cells). Queries match on a
+# shorter prefix chosen from the search radius.
+GEOHASH_PRECISION = 9
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE_MAP = {c: i for i, c in enumerate(_BASE32)}
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair as a base32 geohash string."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    latitude, longitude = float(latitude), float(longitude)
+
+    chars = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[value])
+            bit = 0
+            value = 0
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash):
+    """Return (lat_lo, lat_hi, lon_lo, lon_hi) of the cell covered by ``geohash``."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for char in geohash:
+        value = _DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+
+def _cell_size_deg(precision):
+    bits = precision * 5
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def precision_for_radius(latitude, radius_km):
+    """
+    Largest geohash precision whose cells are at least ``radius_km`` across,
+    so a cell plus its eight neighbours always covers the search circle.
+    """
+    km_per_deg_lat = math.pi * EARTH_RADIUS_KM / 180.0
+    km_per_deg_lon = km_per_deg_lat * max(math.cos(math.radians(float(latitude))), 1e-6)
+    precision = 1
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        lat_deg, lon_deg = _cell_size_deg(candidate)
+        if lat_deg * km_per_deg_lat >= radius_km and lon_deg * km_per_deg_lon >= radius_km:
+            precision = candidate
+        else:
+            break
+    return precision
+
+
+def bbox_cells(west, south, east, north, max_cells=32):
+    """
+    Geohash prefixes covering the box, at the finest precision that needs
+    at most ``max_cells`` of them (precision 1 covers the world with 32).
+    """
+    def span(lo, hi, origin, size, count):
+        first = min(int((lo - origin) / size), count - 1)
+        return range(first, min(int((hi - origin) / size), count - 1) + 1)
+
+    cells = None
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lat_deg, lon_deg = _cell_size_deg(precision)
+        rows = span(south, north, -90.0, lat_deg, round(180.0 / lat_deg))
+        columns = span(west, east, -180.0, lon_deg, round(360.0 / lon_deg))
+        if cells is not None and len(rows) * len(columns) > max_cells:
+            break
+        cells = [
+            geohash_encode(-90.0 + (row + 0.5) * lat_deg, -180.0 + (column + 0.5) * lon_deg, precision)
+            for row in rows for column in columns
+        ]
+    return cells
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Geohash prefixes (the containing cell and its neighbours) that together
+    cover every point within ``radius_km`` of the given coordinate.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    precision = precision_for_radius(latitude, radius_km)
+    lat_deg, lon_deg = _cell_size_deg(precision)
+
+    cells = set()
+    for dlat in (-lat_deg, 0.0, lat_deg):
+        lat = latitude + dlat
+        if not -90.0 <= lat <= 90.0:
+            continue
+        for dlon in (-lon_deg, 0.0, lon_deg):
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(lat, lon, precision))
+    return sorted(cells)
@@ -0,0 +1,339 @@
+"""
+Fetching and inspecting remote catalog images.
+
+Originals are kept in an on-disk cache keyed by the SHA-256 of their URL
+(``<dir>/ab/abcdef....bin`` plus a ``.json`` sidecar holding the
+validators), so repeat fetches are conditional requests answered with
+304. Requests to one host are spaced by a per-host rate limiter, which
+keeps a thread pool polite towards Wikimedia and friends.
+
+Thumbnails served by the /img/ proxy are rendered from those originals
+and stored in a DerivativeCache, addressed by the SHA-256 of the
+original's content plus the requested size and format.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+# Catalog columns holding remote image URLs
+IMAGE_SOURCES = {
+    'attraction': ('tourism.Attraction', 'image'),
+    'hotel': ('hospitality.Hotel', 'image'),
+    'service': ('services.Service', 'image'),
+    'product': ('marketplace.Product', 'image'),
+    'artifact': ('tourism.DigitalArtifact', 'image_url'),
+    'team': ('tourism.TeamMember', 'photo_url'),
+}
+
+DEFAULT_TIMEOUT = 20
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+_CHUNK = 64 * 1024
+
+
+def get_image_source(doc_type):
+    model_label, field = IMAGE_SOURCES[doc_type]
+    return apps.get_model(model_label), field
+
+
+def cache_dir():
+    return getattr(settings, 'IMAGE_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'images'))
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HostRateLimiter:
+    """Hands out request slots at least ``interval`` seconds apart per host."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    content_type: str = ''
+    size: int = 0
+    path: str = ''
+    error: str = ''
+    from_cache: bool = False
+    sha256: str = ''
+
+    @property
+    def ok(self):
+        return self.status in (200, 304) and bool(self.path)
+
+
+class ImageFetcher:
+    """Thread-safe fetcher with conditional requests against the disk cache."""
+
+    def __init__(self, directory=None, rate_limiter=None, timeout=DEFAULT_TIMEOUT,
+                 max_bytes=DEFAULT_MAX_BYTES, revalidate=True):
+        self.directory = directory or cache_dir()
+        self.rate_limiter = rate_limiter or HostRateLimiter(0)
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        self.user_agent = getattr(settings, 'IMAGE_FETCH_USER_AGENT', 'NewValleyHub-ImageFetcher/1.0')
+
+    def paths(self, url):
+        key = url_key(url)
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.bin', base + '.json'
+
+    def cached(self, url):
+        """Metadata of the cached copy, or None."""
+        body_path, meta_path = self.paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if os.path.exists(body_path) else None
+
+    def fetch(self, url):
+        body_path, meta_path = self.paths(url)
+        meta = self.cached(url)
+        if meta is not None and not self.revalidate:
+            return FetchResult(url, 200, meta.get('content_type', ''), meta.get('size', 0), body_path,
+                               from_cache=True, sha256=meta.get('sha256', ''))
+
+        headers = {'User-Agent': self.user_agent}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return FetchResult(url, error="Not an http(s) URL")
+        self.rate_limiter.wait(parts.hostname)
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return self._store(url, response, body_path, meta_path)
+        except urllib.error.HTTPError as exc:
+            if exc.code == 304 and meta is not None:
+                return FetchResult(url, 304, meta.get('content_type', ''), meta.get('size', 0), body_path,
+                                   from_cache=True, sha256=meta.get('sha256', ''))
+            return FetchResult(url, exc.code, error=str(exc.reason))
+        except (urllib.error.URLError, OSError, ValueError) as exc:
+            return FetchResult(url, error=str(getattr(exc, 'reason', exc)))
+
+    def _store(self, url, response, body_path, meta_path):
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        tmp = f'{body_path}.{threading.get_ident()}.tmp'
+        size = 0
+        digest = hashlib.sha256()
+        with open(tmp, 'wb') as out:
+            while chunk := response.read(_CHUNK):
+                size += len(chunk)
+                digest.update(chunk)
+                if size > self.max_bytes:
+                    out.close()
+                    os.remove(tmp)
+                    return FetchResult(url, response.status, error=f"Larger than {self.max_bytes} bytes")
+                out.write(chunk)
+        os.replace(tmp, body_path)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'content_type': response.headers.get_content_type(),
+            'size': size,
+            'sha256': digest.hexdigest(),
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        return FetchResult(url, response.status, meta['content_type'], size, body_path, sha256=meta['sha256'])
+
+
+def image_info(path):
+    """(width, height, format) read from the image header, or None if not a usable image."""
+    try:
+        with Image.open(path) as image:
+            return image.width, image.height, image.format
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return None
+
+
+# URL extension -> (Pillow format, content type, encoder options)
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+if features.check('avif'):
+    THUMBNAIL_FORMATS['avif'] = ('AVIF', 'image/avif', {'quality': 60, 'speed': 6})
+# Part of every derivative key: bump when the rendering or encoder options change
+THUMBNAIL_VERSION = 1
+
+
+def source_version(url):
+    """
+    The ``?v=`` clients put on thumbnail URLs for the source ``url``: djb2
+    over its UTF-16 code units in base 36, as hashUrl in frontend/src/services/api.js.
+    """
+    value = 5381
+    encoded = url.encode('utf-16-le')
+    for i in range(0, len(encoded), 2):
+        value = (value * 33 + int.from_bytes(encoded[i:i + 2], 'little')) & 0xFFFFFFFF
+    digits = ''
+    while True:
+        value, digit = divmod(value, 36)
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'[digit] + digits
+        if not value:
+            return digits
+
+
+def thumbnail_key(source_sha256, width, height, fmt):
+    return hashlib.sha256(f'{source_sha256}:{width}x{height}:{fmt}:{THUMBNAIL_VERSION}'.encode()).hexdigest()
+
+
+def render_thumbnail(path, width, height, fmt):
+    """
+    Encoded bytes of the image at ``path`` cropped to cover ``width`` x
+    ``height``, or scaled to ``width`` when ``height`` is 0. Never upscales:
+    small originals give a smaller image of the requested aspect ratio.
+    Raises UnidentifiedImageError/OSError for files that are not images.
+    """
+    pil_format, _, options = THUMBNAIL_FORMATS[fmt]
+    with Image.open(path) as original:
+        # JPEGs are decoded straight at the smallest DCT scale still covering the box
+        original.draft(None, (width, height or 1))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        if height:
+            scale = min(1, image.width / width, image.height / height)
+            box = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = ImageOps.fit(image, box, Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        if pil_format == 'JPEG' and image.mode == 'RGBA':
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        buffer = io.BytesIO()
+        image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+class DerivativeCache:
+    """
+    Content-addressed files (``<dir>/ab/abcdef....webp``) bounded to
+    ``max_bytes``. A hit refreshes the file's mtime; a write that takes the
+    total over the bound removes the least recently used files down to 90%
+    of it. The running total is per process and re-measured from disk on
+    every eviction, so several workers may share a directory.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None
+
+    def path(self, key, extension):
+        return os.path.join(self.directory, key[:2], f'{key}.{extension}')
+
+    def get(self, key, extension):
+        path = self.path(key, extension)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, extension, data):
+        path = self.path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._files())
+            else:
+                self._total += len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+        return path
+
+    def _files(self):
+        """(mtime, size, path) of every cached file."""
+        try:
+            subdirs = [entry.path for entry in os.scandir(self.directory) if entry.is_dir()]
+        except FileNotFoundError:
+            return
+        for subdir in subdirs:
+            for entry in os.scandir(subdir):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def _evict(self):
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total = total
+
+
+_derivative_caches = {}
+_derivative_caches_lock = threading.Lock()
+
+
+def derivative_cache():
+    """The process-wide DerivativeCache for the configured directory and bound."""
+    directory = str(getattr(settings, 'IMAGE_DERIVATIVE_DIR',
+                            os.path.join(settings.BASE_DIR, 'cache', 'derivatives')))
+    max_bytes = getattr(settings, 'IMAGE_DERIVATIVE_MAX_BYTES', 512 * 1024 * 1024)
+    with _derivative_caches_lock:
+        if (directory, max_bytes) not in _derivative_caches:
+            _derivative_caches[directory, max_bytes] = DerivativeCache(directory, max_bytes)
+        return _derivative_caches[directory, max_bytes]
@@ -0,0 +1,197 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import cache, fake_catalog, sync
+from hospitality.models import Hotel
+from marketplace.models import Product
+from services.models import Service, ServiceCategory
+from tourism.ai_planner import snapshot
+from tourism.models import Attraction
+
+# name -> (method, URL, JSON body); {attraction}, {hotel}, {category}, {parent} and
+# {token} are filled in from the catalog being measured
+ENDPOINTS = {
+    'attraction-list': ('GET', '/api/tourism/attractions/', None),
+    'attraction-detail': ('GET', '/api/tourism/attractions/{attraction}/', None),
+    'generate-plan': ('POST', '/api/tourism/attractions/generate_plan/',
+                      {'days': 3, 'budget': 'medium', 'interests': ['historical', 'natural']}),
+    'hotel-list': ('GET', '/api/hospitality/hotels/', None),
+    'hotel-detail': ('GET', '/api/hospitality/hotels/{hotel}/', None),
+    'service-list': ('GET', '/api/services/items/', None),
+    'service-emergency': ('GET', '/api/services/items/emergency/', None),
+    'service-by-parent': ('GET', '/api/services/items/by_parent_category/?parent={parent}', None),
+    'category-hierarchy': ('GET', '/api/services/categories/hierarchy/', None),
+    'category-services': ('GET', '/api/services/categories/{category}/services/', None),
+    'product-list': ('GET', '/api/marketplace/products/', None),
+    'nearby': ('GET', '/api/nearby/?lat=25.44&lon=30.55&radius_km=10', None),
+    'map-tiles': ('GET', '/api/map/tiles/?bbox=27,22,31.5,28.5&zoom=7', None),
+    'search': ('GET', '/api/search/?q=temple', None),
+    'sync-delta': ('GET', '/api/sync/?since={token}', None),
+}
+# p95 latency may grow this much over the baseline before it counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API endpoints through the Django test client: p50/p95 latency, queries and "
+        "response bytes per endpoint, optionally against a synthetic catalog and a JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int,
+                            help="Measure a synthetic catalog of this scale, created inside a transaction "
+                                 "that is rolled back (default: the current database)")
+        parser.add_argument('--requests', type=int, default=20, help="Timed requests per endpoint")
+        parser.add_argument('--endpoints', help=f"Comma separated subset of {', '.join(ENDPOINTS)}")
+        parser.add_argument('--cached', action='store_true',
+                            help="Keep the response cache between requests (default: measure cache misses)")
+        parser.add_argument('--save', metavar='PATH', help="Write the results as a JSON baseline")
+        parser.add_argument('--baseline', metavar='PATH', help="Compare against a baseline written by --save")
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help="Allowed relative p95 growth before a regression is reported")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        names = list(ENDPOINTS)
+        if options['endpoints']:
+            names = [n.strip() for n in options['endpoints'].split(',') if n.strip()]
+            unknown = [n for n in names if n not in ENDPOINTS]
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(unknown)}")
+        if options['requests'] < 1:
+            raise CommandError("--requests must be a positive integer")
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline: {exc}")
+
+        if options['scale']:
+            with transaction.atomic():
+                fake_catalog.generate(options['scale'])
+                rows, results = self._row_counts(), self._run(names, options)
+                transaction.set_rollback(True)
+            # Cached responses and the planner snapshot describe the rolled back rows
+            snapshot.invalidate()
+            self._invalidate_responses()
+        else:
+            rows, results = self._row_counts(), self._run(names, options)
+
+        report = {"scale": options['scale'], "rows": rows, "requests": options['requests'],
+                  "cached": options['cached'], "endpoints": results}
+        self.stdout.write(", ".join(f"{count} {name}" for name, count in rows.items()))
+        if baseline and baseline.get('rows') != rows:
+            self.stdout.write(self.style.WARNING(f"Baseline was measured on other row counts: {baseline.get('rows')}"))
+        regressions = self._print(results, baseline, options['tolerance'])
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+            self.stdout.write(f"Baseline written to {options['save']}")
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"Regressions: {', '.join(regressions)}")
+
+    def _row_counts(self):
+        return {name: model.objects.count() for name, model in (
+            ('attraction', Attraction), ('hotel', Hotel), ('category', ServiceCategory),
+            ('service', Service), ('product', Product),
+        )}
+
+    def _placeholders(self):
+        parent = ServiceCategory.objects.filter(parent=None).order_by('order').first()
+        return {
+            'attraction': Attraction.objects.order_by('pk').values_list('pk', flat=True).first() or 0,
+            'hotel': Hotel.objects.order_by('pk').values_list('pk', flat=True).first() or 0,
+            'category': parent.pk if parent else 0,
+            'parent': parent.slug if parent else '',
+            # A client that synced just now: past the overlap window, so the
+            # freshly generated rows are not in the delta
+            'token': sync.encode_token(timezone.now() + sync.SYNC_OVERLAP),
+        }
+
+    def _run(self, names, options):
+        client = Client()
+        values = self._placeholders()
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for name in names:
+                method, url, body = ENDPOINTS[name]
+                url = url.format(**values)
+                self._invalidate_responses()
+                # The first request warms the planner snapshot, imports and connections
+                self._request(client, method, url, body)
+                if not options['cached']:
+                    self._invalidate_responses()
+                with CaptureQueriesContext(connection) as ctx:
+                    self._request(client, method, url, body)
+                queries = len(ctx.captured_queries)
+
+                timings = []
+                for _ in range(options['requests']):
+                    if not options['cached']:
+                        self._invalidate_responses()
+                    started = time.perf_counter()
+                    response = self._request(client, method, url, body)
+                    timings.append((time.perf_counter() - started) * 1000)
+                results[name] = {
+                    "status": response.status_code,
+                    "p50_ms": round(statistics.median(timings), 2),
+                    "p95_ms": round(percentile(timings, 0.95), 2),
+                    "queries": queries,
+                    "bytes": len(response.content),
+                }
+        return results
+
+    def _invalidate_responses(self):
+        """
+        Orphan the cached API responses by bumping the generations; clearing
+        the configured cache would also drop whatever else the site keeps there.
+        """
+        for app_label in cache.CACHED_APPS:
+            cache.bump_generation(app_label)
+
+    def _request(self, client, method, url, body):
+        if method == 'POST':
+            return client.post(url, body, content_type='application/json')
+        return client.get(url)
+
+    def _print(self, results, baseline, tolerance):
+        """Print the result table; returns the names of endpoints that regressed."""
+        previous = (baseline or {}).get('endpoints', {})
+        regressions = []
+        header = f"{'endpoint':<20} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'bytes':>10}"
+        if baseline:
+            header += f" {'p95 vs base':>12} {'queries':>8}"
+        self.stdout.write(header)
+        for name, result in results.items():
+            line = (
+                f"{name:<20} {result['status']:>6} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['queries']:>8} {result['bytes']:>10}"
+            )
+            before = previous.get(name)
+            if before:
+                change = result['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0
+                query_delta = result['queries'] - before['queries']
+                line += f" {change:>+11.0%} {query_delta:>+8}"
+                if change > tolerance or query_delta > 0 or result['status'] != before['status']:
+                    regressions.append(name)
+                    line += "  REGRESSION"
+            elif baseline:
+                line += f" {'(new)':>12}"
+            self.stdout.write(line)
+        return regressions
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import media
+
+from .process_media import parse_formats, parse_widths
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark of process_media: images/sec at several worker counts. "
+        "Variants of the real MEDIA_ROOT images are rendered into a temporary directory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default=f'1,4,{os.cpu_count() or 1}', help="Comma separated worker counts")
+        parser.add_argument('--widths', default=','.join(map(str, media.VARIANT_WIDTHS)))
+        parser.add_argument('--formats', default=','.join(media.VARIANT_FORMATS))
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = sorted({int(w) for w in options['workers'].split(',')})
+        except ValueError:
+            raise CommandError("--workers must be comma separated integers")
+        widths = parse_widths(options['widths'])
+        formats = parse_formats(options['formats'])
+        if not media.scan(str(settings.MEDIA_ROOT), media.MEDIA_DIRS):
+            self.stdout.write(self.style.WARNING(f"No source images under {settings.MEDIA_ROOT}; nothing to benchmark"))
+            return
+
+        self.stdout.write(f"{os.cpu_count()} CPUs, widths {widths}, formats {formats}")
+        self.stdout.write(f"{'workers':>8} {'images':>8} {'seconds':>9} {'images/sec':>11} {'speedup':>8}")
+        baseline = None
+        for workers in worker_counts:
+            output_dir = tempfile.mkdtemp(prefix='benchmark-media-')
+            try:
+                summary = media.process_media(workers=workers, widths=widths, formats=formats,
+                                              output_dir=output_dir)
+            finally:
+                shutil.rmtree(output_dir)
+            if not summary['processed']:
+                path, error = summary['failed'][0]
+                raise CommandError(f"No image could be processed, e.g. {path}: {error}")
+            rate = summary['processed'] / summary['seconds']
+            baseline = baseline or rate
+            self.stdout.write(
+                f"{workers:>8} {summary['processed']:>8} {summary['seconds']:>9.2f} {rate:>11.1f} "
+                f"{rate / baseline:>7.2f}x"
+            )
@@ -0,0 +1,88 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from core.metrics import registry
+from core.middleware import MetricsMiddleware, _current_timer, _RequestTimer, time_queries
+
+
+def best_ns(func, iterations, rounds=5):
+    """Fastest of ``rounds`` runs, in nanoseconds per call."""
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            func()
+        elapsed = (time.perf_counter_ns() - started) / iterations
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what MetricsMiddleware adds per request and per SQL query, against the same "
+        "work without it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000, help="Calls per timed round")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if iterations < 1:
+            raise CommandError("--iterations must be a positive integer")
+        request = RequestFactory().get('/api/benchmark/')
+        body = HttpResponse(b'{}', content_type='application/json')
+        middleware = MetricsMiddleware(lambda request: body)
+        cursor = connection.cursor()
+        renderer = JSONRenderer()
+
+        def rendered():
+            response = Response({'id': 1})
+            response.accepted_renderer = renderer
+            response.accepted_media_type = 'application/json'
+            response.renderer_context = {}
+            return response
+
+        def drf_view(request):
+            response = middleware.process_template_response(request, rendered())
+            return response.render()
+        drf_middleware = MetricsMiddleware(drf_view)
+
+        def queries():
+            for _ in range(10):
+                cursor.execute('SELECT 1')
+
+        rows = [
+            ("request", best_ns(lambda: body, iterations), best_ns(lambda: middleware(request), iterations)),
+            ("rendered request", best_ns(lambda: rendered().render(), iterations),
+             best_ns(lambda: drf_middleware(request), iterations)),
+        ]
+        wrappers = connection.execute_wrappers
+        installed = time_queries in wrappers
+        if installed:
+            wrappers.remove(time_queries)
+        plain = best_ns(queries, iterations // 10)
+        wrappers.insert(0, time_queries)
+        idle = best_ns(queries, iterations // 10)
+        token = _current_timer.set(_RequestTimer())
+        try:
+            timed = best_ns(queries, iterations // 10)
+        finally:
+            _current_timer.reset(token)
+            if not installed:
+                wrappers.remove(time_queries)
+        rows += [("10 queries idle", plain, idle), ("10 queries timed", plain, timed)]
+        registry.reset()
+
+        self.stdout.write(f"{'':<18} {'plain us':>10} {'metrics us':>11} {'overhead us':>12}")
+        for name, plain, measured in rows:
+            self.stdout.write(
+                f"{name:<18} {plain / 1000:>10.2f} {measured / 1000:>11.2f} {(measured - plain) / 1000:>12.2f}"
+            )
+
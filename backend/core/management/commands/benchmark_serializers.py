@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core import fake_catalog, fastpath
+from hospitality.models import Hotel
+from hospitality.serializers import HotelSerializer
+from marketplace.models import Product
+from marketplace.serializers import ProductSerializer
+from services.models import Service
+from services.serializers import ServiceSerializer
+from tourism.ai_planner import snapshot
+from tourism.models import Attraction
+from tourism.serializers import AttractionSerializer
+
+# name -> (serializer, queryset as the list endpoint builds it)
+SERIALIZERS = {
+    'attraction': (AttractionSerializer, lambda: Attraction.objects.order_by('pk')),
+    'hotel': (HotelSerializer, lambda: Hotel.objects.order_by('pk')),
+    'service': (ServiceSerializer, lambda: Service.objects.select_related('category', 'category__parent').order_by('pk')),
+    'product': (ProductSerializer, lambda: Product.objects.order_by('pk')),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Objects per second of the list serializers against core.fastpath, query included, on a "
+        "synthetic catalog created inside a transaction that is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=2000, help="Synthetic catalog scale (see generate_fake_catalog)")
+        parser.add_argument('--rounds', type=int, default=5, help="Timed rounds per path; the fastest counts")
+
+    def handle(self, *args, **options):
+        if options['scale'] < 1 or options['rounds'] < 1:
+            raise CommandError("--scale and --rounds must be positive integers")
+        with transaction.atomic():
+            fake_catalog.generate(options['scale'])
+            results = {name: self._measure(*entry, options['rounds']) for name, entry in SERIALIZERS.items()}
+            transaction.set_rollback(True)
+        snapshot.invalidate()
+
+        self.stdout.write(f"{'serializer':<12} {'rows':>6} {'drf obj/s':>11} {'fast obj/s':>11} {'speedup':>8}  identical")
+        for name, (rows, drf, fast, identical) in results.items():
+            self.stdout.write(
+                f"{name:<12} {rows:>6} {rows / drf:>11,.0f} {rows / fast:>11,.0f} {drf / fast:>7.1f}x  "
+                f"{'yes' if identical else 'NO'}"
+            )
+        if not all(identical for *_, identical in results.values()):
+            raise CommandError("core.fastpath output differs from the serializer")
+
+    def _measure(self, serializer_class, queryset, rounds):
+        """(rows, best DRF seconds, best fast path seconds, same JSON) for one serializer."""
+        renderer = JSONRenderer()
+        drf_data = serializer_class(queryset(), many=True).data
+        fast_data = fastpath.serialize_list(serializer_class(), queryset())
+        if fast_data is None:
+            raise CommandError(f"{serializer_class.__name__} has fields core.fastpath cannot build")
+        identical = renderer.render(drf_data) == renderer.render(fast_data)
+
+        timings = {'drf': [], 'fast': []}
+        for _ in range(rounds):
+            started = time.perf_counter()
+            serializer_class(queryset(), many=True).data
+            timings['drf'].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            fastpath.serialize_list(serializer_class(), queryset())
+            timings['fast'].append(time.perf_counter() - started)
+        return len(drf_data), min(timings['drf']), min(timings['fast']), identical
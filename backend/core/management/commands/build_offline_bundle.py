@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import bundle
+
+
+class Command(BaseCommand):
+    help = "Build the compressed offline data bundle, rebuilding only apps whose data changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'apps', nargs='*',
+            help=f"Parts to consider (default: all of {', '.join(bundle.BUNDLE_PARTS)})",
+        )
+        parser.add_argument('--force', action='store_true', help="Rebuild even if the data is unchanged")
+
+    def handle(self, *args, **options):
+        unknown = [label for label in options['apps'] if label not in bundle.BUNDLE_PARTS]
+        if unknown:
+            raise CommandError(f"Unknown part(s): {', '.join(unknown)}")
+
+        manifest, rebuilt = bundle.build_bundle(options['apps'] or None, force=options['force'])
+        for app_label, entry in manifest['parts'].items():
+            sizes = f"{entry['bytes']} B, gzip {entry['gzip_bytes']} B"
+            if 'brotli_bytes' in entry:
+                sizes += f", brotli {entry['brotli_bytes']} B"
+            state = "rebuilt" if app_label in rebuilt else "unchanged"
+            self.stdout.write(f"{entry['file']}: {state} ({sizes})")
+        self.stdout.write(self.style.SUCCESS(
+            f"Bundle version {manifest['version']} in {bundle.bundle_dir()}"
+        ))
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import images
+from core.models import ImageStatus
+
+STATUS_FIELDS = ['url', 'ok', 'status_code', 'content_type', 'size_bytes', 'width', 'height', 'error', 'checked_at']
+
+
+class Command(BaseCommand):
+    help = "Fetch every catalog image URL concurrently and record status, size and dimensions per row"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--types', help=f"Comma separated subset of {', '.join(images.IMAGE_SOURCES)}")
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent downloads (default 8)")
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help="Minimum seconds between requests to the same host (default 1.0)",
+        )
+        parser.add_argument('--timeout', type=float, default=images.DEFAULT_TIMEOUT)
+        parser.add_argument(
+            '--no-revalidate', action='store_true',
+            help="Trust cached originals without a conditional request",
+        )
+
+    def collect(self, doc_types):
+        """url -> [(doc_type, pk), ...]; rows sharing a URL are fetched once."""
+        targets = {}
+        for doc_type in doc_types:
+            model, field = images.get_image_source(doc_type)
+            rows = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}).values_list('pk', field)
+            for pk, url in rows.iterator(chunk_size=2000):
+                targets.setdefault(url.strip(), []).append((doc_type, pk))
+        return targets
+
+    def handle(self, *args, **options):
+        doc_types = list(images.IMAGE_SOURCES)
+        if options['types']:
+            doc_types = [t.strip() for t in options['types'].split(',') if t.strip()]
+            unknown = [t for t in doc_types if t not in images.IMAGE_SOURCES]
+            if unknown:
+                raise CommandError(f"Unknown type(s): {', '.join(unknown)}")
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        started = timezone.now()
+        targets = self.collect(doc_types)
+        fetcher = images.ImageFetcher(
+            rate_limiter=images.HostRateLimiter(options['interval']),
+            timeout=options['timeout'],
+            revalidate=not options['no_revalidate'],
+        )
+
+        statuses = []
+        counts = {'ok': 0, 'broken': 0, 'cached': 0}
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [executor.submit(fetcher.fetch, url) for url in targets]
+            for future in as_completed(futures):
+                result = future.result()
+                info = images.image_info(result.path) if result.ok else None
+                error = result.error or ('' if info else "Not a readable image")
+                ok = info is not None
+                counts['ok' if ok else 'broken'] += len(targets[result.url])
+                counts['cached'] += result.from_cache
+                if not ok:
+                    self.stdout.write(self.style.WARNING(f"✗ {result.url} ({result.status or '-'}): {error}"))
+                for doc_type, pk in targets[result.url]:
+                    statuses.append(ImageStatus(
+                        doc_type=doc_type, object_id=pk, url=result.url, ok=ok,
+                        status_code=result.status, content_type=result.content_type[:100],
+                        size_bytes=result.size if result.path else None,
+                        width=info[0] if info else None, height=info[1] if info else None,
+                        error=error[:255], checked_at=timezone.now(),
+                    ))
+
+        ImageStatus.objects.bulk_create(
+            statuses, batch_size=500, update_conflicts=True,
+            unique_fields=['doc_type', 'object_id'], update_fields=STATUS_FIELDS,
+        )
+        # Rows that were deleted or lost their image since the last run
+        ImageStatus.objects.filter(doc_type__in=doc_types, checked_at__lt=started).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(targets)} URLs for {counts['ok'] + counts['broken']} rows: {counts['ok']} ok, "
+            f"{counts['broken']} broken, {counts['cached']} URLs unchanged since the last fetch"
+        ))
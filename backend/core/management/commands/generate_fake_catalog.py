@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import fake_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create a synthetic catalog for load testing: SCALE attractions and services, "
+        "SCALE/4 hotels, SCALE/2 products and a service category tree, around the New Valley towns"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, help="Attractions to create; the other types follow from it")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same catalog")
+        parser.add_argument('--clear', action='store_true',
+                            help="Delete the rows of earlier runs first (alone: only delete them)")
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        if scale is None and not options['clear']:
+            raise CommandError("Pass --scale N, --clear, or both")
+        if scale is not None and scale < 1:
+            raise CommandError("--scale must be a positive integer")
+
+        if options['clear']:
+            deleted = fake_catalog.clear()
+            self.stdout.write("Deleted " + ", ".join(f"{count} {name}" for name, count in deleted.items()))
+        if scale is None:
+            return
+
+        started = time.perf_counter()
+        created = fake_catalog.generate(scale, seed=options['seed'])
+        seconds = time.perf_counter() - started
+        total = sum(created.values())
+        self.stdout.write(", ".join(f"{count} {name}" for name, count in created.items()))
+        self.stdout.write(self.style.SUCCESS(f"Created {total} rows in {seconds:.1f}s ({total / seconds:.0f} rows/sec)"))
@@ -0,0 +1,163 @@
+import argparse
+import csv
+from contextlib import ExitStack
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.geo import geohash_encode
+from core.poi import POI_MODELS, get_poi_model
+from core.signals import bulk_changed
+
+CHUNK_SIZE = 1000
+# Order in which a name is looked up when the CSV gives no usable type
+LOOKUP_ORDER = ('attraction', 'hotel', 'service')
+
+
+def _quantize(value):
+    value = Decimal(value.strip())
+    if not value.is_finite():
+        raise InvalidOperation(value)
+    return value.quantize(Decimal('0.000001'))
+
+
+class Command(BaseCommand):
+    help = (
+        "Update POI coordinates from a Name,Type,Latitude,Longitude CSV (as written by "
+        "export_locations.py), matching names case-insensitively with bulk updates"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--touch', action=argparse.BooleanOptionalAction, default=True,
+            help="Bump updated_at, so ETags, /api/sync/ clients and the offline bundle see the move (default). "
+                 "--no-touch is only safe when no sync client or offline bundle holds the old coordinates",
+        )
+        parser.add_argument('--unmatched', help="Write unmatched and invalid rows to this CSV instead of the console")
+        parser.add_argument('--dry-run', action='store_true', help="Report without writing")
+
+    def build_name_map(self):
+        """casefolded name -> {poi_type: [(pk, lat, lon), ...]} over the whole catalog."""
+        names = {}
+        for poi_type in LOOKUP_ORDER:
+            rows = get_poi_model(poi_type).objects.values_list('pk', 'name', 'latitude', 'longitude')
+            for pk, name, lat, lon in rows.iterator(chunk_size=2000):
+                names.setdefault(name.casefold(), {}).setdefault(poi_type, []).append((pk, lat, lon))
+        return names
+
+    @staticmethod
+    def type_hint(type_str):
+        """'Attraction', 'Hotel' or 'Service: Bank' -> POI type, else None."""
+        head = type_str.split(':', 1)[0].strip().lower()
+        return head if head in POI_MODELS else None
+
+    @staticmethod
+    def write_coordinates(model, batch, touched_at=None):
+        """
+        One parameterized UPDATE run with executemany for {pk: (lat, lon)}.
+        Same effect as bulk_update(['latitude', 'longitude', 'geohash']) but
+        without building a CASE expression per row, which dominates at scale.
+        """
+        fields = [model._meta.get_field(name) for name in ('latitude', 'longitude', 'geohash')]
+        if touched_at is not None:
+            fields.append(model._meta.get_field('updated_at'))
+        quote = connection.ops.quote_name
+        sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+            quote(model._meta.db_table),
+            ', '.join(f'{quote(field.column)} = %s' for field in fields),
+            quote(model._meta.pk.column),
+        )
+        params = []
+        for pk, (lat, lon) in batch.items():
+            values = [lat, lon, geohash_encode(lat, lon)]
+            if touched_at is not None:
+                values.append(touched_at)
+            params.append([
+                field.get_db_prep_save(value, connection) for field, value in zip(fields, values)
+            ] + [pk])
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+    def handle(self, *args, **options):
+        files = ExitStack()
+        try:
+            source = files.enter_context(open(options['path'], newline='', encoding='utf-8'))
+            unmatched_writer = None
+            if options['unmatched']:
+                unmatched_writer = csv.writer(files.enter_context(
+                    open(options['unmatched'], 'w', newline='', encoding='utf-8')
+                ))
+        except OSError as exc:
+            files.close()
+            raise CommandError(str(exc))
+
+        names = self.build_name_map()
+        pending = {poi_type: {} for poi_type in LOOKUP_ORDER}
+        counts = {'rows': 0, 'updated': 0, 'unchanged': 0, 'unmatched': 0, 'invalid': 0}
+        now = timezone.now()
+
+        def report(row, reason):
+            counts[reason] += 1
+            if unmatched_writer:
+                unmatched_writer.writerow(row + [reason])
+            else:
+                self.stdout.write(self.style.WARNING(f"✗ {reason.upper()}: {row[0] if row else ''}"))
+
+        def flush(poi_type):
+            batch = pending[poi_type]
+            if not batch:
+                return
+            if not options['dry_run']:
+                model = get_poi_model(poi_type)
+                self.write_coordinates(model, batch, now if options['touch'] else None)
+                # Per batch, so memory stays bounded by --chunk-size however long the CSV is
+                bulk_changed.send(sender=model, pks=sorted(batch))
+            batch.clear()
+
+        with files, transaction.atomic():
+            reader = csv.reader(source)
+            next(reader, None)  # header
+            for row in reader:
+                if not row:
+                    continue
+                counts['rows'] += 1
+                try:
+                    name, type_str, lat, lon = row[0], row[1], _quantize(row[2]), _quantize(row[3])
+                except (IndexError, InvalidOperation):
+                    report(row, 'invalid')
+                    continue
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                    report(row, 'invalid')
+                    continue
+
+                matches = names.get(name.casefold())
+                if not matches:
+                    report(row, 'unmatched')
+                    continue
+                poi_type = self.type_hint(type_str)
+                if poi_type not in matches:
+                    poi_type = next(t for t in LOOKUP_ORDER if t in matches)
+
+                for i, (pk, old_lat, old_lon) in enumerate(matches[poi_type]):
+                    if (old_lat, old_lon) == (lat, lon):
+                        counts['unchanged'] += 1
+                        continue
+                    pending[poi_type][pk] = (lat, lon)
+                    # Later rows for the same name compare against this value
+                    matches[poi_type][i] = (pk, lat, lon)
+                    counts['updated'] += 1
+                    if len(pending[poi_type]) >= options['chunk_size']:
+                        flush(poi_type)
+
+            for poi_type in LOOKUP_ORDER:
+                flush(poi_type)
+
+        prefix = "Dry run, nothing stored: " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{counts['rows']} rows: {counts['updated']} coordinates updated, "
+            f"{counts['unchanged']} unchanged, {counts['unmatched']} unmatched, {counts['invalid']} invalid"
+        ))
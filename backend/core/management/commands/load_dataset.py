@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the catalog in line with declarative JSON/YAML datasets: a natural-key diff applied "
+        "with bulk inserts, updates and deletes in one transaction"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Dataset files; later files override sections of earlier ones")
+        parser.add_argument('--no-delete', action='store_true',
+                            help="Keep rows that are missing from the dataset")
+        parser.add_argument('--no-signals', action='store_true',
+                            help="Skip the bulk_changed handlers and rebuild the derived indexes once at the end")
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without storing them")
+
+    def handle(self, *args, **options):
+        data = {}
+        for path in options['paths']:
+            try:
+                data.update(seeding.read_dataset(path))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+
+        started = time.perf_counter()
+        try:
+            result = seeding.load_dataset(data, delete=not options['no_delete'], signals=not options['no_signals'],
+                                          dry_run=options['dry_run'])
+        except seeding.DatasetError as exc:
+            raise CommandError(str(exc))
+        seconds = time.perf_counter() - started
+
+        for section, counts in result.items():
+            self.stdout.write(
+                f"{section}: +{counts['created']} ~{counts['updated']} -{counts['deleted']} "
+                f"={counts['unchanged']}"
+            )
+        prefix = "Dry run, nothing stored" if options['dry_run'] else "Loaded"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} in {seconds:.2f}s"))
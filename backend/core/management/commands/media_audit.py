@@ -0,0 +1,120 @@
+import functools
+import json
+from collections import Counter
+from datetime import datetime, time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+CHUNK_SIZE = 2000
+
+
+def _attraction_subcategory(attraction_type):
+    return attraction_type.capitalize() if attraction_type else "General"
+
+
+def _hotel_subcategory(stars):
+    return f"{stars}-Star" if stars else "Unrated"
+
+
+def _service_subcategory(parent_name, category_name):
+    return f"{parent_name or 'General'} > {category_name}"
+
+
+def _product_subcategory():
+    return "Marketplace"
+
+
+# type -> (model, report category, columns feeding the subcategory, subcategory rule)
+AUDIT_SOURCES = {
+    'attraction': ('tourism.Attraction', "Attraction", ('attraction_type',), _attraction_subcategory),
+    'hotel': ('hospitality.Hotel', "Hotel", ('stars',), _hotel_subcategory),
+    'service': ('services.Service', "Service", ('category__parent__name', 'category__name'), _service_subcategory),
+    'product': ('marketplace.Product', "Product", (), _product_subcategory),
+}
+
+
+def parse_since(value):
+    """ISO 8601 date or datetime; naive values are in the current time zone."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a media audit of every POI (name, category, subcategory, image URL) as NDJSON, "
+        "one row at a time, with per-category image counts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help="NDJSON file to write (default: stdout, counts go to stderr)")
+        parser.add_argument('--types', help=f"Comma separated subset of {', '.join(AUDIT_SOURCES)}")
+        parser.add_argument('--changed-since', help="Only rows updated at or after this ISO date/datetime")
+        parser.add_argument('--missing-only', action='store_true', help="Only write rows without an image")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        doc_types = list(AUDIT_SOURCES)
+        if options['types']:
+            doc_types = [t.strip() for t in options['types'].split(',') if t.strip()]
+            unknown = [t for t in doc_types if t not in AUDIT_SOURCES]
+            if unknown:
+                raise CommandError(f"Unknown type(s): {', '.join(unknown)}")
+        since = None
+        if options['changed_since']:
+            try:
+                since = parse_since(options['changed_since'])
+            except ValueError:
+                raise CommandError(f"Invalid --changed-since value: {options['changed_since']!r}")
+
+        if options['output']:
+            try:
+                out = open(options['output'], 'w', encoding='utf-8')
+            except OSError as exc:
+                raise CommandError(str(exc))
+            report = self.stdout.write
+        else:
+            out = self.stdout
+            # Keep stdout pure NDJSON; stderr is not styled as an error here
+            report = functools.partial(self.stderr.write, style_func=str)
+
+        totals, with_images = Counter(), Counter()
+        try:
+            for doc_type in doc_types:
+                model_label, category, columns, subcategory = AUDIT_SOURCES[doc_type]
+                queryset = apps.get_model(model_label).objects.order_by('name')
+                if since is not None:
+                    queryset = queryset.filter(updated_at__gte=since)
+                rows = queryset.values_list('pk', 'name', 'image', *columns)
+                for pk, name, image, *extra in rows.iterator(chunk_size=options['chunk_size']):
+                    totals[category] += 1
+                    if image:
+                        with_images[category] += 1
+                        if options['missing_only']:
+                            continue
+                    row = {"id": pk, "type": doc_type, "name_en": name, "category": category,
+                           "subcategory": subcategory(*extra), "image_url": image or None}
+                    out.write(json.dumps(row, ensure_ascii=False) + '\n')
+        finally:
+            if out is not self.stdout:
+                out.close()
+
+        total, images = sum(totals.values()), sum(with_images.values())
+        scope = f" changed since {since.isoformat()}" if since else ""
+        report(f"Total POIs{scope}: {total}")
+        if total:
+            report(f"  ✓ With Images: {images} ({images / total * 100:.1f}%)")
+            report(f"  ✗ Missing Images: {total - images} ({(total - images) / total * 100:.1f}%)")
+        report("By Category:")
+        for doc_type in doc_types:
+            category = AUDIT_SOURCES[doc_type][1]
+            report(f"  {category}: {totals[category]} total ({with_images[category]} with images)")
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import merge
+
+
+class Command(BaseCommand):
+    help = "Fuzzy-merge a JSON list of POI records into the catalog in one transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="JSON file: a list of dataset items (see smart_merge_pois.py)")
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without storing them")
+        parser.add_argument(
+            '--threshold', type=float, default=merge.DEFAULT_THRESHOLD,
+            help=f"Trigram Dice similarity needed to treat names as the same place (default {merge.DEFAULT_THRESHOLD})",
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options['threshold'] <= 1:
+            raise CommandError("--threshold must be in (0, 1]")
+        try:
+            with open(options['path'], encoding='utf-8') as f:
+                items = json.load(f)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        if not isinstance(items, list):
+            raise CommandError("Expected a JSON list of items")
+
+        result = merge.merge_dataset(items, options['threshold'], dry_run=options['dry_run'])
+
+        verbose = options['verbosity'] > 1
+        for doc_type in ('attraction', 'hotel', 'service', 'product'):
+            for entry in result[doc_type]['report']:
+                if entry['action'] == 'create':
+                    self.stdout.write(f"+ {doc_type}: {entry['name']}")
+                elif entry['action'] == 'update':
+                    target = f"#{entry['id']} " if 'id' in entry else ""
+                    self.stdout.write(
+                        f"~ {doc_type} {target}{entry['match']!r} <- {entry['name']!r} "
+                        f"({entry['score']}): {', '.join(entry['fields'])}"
+                    )
+                elif verbose:
+                    self.stdout.write(f"= {doc_type}: {entry['name']!r} matches {entry['match']!r} ({entry['score']})")
+        for name in result['skipped']:
+            self.stdout.write(self.style.WARNING(f"skipped (unknown category): {name}"))
+
+        summary = ", ".join(
+            f"{doc_type}s +{result[doc_type]['created']} ~{result[doc_type]['updated']}"
+            for doc_type in ('attraction', 'hotel', 'service', 'product')
+        )
+        prefix = "Dry run, nothing stored: " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{summary}, {len(result['skipped'])} skipped"))
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import media
+from core.images import THUMBNAIL_FORMATS
+
+
+def parse_widths(value):
+    try:
+        widths = tuple(sorted({int(w) for w in value.split(',') if w.strip()}))
+    except ValueError:
+        raise CommandError("--widths must be comma separated integers")
+    if not widths or widths[0] < 1:
+        raise CommandError("--widths must be positive")
+    return widths
+
+
+def parse_formats(value):
+    formats = tuple(f.strip() for f in value.split(',') if f.strip())
+    unknown = [f for f in formats if f not in THUMBNAIL_FORMATS]
+    if unknown or not formats:
+        raise CommandError(
+            f"Unsupported format(s): {', '.join(unknown) or value!r} (available: {', '.join(THUMBNAIL_FORMATS)})"
+        )
+    return formats
+
+
+class Command(BaseCommand):
+    help = (
+        "Render responsive width/format variants of the images under MEDIA_ROOT in a process pool, "
+        "skipping sources whose content is unchanged since the last run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'dirs', nargs='*',
+            help=f"MEDIA_ROOT subdirectories (default: {', '.join(media.MEDIA_DIRS)})",
+        )
+        parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU; 1 runs inline)")
+        parser.add_argument('--widths', default=','.join(map(str, media.VARIANT_WIDTHS)))
+        parser.add_argument('--formats', default=','.join(media.VARIANT_FORMATS))
+        parser.add_argument('--force', action='store_true', help="Re-render unchanged sources too")
+
+    def handle(self, *args, **options):
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError("--workers must be at least 1")
+        summary = media.process_media(
+            directories=tuple(options['dirs']) or media.MEDIA_DIRS,
+            workers=options['workers'],
+            widths=parse_widths(options['widths']),
+            formats=parse_formats(options['formats']),
+            force=options['force'],
+        )
+        for path, error in summary['failed']:
+            self.stdout.write(self.style.WARNING(f"✗ {path}: {error}"))
+        rate = summary['processed'] / summary['seconds'] if summary['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['processed']} images rendered ({summary['variants']} variants, {rate:.1f} images/sec), "
+            f"{summary['unchanged']} unchanged, {summary['removed']} removed, {len(summary['failed'])} failed "
+            f"in {media.variants_dir()}"
+        ))
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core import sync
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than the retention period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help="Retention in days (default: settings.SYNC_TOMBSTONE_RETENTION_DAYS)",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(days=options['days']) if options['days'] is not None else None
+        deleted = sync.prune_tombstones(older_than)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones"))
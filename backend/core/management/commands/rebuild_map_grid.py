@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import mapgrid
+
+
+class Command(BaseCommand):
+    help = "Recompute the map clustering grid from the attraction, hotel and service tables"
+
+    def handle(self, *args, **options):
+        cells = mapgrid.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Map grid rebuilt: {cells} cells"))
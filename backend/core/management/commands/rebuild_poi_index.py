@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import poiindex
+from core.poi import POI_MODELS
+
+
+class Command(BaseCommand):
+    help = "Recreate the denormalized POI index from the attraction, hotel and service tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('types', nargs='*', help=f"POI types to rebuild (default: all of {', '.join(POI_MODELS)})")
+
+    def handle(self, *args, **options):
+        unknown = [t for t in options['types'] if t not in POI_MODELS]
+        if unknown:
+            raise CommandError(f"Unknown POI type(s): {', '.join(unknown)}")
+        with transaction.atomic():
+            total = poiindex.rebuild(options['types'] or None)
+        self.stdout.write(self.style.SUCCESS(f"POI index rebuilt: {total} entries"))
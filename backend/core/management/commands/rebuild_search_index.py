@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Reindex names and descriptions of every searchable catalog entry"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} documents"))
@@ -0,0 +1,144 @@
+"""
+Per-zoom clustering grid for the map viewport API.
+
+Each zoom level is divided into web-mercator cells (tiles subdivided
+GRID_SUBDIVISION times) and MapGridCell keeps a running count and
+coordinate sum per cell and POI type. Saves and deletes adjust the
+affected cells in place, so viewport queries never aggregate raw rows.
+"""
+import math
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .geo import bbox_cells
+from .models import MapGridCell, POIIndex
+from .poi import POI_MODELS, get_poi_model
+
+# Zoom levels at or below this are answered with clusters, above with points
+CLUSTER_MAX_ZOOM = 12
+# 2**2 = 4 cells per tile side, i.e. 64px cells on 256px tiles
+GRID_SUBDIVISION = 2
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def cell_for(latitude, longitude, zoom):
+    """Grid cell (x, y) containing the coordinate at the given zoom level."""
+    n = 1 << (zoom + GRID_SUBDIVISION)
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, float(latitude)))
+    lat_rad = math.radians(lat)
+    x = int((float(longitude) + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def cell_range(bbox, zoom):
+    """Inclusive (x_min, x_max, y_min, y_max) of the cells covering a bbox."""
+    west, south, east, north = bbox
+    x_min, y_min = cell_for(north, west, zoom)
+    x_max, y_max = cell_for(south, east, zoom)
+    return x_min, x_max, y_min, y_max
+
+
+@transaction.atomic
+def adjust_point(poi_type, latitude, longitude, delta):
+    """Add (delta=1) or remove (delta=-1) one POI from every zoom level."""
+    lat, lon = float(latitude), float(longitude)
+    keys = [(zoom,) + cell_for(lat, lon, zoom) for zoom in range(CLUSTER_MAX_ZOOM + 1)]
+    if delta > 0:
+        # Insert missing cells empty first, skipping ones that exist: an
+        # update-then-create would race another save creating the same cell
+        # (unique_map_grid_cell), while the increments below are atomic
+        MapGridCell.objects.bulk_create(
+            [MapGridCell(zoom=zoom, poi_type=poi_type, x=x, y=y) for zoom, x, y in keys], ignore_conflicts=True,
+        )
+    for zoom, x, y in keys:
+        cells = MapGridCell.objects.filter(zoom=zoom, poi_type=poi_type, x=x, y=y)
+        cells.update(
+            count=F('count') + delta,
+            lat_sum=F('lat_sum') + lat * delta,
+            lon_sum=F('lon_sum') + lon * delta,
+        )
+        if delta < 0:
+            cells.filter(count__lte=0).delete()
+
+
+@transaction.atomic
+def rebuild(poi_types=None):
+    """Recompute the whole grid from the POI tables. Returns cells written."""
+    poi_types = poi_types or list(POI_MODELS)
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for poi_type in poi_types:
+        coords = get_poi_model(poi_type).objects.values_list('latitude', 'longitude')
+        for latitude, longitude in coords.iterator(chunk_size=2000):
+            lat, lon = float(latitude), float(longitude)
+            for zoom in range(CLUSTER_MAX_ZOOM + 1):
+                entry = totals[(zoom, poi_type) + cell_for(lat, lon, zoom)]
+                entry[0] += 1
+                entry[1] += lat
+                entry[2] += lon
+
+    MapGridCell.objects.filter(poi_type__in=poi_types).delete()
+    MapGridCell.objects.bulk_create(
+        [
+            MapGridCell(zoom=zoom, poi_type=poi_type, x=x, y=y, count=count, lat_sum=lat_sum, lon_sum=lon_sum)
+            for (zoom, poi_type, x, y), (count, lat_sum, lon_sum) in totals.items()
+        ],
+        batch_size=1000,
+    )
+    return len(totals)
+
+
+def clusters_in_bbox(bbox, zoom, poi_types):
+    """Merged per-cell clusters (all requested types) inside the viewport."""
+    x_min, x_max, y_min, y_max = cell_range(bbox, zoom)
+    cells = MapGridCell.objects.filter(
+        zoom=zoom, x__range=(x_min, x_max), y__range=(y_min, y_max), poi_type__in=poi_types,
+    ).values_list('x', 'y', 'poi_type', 'count', 'lat_sum', 'lon_sum')
+
+    merged = {}
+    for x, y, poi_type, count, lat_sum, lon_sum in cells:
+        cluster = merged.setdefault((x, y), {'count': 0, 'lat_sum': 0.0, 'lon_sum': 0.0, 'types': {}})
+        cluster['count'] += count
+        cluster['lat_sum'] += lat_sum
+        cluster['lon_sum'] += lon_sum
+        cluster['types'][poi_type] = count
+
+    return [
+        {
+            'latitude': round(c['lat_sum'] / c['count'], 6),
+            'longitude': round(c['lon_sum'] / c['count'], 6),
+            'count': c['count'],
+            'types': c['types'],
+        }
+        for c in merged.values()
+    ]
+
+
+def points_in_bbox(bbox, poi_types, limit):
+    """
+    Individual POIs inside the viewport, used above CLUSTER_MAX_ZOOM: read
+    from the POI index through the geohash cells covering the box, in type
+    then id order so the same ``limit`` points come back every time.
+    """
+    west, south, east, north = bbox
+    # Ranges rather than __startswith, as in core.spatial
+    cell_filter = reduce(or_, (Q(geohash__gte=cell, geohash__lt=cell + '{')
+                               for cell in bbox_cells(west, south, east, north)))
+    rows = POIIndex.objects.filter(
+        cell_filter, poi_type__in=poi_types, latitude__range=(south, north), longitude__range=(west, east),
+    ).order_by('poi_type', 'object_id').values('poi_type', 'object_id', 'name', 'latitude', 'longitude', 'image')
+    return [
+        {
+            'type': row['poi_type'],
+            'id': row['object_id'],
+            'name': row['name'],
+            'latitude': str(row['latitude']),
+            'longitude': str(row['longitude']),
+            'image': row['image'],
+        }
+        for row in rows[:limit]
+    ]
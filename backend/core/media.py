@@ -0,0 +1,189 @@
+"""
+Responsive variants of the images under MEDIA_ROOT.
+
+Every source image gets one file per width and format
+(``variants/locations/hibis-640w.webp``), rendered in a process pool.
+``variants/manifest.json`` maps each source to its content hash and
+variants; a source whose size and mtime are unchanged, or whose content
+hashes the same, is skipped on the next run. Changing the widths or
+formats re-renders everything.
+"""
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .images import THUMBNAIL_FORMATS, THUMBNAIL_VERSION, file_sha256
+
+MEDIA_DIRS = ('locations', 'hotels', 'products', 'team_photos', 'artifacts', 'governor_photos')
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = tuple(fmt for fmt in ('webp', 'avif') if fmt in THUMBNAIL_FORMATS)
+MANIFEST_NAME = 'manifest.json'
+
+
+def variants_dir():
+    return getattr(settings, 'MEDIA_VARIANTS_DIR', os.path.join(settings.MEDIA_ROOT, 'variants'))
+
+
+def scan(media_root, directories):
+    """(relative path, variant base name) of every source image, sorted."""
+    sources = []
+    for directory in directories:
+        try:
+            names = sorted(os.listdir(os.path.join(media_root, directory)))
+        except FileNotFoundError:
+            continue
+        names = [name for name in names if name.lower().endswith(SOURCE_EXTENSIONS)]
+        stems = Counter(os.path.splitext(name)[0] for name in names)
+        for name in names:
+            stem, extension = os.path.splitext(name)
+            # hibis.jpg and hibis.png would otherwise share hibis-640w.webp
+            base = stem if stems[stem] == 1 else f'{stem}_{extension[1:].lower()}'
+            sources.append((f'{directory}/{name}', f'{directory}/{base}'))
+    return sources
+
+
+def render_variants(source_path, output_base, widths, formats):
+    """
+    Write ``<output_base>-<width>w.<fmt>`` for every width not wider than
+    the source (or one at the source width if it is narrower than all of
+    them). Returns the variant entries for the manifest.
+    """
+    variants = []
+    with Image.open(source_path) as original:
+        original.draft(None, (max(widths), 1))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        targets = sorted({min(width, image.width) for width in widths}, reverse=True)
+        # Largest first; each size is downscaled from the previous one
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            if width != image.width:
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                pil_format, _, options = THUMBNAIL_FORMATS[fmt]
+                rendered = image
+                if pil_format == 'JPEG' and image.mode == 'RGBA':
+                    rendered = image.convert('RGB')
+                path = f'{output_base}-{width}w.{fmt}'
+                rendered.save(path, pil_format, **options)
+                variants.append({"width": width, "height": height, "format": fmt,
+                                 "bytes": os.path.getsize(path)})
+    return variants
+
+
+def _process(task):
+    """Worker entry point; never raises so one bad file cannot stop the pool."""
+    rel, source_path, output_base, widths, formats = task
+    try:
+        digest = file_sha256(source_path)
+        os.makedirs(os.path.dirname(output_base), exist_ok=True)
+        return rel, digest, render_variants(source_path, output_base, widths, formats), ''
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as exc:
+        return rel, '', [], str(exc)
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"files": {}}
+
+
+def _variant_files(entry):
+    return [f"{entry['base']}-{v['width']}w.{v['format']}" for v in entry['variants']]
+
+
+def _remove_variants(directory, names):
+    for name in names:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+def _unchanged(previous, spec, source_path, directory):
+    if previous is None or previous.get('spec') != spec:
+        return False
+    if not all(os.path.exists(os.path.join(directory, name)) for name in _variant_files(previous)):
+        return False
+    stat = os.stat(source_path)
+    if (previous['size'], previous['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+        return True
+    # Touched but maybe not modified (copied, checked out again)
+    if file_sha256(source_path) == previous['sha256']:
+        previous['size'], previous['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+        return True
+    return False
+
+
+def process_media(directories=MEDIA_DIRS, workers=None, widths=VARIANT_WIDTHS, formats=VARIANT_FORMATS,
+                  force=False, media_root=None, output_dir=None):
+    """
+    Render the variants of every new or changed source image with
+    ``workers`` processes (1 runs inline) and rewrite the manifest.
+    Returns {"processed", "unchanged", "removed", "variants", "failed":
+    [(path, error)], "seconds"}.
+    """
+    media_root = str(media_root or settings.MEDIA_ROOT)
+    directory = str(output_dir or variants_dir())
+    workers = workers or os.cpu_count() or 1
+    spec = f"{','.join(map(str, widths))}:{','.join(formats)}:{THUMBNAIL_VERSION}"
+    started = time.perf_counter()
+
+    manifest = read_manifest(directory)
+    files = manifest["files"]
+    tasks = []
+    summary = {"processed": 0, "unchanged": 0, "removed": 0, "variants": 0, "failed": []}
+    sources = dict(scan(media_root, directories))
+    for rel, base in sources.items():
+        source_path = os.path.join(media_root, rel)
+        previous = files.get(rel)
+        if not force and previous and previous['base'] == base \
+                and _unchanged(previous, spec, source_path, directory):
+            summary["unchanged"] += 1
+            continue
+        tasks.append((rel, source_path, os.path.join(directory, base), widths, formats))
+
+    def record(rel, digest, variants, error):
+        previous = files.pop(rel, None)
+        stale = set(_variant_files(previous)) if previous else set()
+        if error:
+            summary["failed"].append((rel, error))
+        else:
+            stat = os.stat(os.path.join(media_root, rel))
+            files[rel] = {"base": sources[rel], "sha256": digest, "size": stat.st_size,
+                          "mtime_ns": stat.st_mtime_ns, "spec": spec, "variants": variants}
+            stale -= set(_variant_files(files[rel]))
+            summary["processed"] += 1
+            summary["variants"] += len(variants)
+        # Widths, formats or the base name may have changed since the last run
+        _remove_variants(directory, stale)
+
+    if workers == 1:
+        for task in tasks:
+            record(*_process(task))
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for future in as_completed([executor.submit(_process, task) for task in tasks]):
+                record(*future.result())
+
+    # Sources deleted from the scanned directories take their variants along
+    for rel in [rel for rel in files if rel.split('/', 1)[0] in directories and rel not in sources]:
+        _remove_variants(directory, _variant_files(files.pop(rel)))
+        summary["removed"] += 1
+
+    os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f'{MANIFEST_NAME}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"spec": spec, "files": dict(sorted(files.items()))}, f, indent=1)
+    os.replace(tmp, os.path.join(directory, MANIFEST_NAME))
+    summary["seconds"] = time.perf_counter() - started
+    return summary
@@ -0,0 +1,276 @@
+"""
+Set-based fuzzy merge of imported POIs into the catalog.
+
+Names are normalized (Arabic folding, case folding, punctuation dropped)
+and split into character trigrams. A BlockingIndex maps each trigram to
+the rows containing it, so an incoming name is only scored against rows
+sharing one of its rarest trigrams (prefix filtering: any row reaching
+the Dice threshold must share at least one of them). Every write is
+collected first and committed with bulk_create/bulk_update in a single
+transaction, followed by one ``bulk_changed`` signal per model so the
+derived indexes catch up.
+"""
+import math
+import re
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from .search import normalize_arabic
+from .signals import bulk_changed
+
+DEFAULT_THRESHOLD = 0.75
+BATCH_SIZE = 500
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_name(name):
+    return ' '.join(_WORD.findall(normalize_arabic(name or '').casefold()))
+
+
+def trigrams(name):
+    padded = f'  {normalize_name(name)} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def dice(a, b):
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class BlockingIndex:
+    """Trigram inverted index answering "best name at or above threshold"."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._grams = {}
+        self._postings = defaultdict(list)
+
+    def __len__(self):
+        return len(self._grams)
+
+    def add(self, key, name):
+        grams = trigrams(name)
+        self._grams[key] = grams
+        for gram in grams:
+            self._postings[gram].append(key)
+
+    def best_match(self, name):
+        """(key, score) of the closest indexed name, or (None, 0.0) below the threshold."""
+        grams = trigrams(name)
+        if not grams:
+            return None, 0.0
+        # Dice >= t implies |A & B| >= t|A| / (2 - t); probing the |A| - that + 1
+        # rarest trigrams is enough to meet every qualifying row
+        overlap = math.ceil(self.threshold * len(grams) / (2 - self.threshold))
+        probe = sorted(grams, key=lambda g: (len(self._postings.get(g, ())), g))[:len(grams) - overlap + 1]
+        candidates = set()
+        for gram in probe:
+            candidates.update(self._postings.get(gram, ()))
+
+        best, best_score = None, 0.0
+        for key in sorted(candidates):
+            score = dice(grams, self._grams[key])
+            if score > best_score:
+                best, best_score = key, score
+        if best_score < self.threshold:
+            return None, 0.0
+        return best, best_score
+
+
+class MergePlan:
+    """
+    Pending creates and updates for one model. Existing rows are keyed by
+    pk, rows created earlier in the same batch by negative keys, so
+    duplicates inside the import are merged too.
+    """
+
+    def __init__(self, model, threshold=DEFAULT_THRESHOLD):
+        self.model = model
+        self.index = BlockingIndex(threshold)
+        self.rows = {}
+        self.creates = []
+        self.updated_fields = defaultdict(set)
+        self.report = []
+        for instance in model.objects.all():
+            self.rows[instance.pk] = instance
+            self.index.add(instance.pk, instance.name)
+
+    def merge(self, name, defaults, enrich=None):
+        """
+        Match ``name`` against the catalog; enrich the match in place with
+        ``enrich(instance)`` (returns the changed field names) or plan a
+        new row built from ``defaults``.
+        """
+        key, score = self.index.best_match(name)
+        if key is None:
+            instance = self.model(name=name, **defaults)
+            key = -(len(self.creates) + 1)
+            self.rows[key] = instance
+            self.index.add(key, name)
+            self.creates.append(instance)
+            self.report.append({"action": "create", "name": name})
+            return instance
+
+        instance = self.rows[key]
+        changed = list(enrich(instance)) if enrich else []
+        if key > 0 and changed:
+            self.updated_fields[key].update(changed)
+        entry = {"action": "update" if changed else "unchanged", "name": name,
+                 "match": instance.name, "score": round(score, 3), "fields": changed}
+        if key > 0:
+            entry["id"] = key
+        self.report.append(entry)
+        return instance
+
+    def apply(self, send_signal=True):
+        """Write the plan with bulk queries; returns (created, updated) counts."""
+        for instance in self.creates:
+            if hasattr(instance, 'refresh_geohash'):
+                instance.refresh_geohash()
+        created = self.model.objects.bulk_create(self.creates, batch_size=BATCH_SIZE)
+
+        updated = [self.rows[pk] for pk in self.updated_fields]
+        if updated:
+            fields = set().union(*self.updated_fields.values())
+            if any(f.name == 'updated_at' for f in self.model._meta.concrete_fields):
+                # bulk_update skips auto_now; sync clients rely on it
+                now = timezone.now()
+                for instance in updated:
+                    instance.updated_at = now
+                fields.add('updated_at')
+            if 'latitude' in fields or 'longitude' in fields:
+                for instance in updated:
+                    instance.refresh_geohash()
+                fields.add('geohash')
+            self.model.objects.bulk_update(updated, sorted(fields), batch_size=BATCH_SIZE)
+
+        if send_signal and (created or updated):
+            bulk_changed.send(sender=self.model, pks=[i.pk for i in created] + [i.pk for i in updated])
+        return len(created), len(updated)
+
+
+def enrich_description_and_phone(description, phone=None):
+    """The enrichment rule of the original import: prefer longer descriptions, fill blanks."""
+    def enrich(instance):
+        changed = []
+        if not instance.description or len(description) > len(instance.description):
+            if instance.description != description:
+                instance.description = description
+                changed.append('description')
+        if phone and hasattr(instance, 'phone_number') and not instance.phone_number:
+            instance.phone_number = phone
+            changed.append('phone_number')
+        return changed
+    return enrich
+
+
+# Dataset categories (see smart_merge_pois.py) and the model they become
+ATTRACTION_CATEGORIES = ("Historical & Heritage", "Nature & Safari", "Culture & Museums", "Wellness")
+SERVICE_CATEGORIES = ("Dining", "Medical Services", "Services")
+DEFAULT_COORDINATES = {"latitude": Decimal("25.4400"), "longitude": Decimal("30.5500")}
+
+
+def attraction_type_for(category):
+    if "Heritage" in category or "Historical" in category:
+        return "historical"
+    if "Nature" in category or "Safari" in category:
+        return "natural"
+    return "cultural"
+
+
+def star_rating(rating):
+    try:
+        return int(str(rating).split()[0])
+    except (IndexError, ValueError):
+        return 3
+
+
+def price_range_for(stars):
+    if stars >= 4:
+        return "$$$"
+    if stars >= 3:
+        return "$$"
+    return "$"
+
+
+def merge_dataset(items, threshold=DEFAULT_THRESHOLD, dry_run=False):
+    """
+    Merge dataset items ({"category", "name_en", "description", "notes",
+    "location", "contact", "rating", "address"}) into the catalog in one
+    transaction. With ``dry_run`` the transaction is rolled back after
+    planning, so the report is exact but nothing is stored.
+    Returns {type: {"created", "updated", "report"}} plus "skipped" names.
+    """
+    Attraction = apps.get_model('tourism', 'Attraction')
+    Hotel = apps.get_model('hospitality', 'Hotel')
+    Service = apps.get_model('services', 'Service')
+    ServiceCategory = apps.get_model('services', 'ServiceCategory')
+    Product = apps.get_model('marketplace', 'Product')
+
+    with transaction.atomic():
+        service_categories = {
+            name: ServiceCategory.objects.get_or_create(name=name, defaults={"slug": name.lower()})[0]
+            for name in ("Restaurant", "Hospital", "Bank")
+        }
+        plans = {
+            "attraction": MergePlan(Attraction, threshold),
+            "hotel": MergePlan(Hotel, threshold),
+            "service": MergePlan(Service, threshold),
+            "product": MergePlan(Product, threshold),
+        }
+        skipped = []
+
+        for item in items:
+            category = item.get("category", "")
+            name = item.get("name_en", "")
+            location = item.get("location", "New Valley, Egypt")
+            description = f"{item.get('description', '')} {item.get('notes', '')}".strip()
+
+            if category == "Accommodation":
+                stars = star_rating(item.get("rating", "3 Stars"))
+                plans["hotel"].merge(name, dict(
+                    description=description, stars=stars, price_range=price_range_for(stars),
+                    phone_number=item.get("contact", "+20 92 7XX XXXX"),
+                    booking_url="https://www.booking.com/searchresults.html?ss=New+Valley+Egypt",
+                    address=location, **DEFAULT_COORDINATES,
+                ), enrich_description_and_phone(description, item.get("contact")))
+            elif category in ATTRACTION_CATEGORIES:
+                plans["attraction"].merge(name, dict(
+                    description=description, attraction_type=attraction_type_for(category),
+                    visit_duration_minutes=90, opening_time="08:00", closing_time="17:00",
+                    ticket_price=Decimal("0.00"), address=location, **DEFAULT_COORDINATES,
+                ), enrich_description_and_phone(description))
+            elif category in SERVICE_CATEGORIES:
+                if "Medical" in category:
+                    service_category = service_categories["Hospital"]
+                elif "Banking" in category:
+                    service_category = service_categories["Bank"]
+                else:
+                    service_category = service_categories["Restaurant"]
+                plans["service"].merge(name, dict(
+                    description=description, category=service_category,
+                    is_emergency=("Hospital" in name or "Emergency" in name),
+                    phone_number=item.get("contact", "N/A"),
+                    address=item.get("address", location), **DEFAULT_COORDINATES,
+                ), enrich_description_and_phone(description, item.get("contact")))
+            elif category == "Local Industry":
+                plans["product"].merge(name, dict(
+                    description=description, price=Decimal("15.00"),
+                    seller_name="New Valley Artisans", seller_contact="+20 100 XXX XXXX",
+                ), enrich_description_and_phone(description))
+            else:
+                skipped.append(name)
+
+        result = {"skipped": skipped}
+        for doc_type, plan in plans.items():
+            created, updated = plan.apply(send_signal=not dry_run)
+            result[doc_type] = {"created": created, "updated": updated, "report": plan.report}
+        if dry_run:
+            transaction.set_rollback(True)
+    return result
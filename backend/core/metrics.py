@@ -0,0 +1,176 @@
+"""
+In-process request metrics per endpoint.
+
+core.middleware.MetricsMiddleware records every request's wall time,
+database time and query count, render time and response size into
+log-linear histograms (the HdrHistogram bucket layout) keyed by the
+resolved view name. ``registry.prometheus_text()`` renders them as
+Prometheus summaries for /api/internal/metrics/. Histograms live in the
+process, so every worker reports its own.
+"""
+import threading
+from collections import defaultdict, deque
+
+# 2**SUB_BITS buckets per power of two: bucket bounds are within
+# 1 / 2**(SUB_BITS - 1) (about 3%) of every value counted in them
+SUB_BITS = 6
+QUANTILES = (0.5, 0.9, 0.99)
+# Recorded samples are bucketed in batches of this many (or when scraped)
+FOLD_EVERY = 256
+UNMATCHED = 'unmatched'
+
+
+class Histogram:
+    """
+    Log-linear histogram of non-negative integers. Values below
+    2**SUB_BITS get a bucket each; a value with ``n`` more bits than that
+    shares its bucket with the values equal in the top SUB_BITS bits.
+    Recording is a few integer operations and a dict update.
+    """
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        shift = value.bit_length() - SUB_BITS
+        if shift > 0:
+            self.counts[(shift << SUB_BITS) + (value >> shift)] += 1
+        else:
+            self.counts[value] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @staticmethod
+    def bucket_high(index):
+        """Largest value counted in bucket ``index``."""
+        shift, sub = index >> SUB_BITS, index & ((1 << SUB_BITS) - 1)
+        return index if shift == 0 else ((sub + 1) << shift) - 1
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the ``fraction`` quantile (0 when empty)."""
+        if not self.count:
+            return 0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_high(index), self.max)
+        return self.max
+
+    def copy(self):
+        clone = Histogram()
+        clone.counts.update(self.counts)
+        clone.count, clone.total, clone.max = self.count, self.total, self.max
+        return clone
+
+
+class EndpointMetrics:
+    __slots__ = ('duration_us', 'db_us', 'queries', 'render_us', 'bytes', 'statuses')
+
+    def __init__(self):
+        self.duration_us = Histogram()
+        self.db_us = Histogram()
+        self.queries = Histogram()
+        self.render_us = Histogram()
+        self.bytes = Histogram()
+        self.statuses = defaultdict(int)
+
+
+# (metric name, EndpointMetrics attribute, divisor to the exported unit, help)
+SUMMARIES = (
+    ('http_request_duration_seconds', 'duration_us', 1e6, "Wall time from the first middleware to the response"),
+    ('http_request_db_seconds', 'db_us', 1e6, "Time spent executing SQL"),
+    ('http_request_db_queries', 'queries', 1, "SQL queries executed"),
+    ('http_response_render_seconds', 'render_us', 1e6, "Time rendering the response body (JSON encoding)"),
+    ('http_response_bytes', 'bytes', 1, "Response body size"),
+)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _export(value, divisor):
+    """``value`` in the exported unit (seconds for the microsecond histograms)."""
+    return f"{value / divisor:.6g}" if divisor != 1 else str(value)
+
+
+class MetricsRegistry:
+    """
+    Process-local histograms per endpoint. ``record`` only appends the
+    sample to a deque (thread-safe without a lock); samples are bucketed
+    under the lock every FOLD_EVERY requests and before each read.
+    """
+
+    def __init__(self, prefix='nvh_'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(EndpointMetrics)
+        self._pending = deque()
+
+    def record(self, endpoint, status, duration_us, db_us, queries, render_us, size):
+        self._pending.append((endpoint, status, duration_us, db_us, queries, render_us, size))
+        if len(self._pending) >= FOLD_EVERY:
+            self._fold()
+
+    def _fold(self):
+        with self._lock:
+            pending = self._pending
+            while pending:
+                endpoint, status, duration_us, db_us, queries, render_us, size = pending.popleft()
+                metrics = self._endpoints[endpoint]
+                metrics.duration_us.record(duration_us)
+                metrics.db_us.record(db_us)
+                metrics.queries.record(queries)
+                metrics.render_us.record(render_us)
+                metrics.bytes.record(size)
+                metrics.statuses[status] += 1
+
+    def snapshot(self):
+        """{endpoint: EndpointMetrics} copied under the lock."""
+        self._fold()
+        with self._lock:
+            copies = {}
+            for endpoint, metrics in self._endpoints.items():
+                clone = EndpointMetrics()
+                for _, attribute, _, _ in SUMMARIES:
+                    setattr(clone, attribute, getattr(metrics, attribute).copy())
+                clone.statuses.update(metrics.statuses)
+                copies[endpoint] = clone
+            return copies
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._endpoints.clear()
+
+    def prometheus_text(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        endpoints = sorted(self.snapshot().items())
+        lines = []
+        name = f'{self.prefix}http_responses_total'
+        lines += [f"# HELP {name} Responses by endpoint and status code", f"# TYPE {name} counter"]
+        for endpoint, metrics in endpoints:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'{name}{{endpoint="{_label(endpoint)}",status="{status}"}} {count}')
+        for metric, attribute, divisor, help_text in SUMMARIES:
+            name = f'{self.prefix}{metric}'
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for endpoint, metrics in endpoints:
+                histogram = getattr(metrics, attribute)
+                label = f'endpoint="{_label(endpoint)}"'
+                for fraction in QUANTILES:
+                    lines.append(f'{name}{{{label},quantile="{fraction}"}} {_export(histogram.quantile(fraction), divisor)}')
+                lines.append(f'{name}_sum{{{label}}} {_export(histogram.total, divisor)}')
+                lines.append(f'{name}_count{{{label}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,128 @@
+from contextvars import ContextVar
+from time import perf_counter_ns
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+
+from . import querywatch
+from .metrics import UNMATCHED, registry
+
+# Timer of the request being handled in this thread/task, None outside requests
+_current_timer = ContextVar('metrics_timer', default=None)
+
+
+class _RequestTimer:
+    """SQL time and count of one request; also holds its render time."""
+    __slots__ = ('queries', 'db_ns', 'render_ns')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ns = 0
+        self.render_ns = 0
+
+
+def time_queries(execute, sql, params, many, context):
+    """Execute wrapper charging each query to the current request's timer."""
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.db_ns += perf_counter_ns() - started
+        timer.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    connection_created receiver: add time_queries to the connection's
+    execute wrappers for good. Entering connection.execute_wrapper() per
+    request would cost more than the rest of the middleware together (the
+    connection proxy is a thread/task-local lookup).
+    """
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_queries)
+
+
+class MetricsMiddleware:
+    """
+    Records wall time, SQL time and count, render time and response size
+    per resolved view name into core.metrics.registry, and reports them
+    in a Server-Timing header (unless METRICS_SERVER_TIMING is false).
+    Goes first in MIDDLEWARE so the wall time covers the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', True)
+
+    def __call__(self, request):
+        started = perf_counter_ns()
+        timer = _RequestTimer()
+        token = _current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        elapsed_ns = perf_counter_ns() - started
+
+        match = request.resolver_match
+        if response.streaming:
+            size = int(response.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        registry.record(
+            match.view_name if match else UNMATCHED, response.status_code, elapsed_ns // 1000,
+            timer.db_ns // 1000, timer.queries, timer.render_ns // 1000, size,
+        )
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'app;dur={elapsed_ns / 1e6:.2f}, db;dur={timer.db_ns / 1e6:.2f};desc="{timer.queries} queries", '
+                f'render;dur={timer.render_ns / 1e6:.2f}'
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        """DRF responses are rendered right after this hook; time the render."""
+        timer = _current_timer.get()
+        if timer is not None:
+            render = response.render
+
+            def timed_render():
+                started = perf_counter_ns()
+                try:
+                    return render()
+                finally:
+                    timer.render_ns += perf_counter_ns() - started
+                    del response.render
+            response.render = timed_render
+        return response
+
+
+class QueryWatchMiddleware:
+    """
+    Runs every request under a core.querywatch.QueryWatcher when
+    QUERY_WATCH is 'log' (warn about repeated query shapes, the N+1
+    signature) or 'raise' (fail the request with RepeatedQueriesError);
+    unused otherwise. QUERY_WATCH_SLOW_MS also logs slow queries.
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, 'QUERY_WATCH', '')
+        if not self.mode:
+            raise MiddlewareNotUsed
+        if self.mode not in ('log', 'raise'):
+            raise ImproperlyConfigured(f"QUERY_WATCH must be 'log' or 'raise', not {self.mode!r}")
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'QUERY_WATCH_SLOW_MS', None)
+
+    def __call__(self, request):
+        with querywatch.watch_queries(slow_ms=self.slow_ms) as watcher:
+            response = self.get_response(request)
+        if watcher.repeats:
+            message = f"Repeated queries in {request.method} {request.get_full_path()}:\n{watcher.report()}"
+            if self.mode == 'raise':
+                raise querywatch.RepeatedQueriesError(message)
+            querywatch.logger.warning(message)
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapGridCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('poi_type', models.CharField(max_length=20)),
+                ('x', models.PositiveIntegerField()),
+                ('y', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('lon_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zoom', 'x', 'y', 'poi_type'), name='unique_map_grid_cell')],
+            },
+        ),
+    ]
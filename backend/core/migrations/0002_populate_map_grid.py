@@ -0,0 +1,64 @@
+import math
+from collections import defaultdict
+
+from django.db import migrations
+
+# Frozen copy of core.mapgrid as of this migration, so later changes to the
+# grid do not change what it computes (rebuild_map_grid brings it up to date)
+CLUSTER_MAX_ZOOM = 12
+GRID_SUBDIVISION = 2
+MAX_MERCATOR_LAT = 85.05112878
+
+POI_MODELS = {
+    'attraction': ('tourism', 'Attraction'),
+    'hotel': ('hospitality', 'Hotel'),
+    'service': ('services', 'Service'),
+}
+
+
+def cell_for(latitude, longitude, zoom):
+    n = 1 << (zoom + GRID_SUBDIVISION)
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, float(latitude)))
+    lat_rad = math.radians(lat)
+    x = int((float(longitude) + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def populate_map_grid(apps, schema_editor):
+    MapGridCell = apps.get_model('core', 'MapGridCell')
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for poi_type, (app_label, model_name) in POI_MODELS.items():
+        model = apps.get_model(app_label, model_name)
+        for latitude, longitude in model.objects.values_list('latitude', 'longitude'):
+            lat, lon = float(latitude), float(longitude)
+            for zoom in range(CLUSTER_MAX_ZOOM + 1):
+                entry = totals[(zoom, poi_type) + cell_for(lat, lon, zoom)]
+                entry[0] += 1
+                entry[1] += lat
+                entry[2] += lon
+    MapGridCell.objects.bulk_create(
+        [
+            MapGridCell(zoom=zoom, poi_type=poi_type, x=x, y=y, count=count, lat_sum=lat_sum, lon_sum=lon_sum)
+            for (zoom, poi_type, x, y), (count, lat_sum, lon_sum) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def clear_map_grid(apps, schema_editor):
+    apps.get_model('core', 'MapGridCell').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('tourism', '0008_attraction_geohash'),
+        ('hospitality', '0004_hotel_geohash'),
+        ('services', '0004_service_geohash'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_map_grid, clear_map_grid),
+    ]
@@ -0,0 +1,84 @@
+import re
+
+from django.db import migrations
+
+# Frozen copy of core.search as of this migration, so later changes to the
+# analyzer or the searchable models do not change what this one builds.
+# core.search keeps the index current from here on.
+TABLE = 'core_search_index'
+SEARCH_MODELS = {
+    'attraction': 'tourism.Attraction',
+    'hotel': 'hospitality.Hotel',
+    'service': 'services.Service',
+    'product': 'marketplace.Product',
+    'artifact': 'tourism.DigitalArtifact',
+}
+TYPE_CODES = {'attraction': 1, 'hotel': 2, 'service': 3, 'product': 4, 'artifact': 5}
+TYPE_BITS = 3
+
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+TOKEN = re.compile(r'\w+', re.UNICODE)
+ENGLISH_SUFFIXES = ('ies', 'ied', 'ing', 'ed', 'es', 's')
+
+
+def stem_english(word):
+    if not word.isascii() or len(word) <= 3:
+        return word
+    for suffix in ENGLISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            stem = word[:-len(suffix)]
+            if suffix in ('ies', 'ied'):
+                return stem + 'y'
+            if suffix == 'es' and not stem.endswith(('s', 'x', 'z', 'ch', 'sh')):
+                continue
+            if suffix == 's' and stem.endswith(('s', 'u', 'i')):
+                return word
+            if suffix in ('ing', 'ed') and len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                return stem[:-1]
+            return stem
+    return word
+
+
+def analyze(text):
+    folded = ARABIC_DIACRITICS.sub('', text or '').translate(ARABIC_FOLD).lower()
+    return ' '.join(stem_english(token) for token in TOKEN.findall(folded))
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} "
+        f"USING fts5(doc_type UNINDEXED, name, body, tokenize='unicode61 remove_diacritics 2')"
+    )
+    for doc_type, label in SEARCH_MODELS.items():
+        model = apps.get_model(label)
+        for pk, name, description in model.objects.values_list('pk', 'name', 'description'):
+            schema_editor.execute(
+                f"INSERT INTO {TABLE} (rowid, doc_type, name, body) VALUES (%s, %s, %s, %s)",
+                [(pk << TYPE_BITS) | TYPE_CODES[doc_type], doc_type, analyze(name), analyze(description)],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_populate_map_grid'),
+        ('marketplace', '0002_alter_product_image'),
+        ('tourism', '0008_attraction_geohash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
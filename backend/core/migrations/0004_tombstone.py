@@ -0,0 +1,22 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
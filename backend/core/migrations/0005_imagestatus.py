@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('url', models.URLField(max_length=500)),
+                ('ok', models.BooleanField(db_index=True, default=False)),
+                ('status_code', models.PositiveSmallIntegerField(default=0, help_text='HTTP status; 0 if no response')),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('size_bytes', models.PositiveIntegerField(blank=True, null=True)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('checked_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'Image statuses',
+                'constraints': [models.UniqueConstraint(fields=('doc_type', 'object_id'), name='unique_image_status')],
+            },
+        ),
+    ]
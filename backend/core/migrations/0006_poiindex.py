@@ -0,0 +1,131 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:02
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of core.poiindex.rebuild and core.search.analyze as of this
+# migration, so later changes to either do not change what this one builds.
+# core.poiindex keeps the index current from here on.
+POI_MODELS = {
+    'attraction': 'tourism.Attraction',
+    'hotel': 'hospitality.Hotel',
+    'service': 'services.Service',
+}
+CATEGORY_FIELDS = {
+    'attraction': 'attraction_type',
+    'hotel': 'stars',
+    'service': 'category_id',
+}
+SOURCE_FIELDS = ('pk', 'name', 'description', 'image', 'latitude', 'longitude', 'geohash', 'updated_at')
+BATCH_SIZE = 1000
+PATH_STEP = 9
+
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+TOKEN = re.compile(r'\w+', re.UNICODE)
+ENGLISH_SUFFIXES = ('ies', 'ied', 'ing', 'ed', 'es', 's')
+
+
+def stem_english(word):
+    if not word.isascii() or len(word) <= 3:
+        return word
+    for suffix in ENGLISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            stem = word[:-len(suffix)]
+            if suffix in ('ies', 'ied'):
+                return stem + 'y'
+            if suffix == 'es' and not stem.endswith(('s', 'x', 'z', 'ch', 'sh')):
+                continue
+            if suffix == 's' and stem.endswith(('s', 'u', 'i')):
+                return word
+            if suffix in ('ing', 'ed') and len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                return stem[:-1]
+            return stem
+    return word
+
+
+def analyze(text):
+    folded = ARABIC_DIACRITICS.sub('', text or '').translate(ARABIC_FOLD).lower()
+    return ' '.join(stem_english(token) for token in TOKEN.findall(folded))
+
+
+def category_paths(apps):
+    rows = list(apps.get_model('services', 'ServiceCategory').objects.values_list('pk', 'name', 'path'))
+    names = {pk: name for pk, name, _ in rows}
+    paths = {}
+    for pk, name, path in rows:
+        ancestors = [int(path[i:i + PATH_STEP - 1]) for i in range(0, len(path), PATH_STEP)]
+        paths[pk] = ' > '.join(names[a] for a in ancestors if a in names) if path else name
+    return paths
+
+
+def category_rule(poi_type, model, apps):
+    if poi_type == 'attraction':
+        labels = dict(model._meta.get_field('attraction_type').choices)
+        return lambda value: labels.get(value, value or '')
+    if poi_type == 'hotel':
+        return lambda stars: f"{stars}-Star" if stars else "Unrated"
+    paths = category_paths(apps)
+    return lambda category_id: paths.get(category_id, '')
+
+
+def populate_poi_index(apps, schema_editor):
+    index_model = apps.get_model('core', 'POIIndex')
+    for poi_type, label in POI_MODELS.items():
+        model = apps.get_model(label)
+        category_of = category_rule(poi_type, model, apps)
+        rows = model.objects.order_by().values_list(*SOURCE_FIELDS, CATEGORY_FIELDS[poi_type])
+        batch = []
+        for pk, name, description, image, latitude, longitude, geohash, updated_at, category_value in \
+                rows.iterator(chunk_size=2000):
+            category = category_of(category_value)
+            batch.append(index_model(
+                poi_type=poi_type, object_id=pk, name=name, latitude=latitude, longitude=longitude,
+                geohash=geohash, image=image or '', category=category,
+                search_text=analyze(f"{name} {category} {description}"), updated_at=updated_at,
+            ))
+            if len(batch) >= BATCH_SIZE:
+                index_model.objects.bulk_create(batch)
+                batch = []
+        index_model.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_imagestatus'),
+        ('tourism', '0009_digitalartifact_updated_at_and_more'),
+        ('hospitality', '0004_hotel_geohash'),
+        ('services', '0006_servicecategory_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='POIIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('poi_type', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('name', models.CharField(db_index=True, max_length=200)),
+                ('latitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('longitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('geohash', models.CharField(blank=True, db_index=True, max_length=12)),
+                ('image', models.URLField(blank=True, max_length=500)),
+                ('category', models.CharField(blank=True, help_text="Category path, e.g. 'Medical > Hospitals'", max_length=255)),
+                ('search_text', models.TextField(blank=True, help_text='Name, category and description run through search.analyze')),
+                ('updated_at', models.DateTimeField(help_text='updated_at of the source row')),
+            ],
+            options={
+                'verbose_name': 'POI index entry',
+                'verbose_name_plural': 'POI index',
+                'constraints': [models.UniqueConstraint(fields=('poi_type', 'object_id'), name='unique_poi_index_entry')],
+            },
+        ),
+        migrations.RunPython(populate_poi_index, migrations.RunPython.noop),
+    ]
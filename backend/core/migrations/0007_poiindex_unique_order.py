@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_poiindex'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='poiindex',
+            name='unique_poi_index_entry',
+        ),
+        migrations.AddConstraint(
+            model_name='poiindex',
+            constraint=models.UniqueConstraint(fields=('object_id', 'poi_type'), name='unique_poi_index_entry'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .geo import geohash_encode
+
 class BaseLocationModel(models.Model):
     """
     Abstract base model for any location-based entities
@@ -12,11 +14,113 @@ class BaseLocationModel(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
     address = models.CharField(max_length=255)
+    # Spatial index: prefix lookups on this column replace full-table scans
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Indexed for /api/sync/ deltas and the MAX(updated_at) in list ETags
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        self.refresh_geohash()
+        super().save(*args, **kwargs)
+
+    def refresh_geohash(self):
+        """Recompute the geohash from the current coordinates."""
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(self.latitude, self.longitude)
+
     def __str__(self):
         return self.name
+
+
+class MapGridCell(models.Model):
+    """
+    Pre-aggregated marker counts per map grid cell, zoom level and POI type.
+    Maintained incrementally by core.signals; see core.mapgrid.
+    """
+    zoom = models.PositiveSmallIntegerField()
+    poi_type = models.CharField(max_length=20)
+    x = models.PositiveIntegerField()
+    y = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    # Coordinate sums let the cluster centroid be updated without a rescan
+    lat_sum = models.FloatField(default=0)
+    lon_sum = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['zoom', 'x', 'y', 'poi_type'], name='unique_map_grid_cell'),
+        ]
+
+    def __str__(self):
+        return f"z{self.zoom} ({self.x}, {self.y}) {self.poi_type}: {self.count}"
+
+
+class POIIndex(models.Model):
+    """
+    Denormalized copy of every attraction, hotel and service, so
+    cross-type reads are one indexed query. Maintained by core.signals;
+    see core.poiindex.
+    """
+    poi_type = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    name = models.CharField(max_length=200, db_index=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True)
+    image = models.URLField(max_length=500, blank=True)
+    category = models.CharField(max_length=255, blank=True, help_text="Category path, e.g. 'Medical > Hospitals'")
+    search_text = models.TextField(blank=True, help_text="Name, category and description run through search.analyze")
+    updated_at = models.DateTimeField(help_text="updated_at of the source row")
+
+    class Meta:
+        verbose_name = "POI index entry"
+        verbose_name_plural = "POI index"
+        constraints = [
+            # object_id first: with poi_type leading, SQLite picks this index
+            # over the geohash ranges for find_nearby's type filter
+            models.UniqueConstraint(fields=['object_id', 'poi_type'], name='unique_poi_index_entry'),
+        ]
+
+    def __str__(self):
+        return f"{self.poi_type} #{self.object_id}: {self.name}"
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted catalog row, written by core.signals so sync
+    clients can drop it (see core.sync). Pruned by prune_tombstones.
+    """
+    doc_type = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.doc_type} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class ImageStatus(models.Model):
+    """Outcome of the last check_images run for one catalog image URL."""
+    doc_type = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    url = models.URLField(max_length=500)
+    ok = models.BooleanField(default=False, db_index=True)
+    status_code = models.PositiveSmallIntegerField(default=0, help_text="HTTP status; 0 if no response")
+    content_type = models.CharField(max_length=100, blank=True)
+    size_bytes = models.PositiveIntegerField(null=True, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "Image statuses"
+        constraints = [
+            models.UniqueConstraint(fields=['doc_type', 'object_id'], name='unique_image_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.doc_type} #{self.object_id}: {'ok' if self.ok else self.error or self.status_code}"
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class StandardCursorPagination(CursorPagination):
+    """
+    Project-wide cursor pagination. Ordering by primary key keeps cursors
+    stable while rows are inserted, and is served by the primary key index.
+
+    Paginated lists are therefore in id order, not in the model's
+    Meta.ordering: /services/items/ is no longer grouped by category and
+    name. DRF takes a cursor's position from the first ordering field
+    alone, so a non-unique one (category) would page by offset within
+    each value. Unpaginated lists such as /services/categories/<id>/services/
+    keep Meta.ordering.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
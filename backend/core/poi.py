@@ -0,0 +1,39 @@
+"""
+Registry of the point-of-interest models that live in separate apps but
+share name/coordinate/image columns, so cross-type features can address
+them by a short type key.
+"""
+from django.apps import apps
+
+POI_MODELS = {
+    'attraction': 'tourism.Attraction',
+    'hotel': 'hospitality.Hotel',
+    'service': 'services.Service',
+}
+
+
+def get_poi_model(poi_type):
+    return apps.get_model(POI_MODELS[poi_type])
+
+
+def poi_type_for_model(model):
+    """Reverse lookup of POI_MODELS; returns None for non-POI models."""
+    label = model._meta.label
+    for poi_type, model_label in POI_MODELS.items():
+        if model_label == label:
+            return poi_type
+    return None
+
+
+def parse_poi_types(raw):
+    """
+    Parse a comma separated ``types`` query parameter.
+    Raises ValueError on unknown types; empty input selects every type.
+    """
+    if not raw:
+        return list(POI_MODELS)
+    types = [t.strip().lower() for t in raw.split(',') if t.strip()]
+    unknown = [t for t in types if t not in POI_MODELS]
+    if unknown:
+        raise ValueError(f"Unknown POI type(s): {', '.join(unknown)}")
+    return types
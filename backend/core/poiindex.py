@@ -0,0 +1,111 @@
+"""
+Denormalized read model of every point of interest.
+
+POIIndex holds one row per attraction, hotel and service with the
+columns cross-type features read (name, coordinates, geohash, image,
+category path and analyzed search text), so they run one indexed query
+instead of one per table. core.signals keeps it current;
+``manage.py rebuild_poi_index`` recreates it from the source tables.
+"""
+from django.apps import apps
+
+from services import tree
+from .poi import POI_MODELS
+from .search import analyze
+
+BATCH_SIZE = 1000
+SOURCE_FIELDS = ('pk', 'name', 'description', 'image', 'latitude', 'longitude', 'geohash', 'updated_at')
+# Extra source columns the category path is built from
+CATEGORY_FIELDS = {
+    'attraction': 'attraction_type',
+    'hotel': 'stars',
+    'service': 'category_id',
+}
+UPDATE_FIELDS = ('name', 'latitude', 'longitude', 'geohash', 'image', 'category', 'search_text', 'updated_at')
+
+
+def _category_rule(poi_type, model):
+    """Function turning the CATEGORY_FIELDS value of a row into its category path."""
+    if poi_type == 'attraction':
+        labels = dict(model._meta.get_field('attraction_type').choices)
+        return lambda value: labels.get(value, value or '')
+    if poi_type == 'hotel':
+        return lambda stars: f"{stars}-Star" if stars else "Unrated"
+    paths = tree.full_paths(apps.get_model('services', 'ServiceCategory'))
+    return lambda category_id: paths.get(category_id, '')
+
+
+def iter_entries(poi_type, queryset=None):
+    """Unsaved POIIndex rows for ``queryset`` (default: every row of the type)."""
+    index_model = apps.get_model('core', 'POIIndex')
+    model = apps.get_model(POI_MODELS[poi_type])
+    category_of = _category_rule(poi_type, model)
+    if queryset is None:
+        queryset = model.objects.all()
+    rows = queryset.order_by().values_list(*SOURCE_FIELDS, CATEGORY_FIELDS[poi_type])
+    for pk, name, description, image, latitude, longitude, geohash, updated_at, category_value in \
+            rows.iterator(chunk_size=2000):
+        category = category_of(category_value)
+        yield index_model(
+            poi_type=poi_type, object_id=pk, name=name, latitude=latitude, longitude=longitude,
+            geohash=geohash, image=image or '', category=category,
+            search_text=analyze(f"{name} {category} {description}"), updated_at=updated_at,
+        )
+
+
+def _write(index_model, entries, upsert):
+    batch = []
+    written = 0
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            written += _flush(index_model, batch, upsert)
+    return written + _flush(index_model, batch, upsert)
+
+
+def _flush(index_model, batch, upsert):
+    if not batch:
+        return 0
+    if upsert:
+        index_model.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=['object_id', 'poi_type'], update_fields=UPDATE_FIELDS,
+        )
+    else:
+        index_model.objects.bulk_create(batch)
+    count = len(batch)
+    batch.clear()
+    return count
+
+
+def rebuild(poi_types=None):
+    """Recreate the entries of ``poi_types`` (default: all). Returns rows written."""
+    index_model = apps.get_model('core', 'POIIndex')
+    written = 0
+    for poi_type in poi_types or POI_MODELS:
+        index_model.objects.filter(poi_type=poi_type).delete()
+        written += _write(index_model, iter_entries(poi_type), upsert=False)
+    return written
+
+
+def refresh(poi_type, pks=None, queryset=None):
+    """
+    Upsert the entries of the source rows with primary keys ``pks`` (or
+    matching ``queryset``) and drop entries of ``pks`` that no longer exist.
+    """
+    index_model = apps.get_model('core', 'POIIndex')
+    model = apps.get_model(POI_MODELS[poi_type])
+    if queryset is not None:
+        return _write(index_model, iter_entries(poi_type, queryset), upsert=True)
+    written = 0
+    pks = list(pks)
+    # Chunks stay below SQLite's bound parameter limit
+    for start in range(0, len(pks), BATCH_SIZE):
+        chunk = pks[start:start + BATCH_SIZE]
+        written += _write(index_model, iter_entries(poi_type, model.objects.filter(pk__in=chunk)), upsert=True)
+        existing = model.objects.filter(pk__in=chunk).values('pk')
+        index_model.objects.filter(poi_type=poi_type, object_id__in=chunk).exclude(object_id__in=existing).delete()
+    return written
+
+
+def remove(poi_type, pk):
+    apps.get_model('core', 'POIIndex').objects.filter(poi_type=poi_type, object_id=pk).delete()
@@ -0,0 +1,131 @@
+"""
+N+1 and slow query detection.
+
+A QueryWatcher is a database execute wrapper that fingerprints every SQL
+statement (literals and IN lists collapsed, so ``WHERE id = 1`` and
+``WHERE id = 2`` are the same shape) and reports each shape that runs more
+than ``threshold`` times, the signature of a query per row. The report
+names the serializer field that was being rendered and keeps the project
+part of the stack at the first repeat past the threshold.
+
+Tests wrap code in ``assert_no_repeated_queries()``. At runtime
+QueryWatchMiddleware applies it to every request, set by QUERY_WATCH:
+'log' logs warnings, 'raise' fails the request with RepeatedQueriesError
+(``QUERY_WATCH=raise manage.py test`` runs the whole suite that way).
+"""
+import logging
+import re
+import sys
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.serializers import Serializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 5
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\?|%s)(?:, ?(?:\?|%s))*\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """The shape of ``sql``: literals become ?, IN lists of any length IN (...)."""
+    sql = _SPACE.sub(' ', _STRING.sub('?', sql)).strip()
+    return _IN_LIST.sub('IN (...)', _NUMBER.sub('?', sql))
+
+
+class RepeatedQueriesError(AssertionError):
+    pass
+
+
+@dataclass
+class Repeat:
+    fingerprint: str
+    count: int
+    field: str
+    stack: list = field(repr=False)
+
+    def __str__(self):
+        where = f" rendering {self.field}" if self.field else ""
+        return f"{self.count}x{where}: {self.fingerprint}\n" + ''.join(traceback.format_list(self.stack)).rstrip()
+
+
+def serializer_field(frame):
+    """'SerializerClass.field' being rendered at ``frame`` (innermost first), or ''."""
+    while frame is not None:
+        if frame.f_code.co_name == 'to_representation':
+            serializer = frame.f_locals.get('self')
+            current = frame.f_locals.get('field')
+            if isinstance(serializer, Serializer) and current is not None:
+                return f"{type(serializer).__name__}.{current.field_name}"
+        frame = frame.f_back
+    return ''
+
+
+def project_stack(frame):
+    """The stack at ``frame`` limited to this project's files, outermost first."""
+    root = str(settings.BASE_DIR)
+    return [entry for entry in traceback.extract_stack(frame)
+            if entry.filename.startswith(root) and 'site-packages' not in entry.filename]
+
+
+class QueryWatcher:
+    """
+    Execute wrapper counting queries per fingerprint. Queries slower than
+    ``slow_ms`` (when given) are logged as they happen.
+    """
+
+    def __init__(self, threshold=None, slow_ms=None):
+        self.threshold = threshold or getattr(settings, 'QUERY_WATCH_THRESHOLD', DEFAULT_THRESHOLD)
+        self.slow_ms = slow_ms
+        self.counts = {}
+        self.first_repeats = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (perf_counter() - started) * 1000
+            shape = fingerprint(sql)
+            count = self.counts[shape] = self.counts.get(shape, 0) + 1
+            if count == self.threshold + 1:
+                frame = sys._getframe(1)
+                self.first_repeats[shape] = (serializer_field(frame), project_stack(frame))
+            if self.slow_ms is not None and elapsed_ms > self.slow_ms:
+                frame = sys._getframe(1)
+                where = serializer_field(frame)
+                logger.warning("Slow query (%.1f ms)%s: %s\n%s", elapsed_ms, f" rendering {where}" if where else "",
+                               sql, ''.join(traceback.format_list(project_stack(frame))).rstrip())
+
+    @property
+    def repeats(self):
+        """Repeat per fingerprint that ran more than ``threshold`` times, most frequent first."""
+        found = [Repeat(shape, self.counts[shape], *where) for shape, where in self.first_repeats.items()]
+        return sorted(found, key=lambda repeat: -repeat.count)
+
+    def report(self):
+        return '\n\n'.join(str(repeat) for repeat in self.repeats)
+
+
+@contextmanager
+def watch_queries(threshold=None, slow_ms=None, using=DEFAULT_DB_ALIAS):
+    watcher = QueryWatcher(threshold, slow_ms)
+    with connections[using].execute_wrapper(watcher):
+        yield watcher
+
+
+@contextmanager
+def assert_no_repeated_queries(threshold=None, using=DEFAULT_DB_ALIAS):
+    """Fail with RepeatedQueriesError if a query shape runs more than ``threshold`` times inside."""
+    with watch_queries(threshold, using=using) as watcher:
+        yield watcher
+    if watcher.repeats:
+        raise RepeatedQueriesError(f"Repeated queries (threshold {watcher.threshold}):\n{watcher.report()}")
@@ -0,0 +1,239 @@
+"""
+Unified full-text search over the catalog.
+
+Text is run through ``analyze`` (Arabic letter folding, diacritic
+stripping, light English stemming) both when indexing and when querying,
+so the backend only has to match plain tokens. The backend is pluggable
+through settings.SEARCH_BACKEND; by default SQLite databases keep an FTS5
+table ranked with BM25 and other databases use DatabaseSearchBackend.
+"""
+import re
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+SEARCH_MODELS = {
+    'attraction': 'tourism.Attraction',
+    'hotel': 'hospitality.Hotel',
+    'service': 'services.Service',
+    'product': 'marketplace.Product',
+    'artifact': 'tourism.DigitalArtifact',
+}
+# Stable small integers used to pack (type, id) into an FTS rowid
+TYPE_CODES = {'attraction': 1, 'hotel': 2, 'service': 3, 'product': 4, 'artifact': 5}
+TYPE_BITS = 3
+
+# Arabic harakat, superscript alef and tatweel
+_ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+})
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+_ENGLISH_SUFFIXES = ('ies', 'ied', 'ing', 'ed', 'es', 's')
+
+
+def normalize_arabic(text):
+    return _ARABIC_DIACRITICS.sub('', text).translate(_ARABIC_FOLD)
+
+
+@lru_cache(maxsize=4096)
+def stem_english(word):
+    """A deliberately small suffix stripper; good enough for catalog text."""
+    if not word.isascii() or len(word) <= 3:
+        return word
+    for suffix in _ENGLISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            stem = word[:-len(suffix)]
+            if suffix in ('ies', 'ied'):
+                return stem + 'y'
+            if suffix == 'es' and not stem.endswith(('s', 'x', 'z', 'ch', 'sh')):
+                # temples -> temple, but boxes -> box
+                continue
+            if suffix == 's' and stem.endswith(('s', 'u', 'i')):
+                return word
+            if suffix in ('ing', 'ed') and len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                # running -> run, stopped -> stop
+                return stem[:-1]
+            return stem
+    return word
+
+
+def tokenize(text):
+    return [stem_english(token) for token in _TOKEN.findall(normalize_arabic(text or '').lower())]
+
+
+def analyze(text):
+    return ' '.join(tokenize(text))
+
+
+def get_search_model(doc_type):
+    return apps.get_model(SEARCH_MODELS[doc_type])
+
+
+def search_type_for_model(model):
+    label = model._meta.label
+    for doc_type, model_label in SEARCH_MODELS.items():
+        if model_label == label:
+            return doc_type
+    return None
+
+
+class BaseSearchBackend:
+    """Interface for search backends; see SQLiteFTS5Backend."""
+
+    def index(self, doc_type, pk, name, description):
+        raise NotImplementedError
+
+    def remove(self, doc_type, pk):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, query, doc_types, limit):
+        """Return [(doc_type, pk, score)] best match first (lower score is better)."""
+        raise NotImplementedError
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    Inverted index in an FTS5 virtual table (created by core migration
+    0003). The rowid packs (type, id) so updates and deletes are point
+    lookups; name matches weigh ten times more than description matches.
+    """
+    table = 'core_search_index'
+    name_weight = 10.0
+    body_weight = 1.0
+
+    @staticmethod
+    def rowid(doc_type, pk):
+        return (pk << TYPE_BITS) | TYPE_CODES[doc_type]
+
+    def index(self, doc_type, pk, name, description):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [self.rowid(doc_type, pk)])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, doc_type, name, body) VALUES (%s, %s, %s, %s)",
+                [self.rowid(doc_type, pk), doc_type, analyze(name), analyze(description)],
+            )
+
+    def remove(self, doc_type, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [self.rowid(doc_type, pk)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def search(self, query, doc_types, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Every token must match; the last one as a prefix for search-as-you-type
+        match = ' '.join(f'"{t}"' for t in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+        type_filter = ', '.join(['%s'] * len(doc_types))
+        sql = (
+            f"SELECT rowid, bm25({self.table}, 0, %s, %s) AS score FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND doc_type IN ({type_filter}) "
+            f"ORDER BY score LIMIT %s"
+        )
+        codes = {code: doc_type for doc_type, code in TYPE_CODES.items()}
+        mask = (1 << TYPE_BITS) - 1
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.name_weight, self.body_weight, match, *doc_types, limit])
+            return [(codes[rowid & mask], rowid >> TYPE_BITS, score) for rowid, score in cursor.fetchall()]
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Index-free fallback for databases without FTS5: icontains on name and
+    description, name matches first. Indexing calls are no-ops.
+    """
+
+    def index(self, doc_type, pk, name, description):
+        pass
+
+    def remove(self, doc_type, pk):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, doc_types, limit):
+        words = query.split()
+        if not words:
+            return []
+        results = []
+        for doc_type in doc_types:
+            model = get_search_model(doc_type)
+            condition = Q()
+            for word in words:
+                condition &= Q(name__icontains=word) | Q(description__icontains=word)
+            for pk, name in model.objects.filter(condition).values_list('pk', 'name')[:limit]:
+                in_name = all(word.lower() in name.lower() for word in words)
+                # Same convention as bm25(): lower is better
+                results.append((doc_type, pk, -2.0 if in_name else -1.0))
+        results.sort(key=lambda r: r[2])
+        return results[:limit]
+
+
+def default_backend_path():
+    # The FTS5 table only exists on SQLite (see migration 0003)
+    if connection.vendor == 'sqlite':
+        return 'core.search.SQLiteFTS5Backend'
+    return 'core.search.DatabaseSearchBackend'
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, 'SEARCH_BACKEND', None) or default_backend_path()
+    return import_string(path)()
+
+
+def index_instance(instance):
+    doc_type = search_type_for_model(type(instance))
+    get_backend().index(doc_type, instance.pk, instance.name, instance.description)
+
+
+def rebuild_index():
+    """Reindex every searchable row. Returns the number of documents."""
+    backend = get_backend()
+    backend.clear()
+    total = 0
+    for doc_type in SEARCH_MODELS:
+        rows = get_search_model(doc_type).objects.values_list('pk', 'name', 'description')
+        for pk, name, description in rows.iterator(chunk_size=2000):
+            backend.index(doc_type, pk, name, description)
+            total += 1
+    return total
+
+
+def search(query, doc_types, limit):
+    """Ranked hits hydrated with display fields, one query per result type."""
+    hits = get_backend().search(query, doc_types, limit)
+    by_type = {}
+    for doc_type, pk, _ in hits:
+        by_type.setdefault(doc_type, []).append(pk)
+    rows = {}
+    for doc_type, pks in by_type.items():
+        for row in get_search_model(doc_type).objects.filter(pk__in=pks).values('pk', 'name', 'description'):
+            rows[(doc_type, row['pk'])] = row
+    return [
+        {
+            'type': doc_type,
+            'id': pk,
+            'name': rows[(doc_type, pk)]['name'],
+            'description': rows[(doc_type, pk)]['description'][:200],
+            'score': round(-score, 4),
+        }
+        for doc_type, pk, score in hits
+        if (doc_type, pk) in rows
+    ]
@@ -0,0 +1,219 @@
+"""
+Declarative catalog datasets.
+
+A dataset is a JSON (or, with PyYAML, YAML) mapping of section name to a
+list of records, e.g. ``{"categories": [{"slug": "hospital", "name":
+"Hospital"}], "services": [{"name": "...", "category": "hospital"}]}``.
+Each section has a natural key (SEED_SECTIONS); foreign keys are given as
+the natural key of the target row. ``load_dataset`` diffs the records
+against the database by natural key and writes the difference with
+bulk_create/bulk_update in one transaction: rows keep their primary keys
+(so references such as DigitalArtifact.related_attraction survive a
+reseed), unchanged rows are not written, and rows of a listed section
+that are missing from the dataset are deleted.
+"""
+import json
+import os
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from services import tree
+from tourism.ai_planner import snapshot
+from . import cache, mapgrid, poiindex, search
+from .signals import bulk_changed
+
+try:
+    import yaml
+except ImportError:  # optional: only JSON datasets can be read without it
+    yaml = None
+
+# section -> (model, natural key field, {foreign key field: section of the target});
+# in dependency order, targets before the rows pointing at them
+SEED_SECTIONS = {
+    'categories': ('services.ServiceCategory', 'slug', {'parent': 'categories'}),
+    'attractions': ('tourism.Attraction', 'name', {}),
+    'artifacts': ('tourism.DigitalArtifact', 'name', {'related_attraction': 'attractions'}),
+    'team': ('tourism.TeamMember', 'name', {}),
+    'hotels': ('hospitality.Hotel', 'name', {}),
+    'services': ('services.Service', 'name', {'category': 'categories'}),
+    'products': ('marketplace.Product', 'name', {}),
+}
+BATCH_SIZE = 500
+
+
+class DatasetError(ValueError):
+    pass
+
+
+def read_dataset(path):
+    """Parse a .json, .yaml or .yml dataset file."""
+    with open(path, encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            if yaml is None:
+                raise DatasetError("YAML datasets need PyYAML (pip install pyyaml)")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise DatasetError("A dataset is a mapping of section name to a list of records")
+    unknown = [section for section in data if section not in SEED_SECTIONS]
+    if unknown:
+        raise DatasetError(f"Unknown section(s): {', '.join(unknown)}")
+    return data
+
+
+class SectionPlan:
+    """Creates, updates and deletes that bring one model in line with its records."""
+
+    def __init__(self, section, records, keys):
+        model_label, self.key_field, self.foreign_keys = SEED_SECTIONS[section]
+        self.section = section
+        self.model = apps.get_model(model_label)
+        self.keys = keys
+        self.rows = {}
+        for row in self.model.objects.all():
+            key = getattr(row, self.key_field)
+            if key in self.rows:
+                # The diff matches rows by key, so one of them would be silently lost
+                raise DatasetError(f"{section}: {key!r} is the {self.key_field} of more than one existing row")
+            self.rows[key] = row
+        self.keys[section] = {key: row.pk for key, row in self.rows.items()}
+        self.creates = []
+        self.updated_fields = defaultdict(set)
+        self.deferred = []
+        self.unchanged = 0
+
+        seen = set()
+        for number, record in enumerate(records, 1):
+            key = record.get(self.key_field) if isinstance(record, dict) else None
+            if key in (None, ''):
+                raise DatasetError(f"{section} #{number}: missing {self.key_field!r}")
+            if key in seen:
+                raise DatasetError(f"{section}: duplicate {self.key_field} {key!r}")
+            seen.add(key)
+            self._plan(key, record)
+        for _, attname, key in self.deferred:
+            if key not in seen:
+                raise DatasetError(f"{section}: {attname} {key!r} not found in {section}")
+        self.deletes = [row.pk for key, row in self.rows.items() if key not in seen]
+
+    def _value(self, field, name, value):
+        """Database value of ``record[name]``; foreign keys resolve to a pk."""
+        if name not in self.foreign_keys or value is None:
+            try:
+                return field.to_python(value)
+            except ValidationError as exc:
+                raise DatasetError(f"{self.section}: invalid {name} {value!r}: {exc}")
+        pk = self.keys[self.foreign_keys[name]].get(value)
+        if pk is None:
+            raise DatasetError(f"{self.section}: {name} {value!r} not found in {self.foreign_keys[name]}")
+        return pk
+
+    def _plan(self, key, record):
+        instance = self.rows.get(key)
+        if instance is None:
+            instance = self.model()
+            self.creates.append(instance)
+        changed = []
+        for name, value in record.items():
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise DatasetError(f"{self.section}: unknown field {name!r}")
+            if self.foreign_keys.get(name) == self.section and value is not None \
+                    and value not in self.keys[self.section]:
+                # Points at a row created in this same section; set after the insert
+                self.deferred.append((instance, field.attname, value))
+                continue
+            value = self._value(field, name, value)
+            if instance.pk is None or getattr(instance, field.attname) != value:
+                setattr(instance, field.attname, value)
+                changed.append(field.attname)
+        if instance.pk is not None:
+            if changed:
+                self.updated_fields[instance.pk].update(changed)
+            else:
+                self.unchanged += 1
+
+    def apply(self):
+        """Write the creates and updates; returns the pks written."""
+        for instance in self.creates:
+            if hasattr(instance, 'refresh_geohash'):
+                instance.refresh_geohash()
+        created = self.model.objects.bulk_create(self.creates, batch_size=BATCH_SIZE)
+        for instance in created:
+            self.keys[self.section][getattr(instance, self.key_field)] = instance.pk
+
+        updated = {row.pk: row for row in self.rows.values() if row.pk in self.updated_fields}
+        self.updated = len(updated)
+        for instance, attname, key in self.deferred:
+            setattr(instance, attname, self.keys[self.section][key])
+            self.updated_fields[instance.pk].add(attname)
+            updated[instance.pk] = instance
+
+        if updated:
+            fields = set().union(*self.updated_fields.values())
+            if any(f.name == 'updated_at' for f in self.model._meta.concrete_fields):
+                # bulk_update skips auto_now; sync clients rely on it
+                now = timezone.now()
+                for instance in updated.values():
+                    instance.updated_at = now
+                fields.add('updated_at')
+            if 'latitude' in fields or 'longitude' in fields:
+                for instance in updated.values():
+                    instance.refresh_geohash()
+                fields.add('geohash')
+            self.model.objects.bulk_update(list(updated.values()), sorted(fields), batch_size=BATCH_SIZE)
+        return sorted({instance.pk for instance in created} | set(updated))
+
+
+def load_dataset(data, delete=True, signals=True, dry_run=False):
+    """
+    Bring the sections listed in ``data`` in line with it in one
+    transaction. With ``signals`` false no bulk_changed is sent and the
+    derived indexes are rebuilt once instead (deletions still go through
+    the per-row signals, so sync clients get their tombstones). With
+    ``dry_run`` the transaction is rolled back and nothing is deleted:
+    the delete signals touch caches and in-memory snapshots that a
+    rollback would not restore.
+    Returns {section: {"created", "updated", "deleted", "unchanged"}}.
+    """
+    sections = [section for section in SEED_SECTIONS if section in data]
+    result = {}
+    with transaction.atomic():
+        keys = {}
+        plans = []
+        for section in sections:
+            plan = SectionPlan(section, data[section] or [], keys)
+            written = plan.apply()
+            plans.append((plan, written))
+            result[section] = {"created": len(plan.creates), "updated": plan.updated,
+                               "deleted": len(plan.deletes) if delete else 0, "unchanged": plan.unchanged}
+        if delete and not dry_run:
+            # Rows pointing at a deleted row go first
+            for plan, _ in reversed(plans):
+                plan.model.objects.filter(pk__in=plan.deletes).delete()
+        if dry_run:
+            transaction.set_rollback(True)
+        elif signals:
+            for plan, written in plans:
+                if written:
+                    bulk_changed.send(sender=plan.model, pks=written)
+        elif any(written for _, written in plans):
+            rebuild_derived()
+    return result
+
+
+def rebuild_derived():
+    """Recompute everything bulk writes without a bulk_changed signal bypassed."""
+    tree.rebuild(apps.get_model('services', 'ServiceCategory'), apps.get_model('services', 'Service'))
+    mapgrid.rebuild()
+    poiindex.rebuild()
+    search.rebuild_index()
+    snapshot.invalidate()
+    for app_label in cache.CACHED_APPS:
+        cache.bump_generation(app_label)
@@ -0,0 +1,21 @@
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for ``?fields=id,name,latitude`` sparse fieldsets.
+
+    Only applies to read requests made through a view (the request is taken
+    from the serializer context); unknown field names are ignored.
+    """
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        requested = request.query_params.get(self.fields_query_param)
+        if not requested:
+            return
+        wanted = {name.strip() for name in requested.split(',') if name.strip()}
+        for name in list(self.fields):
+            if name not in wanted:
+                self.fields.pop(name)
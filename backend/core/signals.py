@@ -0,0 +1,123 @@
+from django.apps import apps
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal
+
+from . import cache, mapgrid, poiindex, search, sync
+from .middleware import install_query_timer
+from .poi import POI_MODELS, get_poi_model, poi_type_for_model
+
+# Sent after bulk_create/bulk_update/queryset.update on catalog models, which
+# bypass the per-row signals below; ``pks`` lists the created/changed rows.
+bulk_changed = Signal()
+
+
+def remember_coordinates(sender, instance, raw=False, **kwargs):
+    """Stash the stored coordinates so post_save can tell if the POI moved."""
+    instance._map_grid_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._map_grid_previous = (
+        sender.objects.filter(pk=instance.pk).values_list('latitude', 'longitude').first()
+    )
+
+
+def update_map_grid(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    poi_type = poi_type_for_model(sender)
+    previous = getattr(instance, '_map_grid_previous', None)
+    current = (instance.latitude, instance.longitude)
+    if previous is not None:
+        if tuple(map(float, previous)) == tuple(map(float, current)):
+            return
+        mapgrid.adjust_point(poi_type, *previous, delta=-1)
+    mapgrid.adjust_point(poi_type, *current, delta=1)
+
+
+def remove_from_map_grid(sender, instance, **kwargs):
+    mapgrid.adjust_point(poi_type_for_model(sender), instance.latitude, instance.longitude, delta=-1)
+
+
+def update_poi_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        poiindex.refresh(poi_type_for_model(sender), [instance.pk])
+
+
+def remove_from_poi_index(sender, instance, **kwargs):
+    poiindex.remove(poi_type_for_model(sender), instance.pk)
+
+
+def refresh_category_services(sender, instance, raw=False, **kwargs):
+    """Renaming or moving a category changes the category path of the services below it."""
+    if not raw:
+        poiindex.refresh('service', queryset=instance.get_all_services())
+
+
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_instance(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    search.get_backend().remove(search.search_type_for_model(sender), instance.pk)
+
+
+def record_tombstone(sender, instance, **kwargs):
+    sync.record_deletion(sync.sync_type_for_model(sender), instance.pk)
+
+
+def clear_tombstone(sender, instance, created=False, **kwargs):
+    if created:
+        sync.clear_deletion(sync.sync_type_for_model(sender), instance.pk)
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    cache.bump_generation(sender._meta.app_label)
+
+
+def refresh_after_bulk_change(sender, pks, **kwargs):
+    """Bring the map grid, POI index, search index and response cache up to date in bulk."""
+    poi_type = poi_type_for_model(sender)
+    if poi_type:
+        mapgrid.rebuild([poi_type])
+        poiindex.refresh(poi_type, pks)
+    elif sender._meta.label == 'services.ServiceCategory':
+        # Category names make up the category path of every service below them
+        poiindex.rebuild(['service'])
+    if search.search_type_for_model(sender):
+        for instance in sender.objects.filter(pk__in=pks).only('pk', 'name', 'description').iterator():
+            search.index_instance(instance)
+    if sender._meta.app_label in cache.CACHED_APPS:
+        cache.bump_generation(sender._meta.app_label)
+
+
+def connect_signals():
+    for poi_type in POI_MODELS:
+        model = get_poi_model(poi_type)
+        pre_save.connect(remember_coordinates, sender=model, dispatch_uid=f'map_grid_pre_save_{poi_type}')
+        post_save.connect(update_map_grid, sender=model, dispatch_uid=f'map_grid_post_save_{poi_type}')
+        post_delete.connect(remove_from_map_grid, sender=model, dispatch_uid=f'map_grid_post_delete_{poi_type}')
+        post_save.connect(update_poi_index, sender=model, dispatch_uid=f'poi_index_post_save_{poi_type}')
+        post_delete.connect(remove_from_poi_index, sender=model, dispatch_uid=f'poi_index_post_delete_{poi_type}')
+    post_save.connect(refresh_category_services, sender=apps.get_model('services', 'ServiceCategory'),
+                      dispatch_uid='poi_index_post_save_category')
+
+    for doc_type in search.SEARCH_MODELS:
+        model = search.get_search_model(doc_type)
+        post_save.connect(update_search_index, sender=model, dispatch_uid=f'search_post_save_{doc_type}')
+        post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f'search_post_delete_{doc_type}')
+
+    for doc_type in sync.SYNC_MODELS:
+        model = sync.get_sync_model(doc_type)
+        post_save.connect(clear_tombstone, sender=model, dispatch_uid=f'sync_post_save_{doc_type}')
+        post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'sync_post_delete_{doc_type}')
+
+    bulk_changed.connect(refresh_after_bulk_change, dispatch_uid='bulk_changed_derived_indexes')
+    connection_created.connect(install_query_timer, dispatch_uid='metrics_query_timer')
+
+    for app_label in cache.CACHED_APPS:
+        for model in apps.get_app_config(app_label).get_models():
+            label = model._meta.label_lower
+            post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'cache_post_save_{label}')
+            post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'cache_post_delete_{label}')
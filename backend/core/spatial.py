@@ -0,0 +1,44 @@
+import heapq
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from .geo import covering_cells, haversine_km
+from .models import POIIndex
+
+POI_FIELDS = ('poi_type', 'object_id', 'name', 'latitude', 'longitude', 'image')
+
+
+def find_nearby(latitude, longitude, radius_km, types, limit):
+    """
+    Return up to ``limit`` POIs of the given types within ``radius_km``,
+    nearest first. Candidates are narrowed with geohash prefix lookups so
+    only the cells around the query point are read from the database, in
+    one query over the POI index rather than one per type.
+    """
+    cells = covering_cells(latitude, longitude, radius_km)
+    # Ranges rather than __startswith: SQLite cannot serve LIKE from a
+    # case-sensitive index; '{' sorts right after 'z', the last geohash digit
+    cell_filter = reduce(or_, (Q(geohash__gte=cell, geohash__lt=cell + '{') for cell in cells))
+
+    candidates = []
+    rows = POIIndex.objects.filter(cell_filter, poi_type__in=types).values(*POI_FIELDS)
+    for row in rows:
+        distance = haversine_km(latitude, longitude, row['latitude'], row['longitude'])
+        if distance <= radius_km:
+            candidates.append((distance, row['poi_type'], row))
+
+    nearest = heapq.nsmallest(limit, candidates, key=lambda c: (c[0], c[1], c[2]['object_id']))
+    return [
+        {
+            'type': poi_type,
+            'id': row['object_id'],
+            'name': row['name'],
+            'latitude': str(row['latitude']),
+            'longitude': str(row['longitude']),
+            'image': row['image'],
+            'distance_km': round(distance, 3),
+        }
+        for distance, poi_type, row in nearest
+    ]
@@ -0,0 +1,129 @@
+"""
+Delta sync for offline clients.
+
+A change token is a point in time (microseconds since the epoch). A sync
+returns every row whose ``updated_at`` is at or after the token plus the
+tombstones of rows deleted since, and a new token to send next time.
+Clients apply deletions first, then upsert the changed rows by id; rows
+may be repeated across syncs (see SYNC_OVERLAP), so upserts must be
+idempotent.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from operator import attrgetter
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Tombstone
+
+SYNC_MODELS = {
+    'attraction': ('tourism.Attraction', 'tourism.serializers.AttractionSerializer'),
+    'artifact': ('tourism.DigitalArtifact', 'tourism.serializers.DigitalArtifactSerializer'),
+    'team': ('tourism.TeamMember', 'tourism.serializers.TeamMemberSerializer'),
+    'governor': ('tourism.GovernorProfile', 'tourism.serializers.GovernorProfileSerializer'),
+    'hotel': ('hospitality.Hotel', 'hospitality.serializers.HotelSerializer'),
+    'category': ('services.ServiceCategory', 'services.serializers.ServiceCategorySerializer'),
+    'service': ('services.Service', 'services.serializers.ServiceSerializer'),
+    'product': ('marketplace.Product', 'marketplace.serializers.ProductSerializer'),
+}
+# Relations whose edits change a row's serialized form (names are copied in)
+SYNC_DEPENDENCIES = {
+    'service': ('category', 'category__parent'),
+}
+# Rows are re-sent for this long after the token, covering transactions
+# that were stamped before the previous sync but committed after it
+SYNC_OVERLAP = timedelta(seconds=2)
+
+
+def get_sync_model(doc_type):
+    return apps.get_model(SYNC_MODELS[doc_type][0])
+
+
+def sync_type_for_model(model):
+    label = model._meta.label
+    for doc_type, (model_label, _) in SYNC_MODELS.items():
+        if model_label == label:
+            return doc_type
+    return None
+
+
+def encode_token(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_token(token):
+    """Raises ValueError for malformed tokens."""
+    micros = int(token)
+    if micros < 0:
+        raise ValueError("Invalid sync token")
+    return datetime.fromtimestamp(micros / 1_000_000, tz=dt_timezone.utc)
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def _dependency_changed(model, relation, cutoff):
+    """
+    Rows whose ``relation`` changed, as ``<first fk> IN (subquery)`` so
+    the filter stays on indexed columns of ``model`` instead of a join.
+    """
+    field, _, rest = relation.partition('__')
+    lookup = f'{rest}__updated_at__gte' if rest else 'updated_at__gte'
+    related = model._meta.get_field(field).related_model
+    return Q(**{f'{field}__in': related.objects.filter(**{lookup: cutoff}).values('pk')})
+
+
+def changes_since(since, doc_types, serializer_context):
+    """
+    Changed rows and deleted ids per type since the datetime ``since``, or
+    every row when ``since`` is None or older than the tombstones we keep
+    (``full`` is then true and the client should replace its copy).
+    """
+    now = timezone.now()
+    full = since is None or since < now - tombstone_retention()
+    changes = {}
+    deleted = {}
+    if not full:
+        cutoff = since - SYNC_OVERLAP
+        # One tombstone query for all types rather than one per type
+        deleted = {doc_type: [] for doc_type in doc_types}
+        tombstones = (
+            Tombstone.objects.filter(doc_type__in=doc_types, deleted_at__gte=cutoff)
+            .order_by('object_id').values_list('doc_type', 'object_id').distinct()
+        )
+        for doc_type, object_id in tombstones:
+            deleted[doc_type].append(object_id)
+    for doc_type in doc_types:
+        model_label, serializer_path = SYNC_MODELS[doc_type]
+        dependencies = SYNC_DEPENDENCIES.get(doc_type, ())
+        model = apps.get_model(model_label)
+        queryset = model.objects.select_related(*dependencies).order_by('pk')
+        if not full:
+            changed = Q(updated_at__gte=cutoff)
+            for relation in dependencies:
+                changed |= _dependency_changed(model, relation, cutoff)
+            # Sorted here rather than ORDER BY pk, which makes SQLite walk the
+            # whole table in pk order instead of using the updated_at index
+            queryset = sorted(queryset.order_by().filter(changed), key=attrgetter('pk'))
+        serializer_class = import_string(serializer_path)
+        changes[doc_type] = serializer_class(queryset, many=True, context=serializer_context).data
+    return {"token": encode_token(now), "full": full, "changes": changes, "deleted": deleted}
+
+
+def record_deletion(doc_type, pk):
+    Tombstone.objects.create(doc_type=doc_type, object_id=pk)
+
+
+def clear_deletion(doc_type, pk):
+    """A row came back under a deleted id (SQLite reuses the highest pk)."""
+    Tombstone.objects.filter(doc_type=doc_type, object_id=pk).delete()
+
+
+def prune_tombstones(older_than=None):
+    cutoff = timezone.now() - (older_than or tombstone_retention())
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -1,3 +1,1260 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time as time_module
+from datetime import time, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+
+from hospitality.models import Hotel
+from hospitality.serializers import HotelSerializer
+from marketplace.models import Product
+from marketplace.serializers import ProductSerializer
+from services.serializers import ServiceSerializer
+from tourism.serializers import AttractionSerializer, DigitalArtifactSerializer
+from services.models import Service, ServiceCategory
+from tourism.models import Attraction, DigitalArtifact, TeamMember
+from . import bundle, cache, fake_catalog, fastpath, geo, images, mapgrid, media, merge, metrics, poiindex, querywatch, search, seeding, sync
+from .mapgrid import CLUSTER_MAX_ZOOM
+from .signals import bulk_changed
+from .spatial import find_nearby
+from .models import ImageStatus, MapGridCell, POIIndex, Tombstone
+
+
+class ResponseCacheTests(TestCase):
+    url = '/api/tourism/attractions/'
+
+    def setUp(self):
+        django_cache.clear()
+        cache.stats.reset()
+
+    def make_attraction(self, name):
+        return Attraction.objects.create(
+            name=name, description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+
+    def get(self, url=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_repeat_request_is_served_from_cache(self):
+        self.make_attraction("Hibis Temple")
+        _, first = self.get()
+        queries, second = self.get()
+
+        # Only the ETag aggregate runs
+        self.assertEqual(queries, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats.snapshot()['attraction-list'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_query_params_are_part_of_the_key(self):
+        self.make_attraction("Hibis Temple")
+        self.get()
+        queries, data = self.get(self.url + '?fields=id')
+
+        self.assertGreater(queries, 0)
+        self.assertEqual(list(data['results'][0]), ['id'])
+
+    def test_save_and_delete_invalidate(self):
+        attraction = self.make_attraction("Hibis Temple")
+        self.get()
+
+        attraction.name = "Temple of Hibis"
+        attraction.save()
+        _, data = self.get()
+        self.assertEqual(data['results'][0]['name'], "Temple of Hibis")
+
+        attraction.delete()
+        _, data = self.get()
+        self.assertEqual(data['results'], [])
+
+    def test_other_apps_keep_their_entries(self):
+        self.make_attraction("Hibis Temple")
+        self.get('/api/services/items/')
+        self.make_attraction("Bagawat Necropolis")
+
+        queries, _ = self.get('/api/services/items/')
+        self.assertEqual(queries, 1)
+
+    def test_stats_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get('/api/internal/cache-stats/').status_code, 403)
+
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(admin)
+        response = self.client.get('/api/internal/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('tourism', response.json()['generations'])
+
+
+class ConditionalGetTests(TestCase):
+    url = '/api/tourism/attractions/'
+
+    def setUp(self):
+        django_cache.clear()
+        self.attraction = Attraction.objects.create(
+            name="Hibis Temple", description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+
+    def test_list_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Attraction.objects.filter(pk=self.attraction.pk).delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_query_params(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url + '?fields=id', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_last_modified(self):
+        url = f'{self.url}{self.attraction.pk}/'
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_model_without_updated_at_uses_generation(self):
+        url = '/api/tourism/team/'
+        TeamMember.objects.create(name="Karim")
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        TeamMember.objects.create(name="Mona")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class SyncTests(TestCase):
+    url = '/api/sync/'
+
+    def make_attraction(self, name):
+        return Attraction.objects.create(
+            name=name, description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync_is_full(self):
+        self.make_attraction("Hibis Temple")
+        data = self.sync()
+        self.assertTrue(data['full'])
+        self.assertEqual([a['name'] for a in data['changes']['attraction']], ["Hibis Temple"])
+
+    def test_changes_and_deletions_since_token(self):
+
+        kept = self.make_attraction("Hibis Temple")
+        removed = self.make_attraction("Bagawat Necropolis")
+        untouched = self.make_attraction("Qasr el-Ghueita")
+        # Push existing rows out of the overlap window
+        Attraction.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+        token = sync.encode_token(timezone.now() - timedelta(minutes=1))
+
+        kept.name = "Temple of Hibis"
+        kept.save()
+        removed_pk = removed.pk
+        removed.delete()
+
+        data = self.sync(token, types='attraction')
+        self.assertFalse(data['full'])
+        self.assertEqual([a['name'] for a in data['changes']['attraction']], ["Temple of Hibis"])
+        self.assertEqual(data['deleted']['attraction'], [removed_pk])
+        self.assertNotIn(untouched.pk, data['deleted']['attraction'])
+        self.assertEqual(list(data['changes']), ['attraction'])
+
+    def test_category_rename_resends_its_services(self):
+
+        category = ServiceCategory.objects.create(name="Clinics", slug="clinics")
+        Service.objects.create(
+            name="Kharga Clinic", description="", category=category,
+            address="Kharga", latitude=25.44, longitude=30.55,
+        )
+        Service.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+        ServiceCategory.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+        token = sync.encode_token(timezone.now() - timedelta(minutes=1))
+
+        category.name = "Medical Clinics"
+        category.save()
+
+        data = self.sync(token, types='service,category')
+        self.assertEqual(data['changes']['service'][0]['category_name'], "Medical Clinics")
+
+    def test_invalid_token(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'types': 'spaceship'}).status_code, 400)
+
+
+class OfflineBundleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(OFFLINE_BUNDLE_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_columnar_parts_and_manifest(self):
+        Attraction.objects.create(
+            name="Hibis Temple", description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+        manifest, rebuilt = bundle.build_bundle()
+
+        self.assertEqual(sorted(rebuilt), sorted(bundle.BUNDLE_PARTS))
+        entry = manifest['parts']['tourism']
+        with gzip.open(os.path.join(self.directory, entry['file'] + '.gz')) as f:
+            document = json.load(f)
+        self.assertEqual(document['attraction']['count'], 1)
+        self.assertEqual(document['attraction']['columns']['name'], ["Hibis Temple"])
+        self.assertEqual(document['attraction']['columns']['opening_time'], ["08:00"])
+
+    def test_only_changed_apps_are_rebuilt(self):
+        first, _ = bundle.build_bundle()
+        TeamMember.objects.create(name="Not bundled")
+        ServiceCategory.objects.create(name="Clinics", slug="clinics")
+
+        second, rebuilt = bundle.build_bundle()
+
+        self.assertEqual(rebuilt, ['services'])
+        self.assertEqual(second['version'], first['version'] + 1)
+        self.assertEqual(second['parts']['tourism']['file'], first['parts']['tourism']['file'])
+        self.assertFalse(os.path.exists(os.path.join(self.directory, first['parts']['services']['file'])))
+
+
+class MergeTests(TestCase):
+    def test_blocking_index_matches_reordered_names(self):
+        index = merge.BlockingIndex()
+        index.add(1, "Temple of Hibis")
+        index.add(2, "Temple of Dush")
+        index.add(3, "Pioneers Hotel")
+
+        self.assertEqual(index.best_match("Hibis Temple")[0], 1)
+        self.assertEqual(index.best_match("Pioneer Hotel")[0], 3)
+        self.assertEqual(index.best_match("Temple of Karnak"), (None, 0.0))
+
+    def test_merge_enriches_creates_and_updates_derived_state(self):
+        Attraction.objects.create(
+            name="Temple of Hibis", description="Short", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+        items = [
+            {"category": "Historical & Heritage", "name_en": "Hibis Temple", "description": "A much longer text"},
+            {"category": "Historical & Heritage", "name_en": "Temple of Dush", "description": "Roman"},
+            {"category": "Historical & Heritage", "name_en": "Temple of Dush", "description": "Duplicate"},
+            {"category": "Medical Services", "name_en": "Kharga General Hospital", "description": ""},
+            {"category": "Spaceport", "name_en": "Nowhere"},
+        ]
+
+        result = merge.merge_dataset(items)
+
+        self.assertEqual((result['attraction']['created'], result['attraction']['updated']), (1, 1))
+        self.assertEqual(result['skipped'], ["Nowhere"])
+        self.assertEqual(Attraction.objects.get(name="Temple of Hibis").description, "A much longer text")
+        dush = Attraction.objects.get(name="Temple of Dush")
+        self.assertTrue(dush.geohash)
+        self.assertEqual(search.search("dush", ['attraction'], 5)[0]['id'], dush.pk)
+        self.assertEqual(MapGridCell.objects.get(zoom=0, poi_type='attraction').count, 2)
+        self.assertEqual(ServiceCategory.objects.get(name="Hospital").service_count, 1)
+
+    def test_dry_run_stores_nothing(self):
+        items = [{"category": "Dining", "name_en": "Astakoza", "description": "Seafood"}]
+        result = merge.merge_dataset(items, dry_run=True)
+
+        self.assertEqual(result['service']['created'], 1)
+        self.assertFalse(Service.objects.exists())
+        self.assertFalse(ServiceCategory.objects.exists())
+
+
+class ImportCoordinatesTests(TestCase):
+    def write_csv(self, rows):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Name", "Type", "Current_Latitude", "Current_Longitude"])
+            writer.writerows(rows)
+        return path
+
+    def test_bulk_update_by_case_folded_name(self):
+        attraction = Attraction.objects.create(
+            name="Temple of Hibis", description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+        stamp = attraction.updated_at
+        path = self.write_csv([
+            ["TEMPLE OF HIBIS", "Attraction", "25.4853", "30.5572"],
+            ["Nowhere", "Hotel", "25.0", "30.0"],
+            ["Broken", "Hotel", "north", "30.0"],
+        ])
+        out = io.StringIO()
+
+        call_command('import_coordinates', path, '--no-touch', stdout=out)
+
+        attraction.refresh_from_db()
+        self.assertEqual((float(attraction.latitude), float(attraction.longitude)), (25.4853, 30.5572))
+        self.assertEqual(attraction.geohash, geo.geohash_encode(25.4853, 30.5572))
+        self.assertEqual(attraction.updated_at, stamp)
+        self.assertEqual(MapGridCell.objects.get(zoom=CLUSTER_MAX_ZOOM, poi_type='attraction').lat_sum, 25.4853)
+        self.assertIn("1 coordinates updated, 0 unchanged, 1 unmatched, 1 invalid", out.getvalue())
+
+    def test_updated_at_is_bumped_by_default(self):
+        attraction = Attraction.objects.create(
+            name="Hibis", description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+        path = self.write_csv([["hibis", "", "25.5", "30.5"]])
+
+        call_command('import_coordinates', path, stdout=io.StringIO())
+
+        attraction.refresh_from_db()
+        self.assertGreater(attraction.updated_at, attraction.created_at)
+        self.assertEqual(float(attraction.latitude), 25.5)
+
+    def test_bulk_changed_is_sent_per_batch(self):
+        pks = [
+            Attraction.objects.create(
+                name=f"Site {i}", description="", latitude=25.44, longitude=30.55,
+                attraction_type='historical', visit_duration_minutes=60,
+                opening_time=time(8), closing_time=time(17),
+            ).pk
+            for i in range(5)
+        ]
+        path = self.write_csv([[f"Site {i}", "Attraction", "25.5", "30.5"] for i in range(5)])
+        sent = []
+
+        def receiver(sender, pks, **kwargs):
+            sent.append(pks)
+
+        bulk_changed.connect(receiver, sender=Attraction)
+        self.addCleanup(bulk_changed.disconnect, receiver, sender=Attraction)
+        call_command('import_coordinates', path, '--chunk-size', '2', stdout=io.StringIO())
+
+        self.assertEqual(sent, [pks[0:2], pks[2:4], pks[4:]])
+        self.assertEqual(POIIndex.objects.filter(latitude=25.5).count(), 5)
+
+
+class StubImageHandler(BaseHTTPRequestHandler):
+    """Serves /ok.png with an ETag, /photo.jpg, /text as a non-image and 404 otherwise."""
+    requests_seen = []
+
+    def do_GET(self):
+        StubImageHandler.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/ok.png':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            buffer = io.BytesIO()
+            Image.new('RGB', (30, 20), 'orange').save(buffer, 'PNG')
+            body, content_type = buffer.getvalue(), 'image/png'
+        elif self.path == '/photo.jpg':
+            buffer = io.BytesIO()
+            Image.new('RGB', (400, 300), 'teal').save(buffer, 'JPEG')
+            body, content_type = buffer.getvalue(), 'image/jpeg'
+        elif self.path == '/text':
+            body, content_type = b'not an image', 'text/plain'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class RemoteImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubImageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubImageHandler.requests_seen = []
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(IMAGE_CACHE_DIR=os.path.join(directory, 'originals'),
+                                     IMAGE_DERIVATIVE_DIR=os.path.join(directory, 'derivatives'),
+                                     THUMBNAIL_SIZES=[(100, 50), (100, 100), (800, 600), (1600, 300), (200, 0)])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def run_command(self):
+        out = io.StringIO()
+        call_command('check_images', '--interval', '0', '--workers', '4', stdout=out)
+        return out.getvalue()
+
+    def test_records_status_and_revalidates(self):
+        attraction = Attraction.objects.create(
+            name="Hibis", description="", latitude=25.44, longitude=30.55,
+            image=f'{self.base_url}/ok.png', attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+        TeamMember.objects.create(name="Karim", photo_url=f'{self.base_url}/missing.jpg')
+        TeamMember.objects.create(name="Mona", photo_url=f'{self.base_url}/text')
+
+        self.run_command()
+
+        status = ImageStatus.objects.get(doc_type='attraction', object_id=attraction.pk)
+        self.assertTrue(status.ok)
+        self.assertEqual((status.width, status.height, status.content_type), (30, 20, 'image/png'))
+        broken = ImageStatus.objects.filter(doc_type='team').order_by('status_code')
+        self.assertEqual([(s.ok, s.status_code) for s in broken], [(False, 200), (False, 404)])
+
+        output = self.run_command()
+
+        self.assertIn(('/ok.png', '"v1"'), StubImageHandler.requests_seen)
+        self.assertIn("1 URLs unchanged", output)
+        status.refresh_from_db()
+        self.assertTrue(status.ok)
+        self.assertEqual(status.width, 30)
+
+    def test_decompression_bombs_are_broken(self):
+        attraction = Attraction.objects.create(
+            name="Hibis", description="", latitude=25.44, longitude=30.55,
+            image=f'{self.base_url}/ok.png', attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+        # Pillow refuses images over twice this many pixels; ok.png has 600
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 200):
+            output = self.run_command()
+
+        status = ImageStatus.objects.get(doc_type='attraction', object_id=attraction.pk)
+        self.assertEqual((status.ok, status.error), (False, "Not a readable image"))
+        self.assertIn(f"{self.base_url}/ok.png (200): Not a readable image", output)
+
+    def test_rate_limiter_spaces_requests_per_host(self):
+        limiter = images.HostRateLimiter(0.05)
+        started = time_module.monotonic()
+        for _ in range(3):
+            limiter.wait('example.org')
+        limiter.wait('example.com')
+        self.assertGreaterEqual(time_module.monotonic() - started, 0.1)
+        self.assertLess(time_module.monotonic() - started, 0.15)
+
+    def create_attraction(self, image):
+        return Attraction.objects.create(
+            name="Bagawat", description="", latitude=25.46, longitude=30.53, image=image,
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+
+    def test_thumbnail_is_rendered_once_and_immutable(self):
+        attraction = self.create_attraction(f'{self.base_url}/photo.jpg')
+        url = f'/img/attraction/{attraction.pk}/100x50.webp'
+
+        response = self.client.get(url, {'v': images.source_version(attraction.image)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        with Image.open(io.BytesIO(response.content)) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ('WEBP', (100, 50)))
+
+        cached = self.client.get(url, {'v': 'stale'})
+        self.assertEqual(b''.join(cached.streaming_content), response.content)
+        self.assertEqual(cached['Cache-Control'], 'public, max-age=86400')
+        self.assertEqual(len(StubImageHandler.requests_seen), 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_thumbnail_sizes(self):
+        attraction = self.create_attraction(f'{self.base_url}/photo.jpg')
+        for size, expected in (('800x600', (400, 300)), ('1600x300', (400, 75)), ('200x0', (200, 150))):
+            response = self.client.get(f'/img/attraction/{attraction.pk}/{size}.jpg')
+            with Image.open(io.BytesIO(response.content)) as thumbnail:
+                self.assertEqual((thumbnail.format, thumbnail.size), ('JPEG', expected), size)
+
+    def test_thumbnail_errors(self):
+        attraction = self.create_attraction(f'{self.base_url}/photo.jpg')
+        broken = self.create_attraction(f'{self.base_url}/text')
+        self.assertEqual(self.client.get(f'/img/attraction/{attraction.pk}/100x100.gif').status_code, 404)
+        self.assertEqual(self.client.get(f'/img/attraction/{attraction.pk}/4000x100.webp').status_code, 400)
+        self.assertEqual(self.client.get(f'/img/attraction/{attraction.pk}/100x60.webp').status_code, 400)
+        self.assertEqual(self.client.get(f'/img/attraction/{broken.pk + 1}/100x100.webp').status_code, 404)
+        self.assertEqual(self.client.get(f'/img/attraction/{broken.pk}/100x100.webp').status_code, 502)
+
+    def test_thumbnail_evicted_after_lookup_is_rendered_again(self):
+        attraction = self.create_attraction(f'{self.base_url}/photo.jpg')
+        missing = os.path.join(settings.IMAGE_DERIVATIVE_DIR, 'gone.webp')
+        with mock.patch.object(images.DerivativeCache, 'get', return_value=missing):
+            response = self.client.get(f'/img/attraction/{attraction.pk}/100x50.webp')
+        self.assertEqual(response.status_code, 200)
+        with Image.open(io.BytesIO(response.content)) as thumbnail:
+            self.assertEqual(thumbnail.size, (100, 50))
+
+    def test_source_version_matches_frontend_hash(self):
+        # hashUrl() in frontend/src/services/api.js, run with node
+        self.assertEqual(images.source_version('https://example.org/a.jpg'), '1jt5w6p')
+        self.assertEqual(images.source_version('https://ex.org/\u00e9\U0001F600x'), 'jchsnk')
+
+    def test_derivative_cache_evicts_least_recently_used(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        derivatives = images.DerivativeCache(directory, max_bytes=250)
+        for age, key in enumerate(('aa1', 'bb2')):
+            path = derivatives.put(key, 'webp', b'x' * 100)
+            os.utime(path, (1000 + age, 1000 + age))
+        derivatives.get('aa1', 'webp')  # now the most recently used
+
+        derivatives.put('cc3', 'webp', b'x' * 100)
+
+        self.assertIsNotNone(derivatives.get('aa1', 'webp'))
+        self.assertIsNone(derivatives.get('bb2', 'webp'))
+        self.assertIsNotNone(derivatives.get('cc3', 'webp'))
+
+
+class ProcessMediaTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.output = os.path.join(self.root, 'variants')
+        os.makedirs(os.path.join(self.root, 'locations'))
+        Image.new('RGB', (200, 100), 'orange').save(os.path.join(self.root, 'locations', 'hibis.jpg'))
+        Image.new('RGBA', (60, 60), (0, 0, 0, 0)).save(os.path.join(self.root, 'locations', 'hibis.png'))
+
+    def process(self, workers=1):
+        return media.process_media(directories=('locations',), workers=workers, widths=(80, 160), formats=('webp',),
+                                   media_root=self.root, output_dir=self.output)
+
+    def test_renders_variants_and_skips_unchanged_sources(self):
+        summary = self.process(workers=2)
+
+        self.assertEqual((summary['processed'], summary['variants'], summary['failed']), (2, 3, []))
+        with Image.open(os.path.join(self.output, 'locations', 'hibis_jpg-80w.webp')) as variant:
+            self.assertEqual(variant.size, (80, 40))
+        # Narrower than every width: one variant at the source width
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output, 'locations'))),
+                         ['hibis_jpg-160w.webp', 'hibis_jpg-80w.webp', 'hibis_png-60w.webp'])
+
+        os.utime(os.path.join(self.root, 'locations', 'hibis.jpg'), (1, 1))
+        self.assertEqual((self.process()['processed'], self.process()['unchanged']), (0, 2))
+
+        Image.new('RGB', (100, 100), 'blue').save(os.path.join(self.root, 'locations', 'hibis.jpg'))
+        os.remove(os.path.join(self.root, 'locations', 'hibis.png'))
+        summary = self.process()
+
+        self.assertEqual((summary['processed'], summary['removed']), (1, 1))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output, 'locations'))),
+                         ['hibis-100w.webp', 'hibis-80w.webp'])
+        manifest = media.read_manifest(self.output)
+        self.assertEqual(list(manifest['files']), ['locations/hibis.jpg'])
+
+    def test_benchmark_without_images(self):
+        out = io.StringIO()
+        with override_settings(MEDIA_ROOT=os.path.join(self.root, 'empty')):
+            call_command('benchmark_media', '--workers', '1', stdout=out)
+        self.assertIn("nothing to benchmark", out.getvalue())
+
+        with open(os.path.join(self.root, 'locations', 'broken.jpg'), 'wb') as f:
+            f.write(b'not an image')
+        os.remove(os.path.join(self.root, 'locations', 'hibis.jpg'))
+        os.remove(os.path.join(self.root, 'locations', 'hibis.png'))
+        with override_settings(MEDIA_ROOT=self.root), \
+                self.assertRaisesMessage(CommandError, "No image could be processed, e.g. locations/broken.jpg"):
+            call_command('benchmark_media', '--workers', '1', stdout=io.StringIO())
+
+
+class MediaAuditTests(TestCase):
+    def setUp(self):
+        parent = ServiceCategory.objects.create(name="Medical", slug="medical")
+        category = ServiceCategory.objects.create(name="Hospitals", slug="hospitals", parent=parent)
+        self.hospital = Service.objects.create(name="Kharga Hospital", description="", category=category,
+                                               address="Kharga", latitude=25.45, longitude=30.54)
+        Attraction.objects.create(
+            name="Hibis", description="", latitude=25.44, longitude=30.55, image='https://example.org/hibis.jpg',
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+
+    def audit(self, *args):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'audit.ndjson')
+        out = io.StringIO()
+        call_command('media_audit', '--output', path, *args, stdout=out)
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f], out.getvalue()
+
+    def test_streams_rows_and_counts(self):
+        rows, report = self.audit()
+
+        self.assertEqual([(r['type'], r['subcategory'], r['image_url']) for r in rows], [
+            ('attraction', 'Historical', 'https://example.org/hibis.jpg'),
+            ('service', 'Medical > Hospitals', None),
+        ])
+        self.assertIn("Total POIs: 2", report)
+        self.assertIn("Attraction: 1 total (1 with images)", report)
+        self.assertIn("Service: 1 total (0 with images)", report)
+
+        rows, _ = self.audit('--missing-only')
+        self.assertEqual([r['name_en'] for r in rows], ["Kharga Hospital"])
+
+    def test_changed_since(self):
+        Service.objects.filter(pk=self.hospital.pk).update(updated_at=timezone.now() + timedelta(days=2))
+        since = (timezone.now() + timedelta(days=1)).isoformat()
+
+        rows, report = self.audit('--changed-since', since)
+
+        self.assertEqual([r['id'] for r in rows], [self.hospital.pk])
+        self.assertIn("Total POIs changed since", report)
+
+
+class MapGridTests(TestCase):
+    def test_adjust_point_adds_to_cells_created_meanwhile(self):
+        # Another save created the zoom 0 cell after this one last looked
+        x, y = mapgrid.cell_for(25.44, 30.55, 0)
+        MapGridCell.objects.create(zoom=0, poi_type='hotel', x=x, y=y, count=1, lat_sum=25.0, lon_sum=30.0)
+
+        mapgrid.adjust_point('hotel', 25.44, 30.55, 1)
+
+        cell = MapGridCell.objects.get(zoom=0, poi_type='hotel')
+        self.assertEqual((cell.count, cell.lat_sum), (2, 50.44))
+        self.assertEqual(MapGridCell.objects.filter(poi_type='hotel').count(), CLUSTER_MAX_ZOOM + 1)
+
+        mapgrid.adjust_point('hotel', 25.44, 30.55, -1)
+        self.assertEqual(list(MapGridCell.objects.filter(poi_type='hotel').values_list('count', flat=True)), [1])
+
+    def test_points_above_cluster_zoom(self):
+        hotels = [
+            Hotel.objects.create(name=f"Hotel {i}", description="", latitude=latitude, longitude=30.55,
+                                 address="Kharga", stars=3, price_range="$$", booking_url="https://example.org")
+            for i, latitude in enumerate((25.45, 25.46, 25.47, 25.60))
+        ]
+        url = '/api/map/tiles/?bbox=30.5,25.4,30.6,25.5&zoom=14'
+
+        response = self.client.get(url + '&types=hotel,attraction')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['clusters'], [])
+        self.assertEqual([p['id'] for p in response.json()['points']], [h.pk for h in hotels[:3]])
+        with mock.patch('core.views.MAX_MAP_POINTS', 2):
+            points = self.client.get(url + '&types=hotel').json()['points']
+        self.assertEqual([p['id'] for p in points], [h.pk for h in hotels[:2]])
+
+
+class SearchTests(TestCase):
+    def test_default_backend_follows_the_database(self):
+        expected = 'SQLiteFTS5Backend' if connection.vendor == 'sqlite' else 'DatabaseSearchBackend'
+        self.assertEqual(search.default_backend_path(), f'core.search.{expected}')
+
+    def test_invalid_limit(self):
+        response = self.client.get('/api/search/', {'q': 'temple', 'limit': 'ten'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "limit must be a whole number"})
+
+    def test_analyze_folds_arabic_and_stems_english(self):
+        self.assertEqual(search.analyze("مَكْتَبَة أحمد"), search.analyze("مكتبه احمد"))
+        self.assertEqual(search.analyze("Temples Running Stopped Boxes"), "temple run stop box")
+        self.assertEqual(search.analyze("Oasis Hills"), "oasis hill")
+
+
+@skipUnless(connection.vendor == 'sqlite', "Queries the FTS5 index")
+class SQLiteSearchTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.temple = Attraction.objects.create(
+            name="Temple of Hibis", description="Persian era sandstone", latitude=25.46, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+        self.necropolis = Attraction.objects.create(
+            name="Bagawat Necropolis", description="Chapels north of the temple", latitude=25.47, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+        self.hotel = Hotel.objects.create(name="فندق الواحة", description="Rooms near the temples", latitude=25.44,
+                                          longitude=30.55, address="Kharga", stars=3, price_range="$$",
+                                          booking_url="https://example.org")
+        self.dates = Product.objects.create(name="Siwa Dates", description="", price=5, seller_name="Farm",
+                                            seller_contact="0100")
+
+    def hits(self, query, doc_types=tuple(search.SEARCH_MODELS), limit=10):
+        return [(r['type'], r['id']) for r in search.search(query, list(doc_types), limit)]
+
+    def test_arabic_folding(self):
+        # Hamza, ta marbuta and harakat all fold away on both sides
+        self.assertEqual(self.hits("الوَاحه"), [('hotel', self.hotel.pk)])
+        self.assertEqual(self.hits("فندق"), [('hotel', self.hotel.pk)])
+
+    def test_stemming_and_prefix(self):
+        self.assertEqual(self.hits("temples hibis"), [('attraction', self.temple.pk)])
+        self.assertEqual(self.hits("dat"), [('product', self.dates.pk)])
+
+    def test_name_matches_rank_first(self):
+        hits = self.hits("temple")
+        self.assertEqual(hits[0], ('attraction', self.temple.pk))
+        self.assertCountEqual(hits[1:], [('attraction', self.necropolis.pk), ('hotel', self.hotel.pk)])
+        self.assertEqual(self.hits("temple", limit=1), [('attraction', self.temple.pk)])
+
+    def test_type_filter(self):
+        self.assertEqual(self.hits("temple", ['hotel', 'product']), [('hotel', self.hotel.pk)])
+        response = self.client.get('/api/search/', {'q': 'temple', 'types': 'hotel'})
+        self.assertEqual([r['id'] for r in response.json()['results']], [self.hotel.pk])
+        response = self.client.get('/api/search/', {'q': 'temple', 'types': 'hotel,museum'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_index_follows_save_and_delete(self):
+        self.temple.name = "Hibis Sanctuary"
+        self.temple.save()
+        self.assertEqual(self.hits("sanctuary"), [('attraction', self.temple.pk)])
+        self.assertNotIn(('attraction', self.temple.pk), self.hits("temple"))
+
+        self.necropolis.delete()
+        self.assertEqual(self.hits("necropolis"), [])
+        self.assertEqual(self.hits("chapels"), [])
+
+        self.assertEqual(search.rebuild_index(), 3)
+        self.assertEqual(self.hits("sanctuary"), [('attraction', self.temple.pk)])
+
+
+class POIIndexTests(TestCase):
+    def setUp(self):
+        self.medical = ServiceCategory.objects.create(name="Medical", slug="medical")
+        hospitals = ServiceCategory.objects.create(name="Hospitals", slug="hospitals", parent=self.medical)
+        self.hospital = Service.objects.create(name="Kharga Hospital", description="Emergency care", category=hospitals,
+                                               address="Kharga", latitude=25.45, longitude=30.54)
+        self.temple = Attraction.objects.create(
+            name="Temple of Hibis", description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+        Hotel.objects.create(name="Pioneers", description="", latitude=25.44, longitude=30.55, address="Kharga",
+                             stars=4, price_range="$$", booking_url="https://example.org")
+
+    def entries(self):
+        return list(POIIndex.objects.order_by('poi_type').values_list('poi_type', 'name', 'category'))
+
+    def test_signals_keep_entries_current(self):
+        self.assertEqual(self.entries(), [
+            ('attraction', "Temple of Hibis", "Historical Site"),
+            ('hotel', "Pioneers", "4-Star"),
+            ('service', "Kharga Hospital", "Medical > Hospitals"),
+        ])
+        entry = POIIndex.objects.get(poi_type='service')
+        self.assertEqual((entry.object_id, entry.geohash), (self.hospital.pk, self.hospital.geohash))
+        self.assertIn("emergency", entry.search_text)
+
+        self.medical.name = "Health"
+        self.medical.save()
+        self.temple.name = "Hibis"
+        self.temple.save()
+        self.hospital.delete()
+
+        self.assertEqual(self.entries(), [('attraction', "Hibis", "Historical Site"), ('hotel', "Pioneers", "4-Star")])
+
+    def test_bulk_changes_and_rebuild(self):
+        Attraction.objects.filter(pk=self.temple.pk).update(name="Hibis", latitude=25.5)
+        bulk_changed.send(sender=Attraction, pks=[self.temple.pk])
+        self.assertEqual(POIIndex.objects.get(poi_type='attraction').name, "Hibis")
+
+        POIIndex.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_poi_index', stdout=out)
+        self.assertIn("3 entries", out.getvalue())
+
+    def test_nearby_is_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            results = find_nearby(25.44, 30.55, 5, ['attraction', 'hotel', 'service'], 10)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual([r['type'] for r in results], ['attraction', 'hotel', 'service'])
+
+
+class NearbyTests(TestCase):
+    def add(self, name, latitude, longitude):
+        return Attraction.objects.create(
+            name=name, description="", latitude=round(latitude, 6), longitude=round(longitude, 6),
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+
+    def nearby(self, **params):
+        return self.client.get('/api/nearby/', params)
+
+    def test_points_across_a_cell_edge_are_found(self):
+        precision = geo.precision_for_radius(25.44, 5)
+        lat_lo, lat_hi, lon_lo, lon_hi = geo.geohash_bounds(geo.geohash_encode(25.44, 30.55, precision))
+        # Query point just inside the north-east corner of its cell, POIs just across each edge
+        lat, lon = lat_hi - 0.002, lon_hi - 0.002
+        north = self.add("North", lat_hi + 0.002, lon)
+        east = self.add("East", lat, lon_hi + 0.002)
+        corner = self.add("Corner", lat_hi + 0.002, lon_hi + 0.002)
+        home = geo.geohash_encode(lat, lon, precision)
+        for poi in (north, east, corner):
+            self.assertNotEqual(poi.geohash[:precision], home)
+
+        results = find_nearby(lat, lon, 5, ['attraction'], 10)
+
+        self.assertEqual({r['id'] for r in results}, {north.pk, east.pk, corner.pk})
+        self.assertEqual(results[-1]['id'], corner.pk)
+
+    def test_radius_filters_and_sorts_by_distance(self):
+        far = self.add("Far", 25.44 + 7 / 111.2, 30.55)
+        near = self.add("Near", 25.44 + 3 / 111.2, 30.55)
+        nearest = self.add("Nearest", 25.44 + 1 / 111.2, 30.55)
+
+        response = self.nearby(lat=25.44, lon=30.55, radius_km=5)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['id'] for r in results], [nearest.pk, near.pk])
+        self.assertAlmostEqual(results[1]['distance_km'], 3, places=1)
+        self.assertEqual(self.nearby(lat=25.44, lon=30.55, radius_km=10, limit=1).json()['results'][0]['id'],
+                         nearest.pk)
+        self.assertIn(far.pk, [r['id'] for r in self.nearby(lat=25.44, lon=30.55, radius_km=10).json()['results']])
+        self.assertEqual(self.nearby(lat=25.44, lon=30.55, types='hotel,service').json()['count'], 0)
+
+    def test_invalid_parameters(self):
+        for params, error in (
+            ({'lon': 30.55}, "lat and lon are required"),
+            ({'lat': 'north', 'lon': 30.55}, "lat, lon and radius_km must be numbers"),
+            ({'lat': 25.44, 'lon': 30.55, 'radius_km': 'far'}, "lat, lon and radius_km must be numbers"),
+            ({'lat': 25.44, 'lon': 30.55, 'limit': 'ten'}, "limit must be a whole number"),
+            ({'lat': 25.44, 'lon': 30.55, 'types': 'hotel,spaceship'}, "Unknown POI type(s): spaceship"),
+            ({'lat': 91, 'lon': 30.55}, "Coordinates out of range"),
+            ({'lat': 25.44, 'lon': 30.55, 'radius_km': 0}, "radius_km must be between 0 and 1000"),
+        ):
+            with self.subTest(params=params):
+                response = self.nearby(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": error})
+
+
+@skipUnless(connection.vendor == 'sqlite', "Checks SQLite query plans")
+class QueryPlanTests(TestCase):
+    """
+    Every filtered query of the hot endpoints is served from an index.
+
+    Columns left unindexed on purpose, since no endpoint filters or sorts
+    on them: latitude/longitude (spatial reads go through geohash ranges on
+    POIIndex, see core.spatial and mapgrid.points_in_bbox), Hotel.stars and
+    price_range, and Product.created_at (admin list filters only; the API
+    lists by id). An endpoint that starts using one fails this test.
+    """
+    # Tens of rows at most; a scan is cheaper than maintaining another index
+    SMALL_TABLES = {'services_servicecategory', 'tourism_teammember', 'tourism_governorprofile'}
+
+    def setUp(self):
+        django_cache.clear()
+        self.medical = ServiceCategory.objects.create(name="Medical", slug="medical")
+        hospitals = ServiceCategory.objects.create(name="Hospitals", slug="hospitals", parent=self.medical)
+        for i in range(3):
+            Service.objects.create(name=f"Clinic {i}", description="", category=hospitals, address="Kharga",
+                                   latitude=25.44, longitude=30.55, is_emergency=i == 0)
+            Hotel.objects.create(name=f"Hotel {i}", description="", latitude=25.44, longitude=30.55, address="Kharga",
+                                 stars=3, price_range="$$", booking_url="https://example.org")
+            Product.objects.create(name=f"Dates {i}", description="", price=10, seller_name="Farm",
+                                   seller_contact="0100")
+            self.attraction = Attraction.objects.create(
+                name=f"Temple {i}", description="", latitude=25.44, longitude=30.55, attraction_type='natural',
+                visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+            )
+
+    def unindexed_scans(self, queries):
+        tables = set(connection.introspection.table_names())
+        scans = []
+        for query in queries:
+            sql = query['sql']
+            # Unfiltered first pages and aggregates read every row anyway
+            if not sql.startswith('SELECT') or ' WHERE ' not in sql:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                details = [row[3] for row in cursor.fetchall()]
+            for detail in details:
+                words = detail.split()
+                if len(words) == 2 and words[0] == 'SCAN' and words[1] in tables - self.SMALL_TABLES:
+                    scans.append(f"{detail}: {sql}")
+        return scans
+
+    def test_endpoints_use_indexes(self):
+        token = sync.encode_token(timezone.now() - timedelta(hours=1))
+        urls = [
+            '/api/tourism/attractions/',
+            f'/api/tourism/attractions/{self.attraction.pk}/',
+            '/api/services/items/',
+            '/api/services/items/emergency/',
+            '/api/services/items/by_parent_category/?parent=medical',
+            f'/api/services/categories/{self.medical.pk}/services/',
+            '/api/services/categories/hierarchy/',
+            '/api/hospitality/hotels/',
+            '/api/marketplace/products/',
+            '/api/nearby/?lat=25.44&lon=30.55',
+            '/api/map/tiles/?bbox=29,24,31,26&zoom=5',
+            '/api/map/tiles/?bbox=30.5,25.4,30.6,25.5&zoom=14',
+            '/api/search/?q=temple',
+            f'/api/sync/?since={token}',
+        ]
+        for url in urls:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(url).status_code, 200)
+                self.assertEqual(self.unindexed_scans(ctx.captured_queries), [])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/tourism/attractions/generate_plan/',
+                                        {'days': 2, 'interests': ['natural']}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.unindexed_scans(ctx.captured_queries), [])
+
+
+class FakeCatalogTests(TestCase):
+    def test_generate_and_clear(self):
+        real = Attraction.objects.create(
+            name="Temple of Hibis", description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+        out = io.StringIO()
+        call_command('generate_fake_catalog', scale=50, stdout=out)
+        self.assertIn("50 attraction, 12 hotel, 50 service, 25 product", out.getvalue())
+
+        self.assertFalse(Service.objects.filter(geohash='').exists())
+        self.assertEqual(POIIndex.objects.count(), 1 + 50 + 12 + 50)
+        roots = ServiceCategory.objects.filter(parent=None)
+        self.assertEqual(sum(roots.values_list('total_services', flat=True)), 50)
+        self.assertEqual(search.search('temple', ['attraction'], 100)[0]['type'], 'attraction')
+
+        fake = Attraction.objects.exclude(pk=real.pk).first()
+        artifact = DigitalArtifact.objects.create(name="Mummy mask", description="", related_attraction=fake)
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('generate_fake_catalog', clear=True, stdout=io.StringIO())
+        # Bulk deletes and one rebuild, not signal handlers per row
+        self.assertLess(len(ctx.captured_queries), 60)
+        self.assertEqual(list(Attraction.objects.values_list('pk', flat=True)), [real.pk])
+        self.assertFalse(ServiceCategory.objects.exists())
+        self.assertEqual(POIIndex.objects.count(), 1)
+        self.assertEqual(search.search('temple', ['attraction'], 100)[0]['id'], real.pk)
+        self.assertIsNone(DigitalArtifact.objects.get(pk=artifact.pk).related_attraction_id)
+        self.assertTrue(Tombstone.objects.filter(doc_type='attraction', object_id=fake.pk).exists())
+
+    def test_benchmark_baseline_round_trip(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'baseline.json')
+        options = {'scale': 20, 'requests': 2, 'endpoints': 'attraction-list,category-hierarchy'}
+        call_command('benchmark_api', save=path, stdout=io.StringIO(), **options)
+        with open(path) as f:
+            baseline = json.load(f)
+        self.assertEqual(baseline['rows']['attraction'], 20)
+        self.assertEqual(baseline['endpoints']['attraction-list']['status'], 200)
+        self.assertGreater(baseline['endpoints']['attraction-list']['bytes'], 0)
+        # The synthetic rows are rolled back
+        self.assertFalse(Attraction.objects.exists())
+
+        baseline['endpoints']['category-hierarchy']['queries'] = 0
+        with open(path, 'w') as f:
+            json.dump(baseline, f)
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, "category-hierarchy"):
+            call_command('benchmark_api', baseline=path, fail_on_regression=True, stdout=out, **options)
+
+
+class SeedingTests(TestCase):
+    dataset = {
+        'categories': [
+            {'slug': 'medical', 'name': "Medical"},
+            {'slug': 'hospitals', 'name': "Hospitals", 'parent': 'medical'},
+        ],
+        'attractions': [
+            {'name': "Temple of Hibis", 'description': "Persian temple", 'attraction_type': 'historical',
+             'latitude': "25.467800", 'longitude': "30.551600", 'address': "Kharga",
+             'visit_duration_minutes': 90, 'opening_time': "08:00", 'closing_time': "17:00"},
+        ],
+        'services': [
+            {'name': "Kharga Hospital", 'description': "", 'category': 'hospitals', 'is_emergency': True,
+             'latitude': "25.440000", 'longitude': "30.550000", 'address': "Kharga"},
+        ],
+    }
+
+    def load(self, data=None, **kwargs):
+        return seeding.load_dataset(json.loads(json.dumps(data or self.dataset)), **kwargs)
+
+    def test_load_is_idempotent(self):
+        result = self.load()
+        self.assertEqual(result['categories']['created'], 2)
+        hospitals = ServiceCategory.objects.get(slug='hospitals')
+        self.assertEqual(hospitals.parent.slug, 'medical')
+        self.assertEqual(ServiceCategory.objects.get(slug='medical').total_services, 1)
+        self.assertEqual(POIIndex.objects.get(poi_type='service').category, "Medical > Hospitals")
+        self.assertTrue(Attraction.objects.get().geohash)
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.load()
+        # One SELECT per section plus the savepoint; nothing is written
+        self.assertEqual(len(ctx.captured_queries), 3 + 2)
+        self.assertEqual({counts['unchanged'] for counts in result.values()}, {1, 2})
+
+    def test_reseed_keeps_primary_keys_and_deletes_missing_rows(self):
+        self.load()
+        temple = Attraction.objects.get()
+        artifact = DigitalArtifact.objects.create(name="Hibis relief", description="", related_attraction=temple)
+        extra = Attraction.objects.create(
+            name="Old entry", description="", latitude=25, longitude=30, address="Kharga",
+            attraction_type='natural', visit_duration_minutes=30, opening_time=time(8), closing_time=time(9),
+        )
+
+        data = json.loads(json.dumps(self.dataset))
+        data['attractions'][0]['description'] = "Largest temple of the Persian period"
+        result = self.load(data)
+
+        self.assertEqual(result['attractions'], {'created': 0, 'updated': 1, 'deleted': 1, 'unchanged': 0})
+        artifact.refresh_from_db()
+        self.assertEqual(artifact.related_attraction_id, temple.pk)
+        self.assertEqual(Attraction.objects.get().description, "Largest temple of the Persian period")
+        self.assertFalse(Attraction.objects.filter(pk=extra.pk).exists())
+        self.assertTrue(Tombstone.objects.filter(doc_type='attraction', object_id=extra.pk).exists())
+
+    def test_invalid_datasets_roll_back(self):
+        data = json.loads(json.dumps(self.dataset))
+        data['services'][0]['category'] = 'pharmacies'
+        with self.assertRaisesMessage(seeding.DatasetError, "'pharmacies' not found in categories"):
+            self.load(data)
+        self.assertFalse(ServiceCategory.objects.exists())
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'catalog.json')
+        with open(path, 'w') as f:
+            json.dump({'spaceships': []}, f)
+        with self.assertRaisesMessage(CommandError, "Unknown section(s): spaceships"):
+            call_command('load_dataset', path, stdout=io.StringIO())
+
+
+    def test_duplicate_natural_keys_in_the_database_are_rejected(self):
+        for _ in range(2):
+            Attraction.objects.create(
+                name="Temple of Hibis", description="", latitude=25, longitude=30, address="Kharga",
+                attraction_type='historical', visit_duration_minutes=30, opening_time=time(8), closing_time=time(9),
+            )
+        with self.assertRaisesMessage(seeding.DatasetError, "'Temple of Hibis' is the name of more than one"):
+            self.load()
+        self.assertEqual(Attraction.objects.count(), 2)
+
+    def test_dry_run_deletes_nothing(self):
+        self.load()
+        extra = Attraction.objects.create(
+            name="Old entry", description="", latitude=25, longitude=30, address="Kharga",
+            attraction_type='natural', visit_duration_minutes=30, opening_time=time(8), closing_time=time(9),
+        )
+        generation = cache.get_generation('tourism')
+
+        with mock.patch('tourism.ai_planner.snapshot.invalidate') as invalidate:
+            result = self.load(dry_run=True)
+
+        self.assertEqual(result['attractions']['deleted'], 1)
+        self.assertTrue(Attraction.objects.filter(pk=extra.pk).exists())
+        self.assertFalse(Tombstone.objects.filter(doc_type='attraction', object_id=extra.pk).exists())
+        self.assertEqual(cache.get_generation('tourism'), generation)
+        invalidate.assert_not_called()
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        metrics.registry.reset()
+        Attraction.objects.create(
+            name="Hibis Temple", description="", latitude=25.44, longitude=30.55,
+            attraction_type='historical', visit_duration_minutes=60,
+            opening_time=time(8), closing_time=time(17),
+        )
+
+    def test_requests_are_recorded_per_endpoint(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/tourism/attractions/')
+        queries = len(ctx.captured_queries)
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'],
+                         rf'^app;dur=[\d.]+, db;dur=[\d.]+;desc="{queries} queries", render;dur=[\d.]+$')
+        self.client.get('/api/tourism/attractions/')
+        self.client.get('/no-such-page/')
+
+        snapshot = metrics.registry.snapshot()
+        recorded = snapshot['attraction-list']
+        self.assertEqual(dict(recorded.statuses), {200: 2})
+        self.assertEqual(recorded.queries.max, queries)
+        self.assertEqual(recorded.bytes.max, len(response.content))
+        self.assertGreater(recorded.render_us.count, 0)
+        self.assertEqual(dict(snapshot[metrics.UNMATCHED].statuses), {404: 1})
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_endpoint_needs_staff_or_token(self):
+        self.client.get('/api/tourism/attractions/')
+        self.assertEqual(self.client.get('/api/internal/metrics/').status_code, 403)
+        self.assertEqual(
+            self.client.get('/api/internal/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403
+        )
+
+        response = self.client.get('/api/internal/metrics/', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('nvh_http_responses_total{endpoint="attraction-list",status="200"} 1\n', text)
+        self.assertIn('# TYPE nvh_http_request_duration_seconds summary\n', text)
+        self.assertIn('nvh_http_request_db_queries_count{endpoint="attraction-list"} 1\n', text)
+        self.assertRegex(text, r'nvh_http_request_duration_seconds\{endpoint="attraction-list",quantile="0.99"\} [\d.e-]+\n')
+
+        staff = get_user_model().objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get('/api/internal/metrics/').status_code, 200)
+
+    def test_histogram_quantiles_are_within_bucket_precision(self):
+        histogram = metrics.Histogram()
+        values = list(range(1, 100001))
+        for value in values:
+            histogram.record(value)
+        self.assertEqual((histogram.count, histogram.total, histogram.max), (100000, sum(values), 100000))
+        for fraction in (0.5, 0.9, 0.99):
+            exact = values[int(fraction * len(values)) - 1]
+            self.assertLessEqual(abs(histogram.quantile(fraction) - exact) / exact, 1 / 2 ** (metrics.SUB_BITS - 1))
+        self.assertEqual(metrics.Histogram().quantile(0.5), 0)
+
+
+class QueryWatchTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.medical = ServiceCategory.objects.create(name="Medical", slug="medical")
+        for name in ("Hospitals", "Pharmacies", "Clinics"):
+            category = ServiceCategory.objects.create(name=name, slug=name.lower(), parent=self.medical)
+            for i in range(3):
+                Service.objects.create(name=f"{name} {i}", description="", category=category, address="Kharga",
+                                       latitude=25.44, longitude=30.55, is_emergency=True)
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            querywatch.fingerprint('SELECT * FROM t WHERE id = 12 AND name = \'it\'\'s\' AND pk IN (%s, %s,  %s)'),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND pk IN (...)',
+        )
+        self.assertEqual(querywatch.fingerprint('SELECT 1 FROM t WHERE pk IN (%s)'), 'SELECT ? FROM t WHERE pk IN (...)')
+
+    def test_repeats_name_the_serializer_field(self):
+        with self.assertRaises(querywatch.RepeatedQueriesError) as raised:
+            with querywatch.assert_no_repeated_queries():
+                ServiceSerializer(Service.objects.all(), many=True).data
+        message = str(raised.exception)
+        # The category and parent lookups share a shape; the 6th is a parent_category one
+        self.assertIn("18x rendering ServiceSerializer.parent_category: SELECT", message)
+        self.assertRegex(message, r'services/serializers.py", line \d+, in get_parent_category')
+
+        with querywatch.assert_no_repeated_queries() as watcher:
+            ServiceSerializer(Service.objects.select_related('category__parent'), many=True).data
+        self.assertEqual(watcher.repeats, [])
+
+    @override_settings(QUERY_WATCH='raise')
+    def test_service_endpoints_have_no_per_row_queries(self):
+        category = ServiceCategory.objects.get(slug='hospitals')
+        for url in (
+            '/api/services/items/', '/api/services/items/emergency/',
+            '/api/services/items/by_parent_category/', '/api/services/items/by_parent_category/?parent=medical',
+            '/api/services/categories/', '/api/services/categories/hierarchy/',
+            f'/api/services/categories/{self.medical.pk}/services/', f'/api/services/categories/{category.pk}/services/',
+            f'/api/sync/?since={sync.encode_token(timezone.now() - timedelta(hours=1))}',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(QUERY_WATCH='log', QUERY_WATCH_SLOW_MS=0)
+    def test_log_mode_reports_slow_queries(self):
+        with self.assertLogs('core.querywatch', 'WARNING') as logs:
+            self.client.get('/api/services/items/emergency/')
+        self.assertIn("Slow query", logs.output[0])
+        self.assertIn("services_service", '\n'.join(logs.output))
+
+
+class FastPathTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        fake_catalog.generate(120)
+        root = ServiceCategory.objects.filter(parent=None).first()
+        self.unparented = Service.objects.create(
+            name="Root level service", description="", category=root, address="Kharga",
+            latitude=25.5, longitude=30, is_emergency=True,
+        )
+        Product.objects.create(name="Dates", description="", price=5, seller_name="Farm", seller_contact="0100")
+
+    def test_payloads_match_the_serializers(self):
+        for serializer_class, queryset in (
+            (AttractionSerializer, Attraction.objects.all()),
+            (HotelSerializer, Hotel.objects.all()),
+            (ServiceSerializer, Service.objects.select_related('category__parent')),
+            (ProductSerializer, Product.objects.all()),
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                fast = fastpath.serialize_list(serializer_class(), queryset)
+                self.assertEqual(JSONRenderer().render(fast),
+                                 JSONRenderer().render(serializer_class(queryset, many=True).data))
+        self.assertIsNone(fastpath.compile_plan(DigitalArtifactSerializer()))
+
+    def test_endpoints_match_the_drf_path(self):
+        category = ServiceCategory.objects.filter(parent=None).first()
+        urls = [
+            '/api/tourism/attractions/', '/api/hospitality/hotels/?page_size=7', '/api/marketplace/products/',
+            '/api/services/items/', '/api/services/items/emergency/', '/api/services/items/?fields=name,parent_category',
+            f'/api/services/items/by_parent_category/?parent={category.slug}',
+        ]
+        fast = {url: self.client.get(url) for url in urls}
+        next_page = fast['/api/hospitality/hotels/?page_size=7'].json()['next']
+        fast[next_page] = self.client.get(next_page)
+
+        django_cache.clear()
+        fastpath.FastListMixin.fast_list = False
+        self.addCleanup(setattr, fastpath.FastListMixin, 'fast_list', True)
+        for url, response in fast.items():
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, self.client.get(url).content)
+
+        response = self.client.get(f'/api/services/categories/{category.pk}/services/')
+        expected = ServiceSerializer(category.get_all_services().select_related('category__parent'), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+        self.assertIn(self.unparented.pk, [row['id'] for row in response.json()])
+
+    def test_plan_cache_is_bounded(self):
+        self.addCleanup(fastpath._plans.clear)
+        fastpath._plans.clear()
+        serializer = HotelSerializer()
+        # 'id' is used again before 'stars' comes in, so 'name' is the one dropped
+        for fields in ('id', 'name', 'id', 'stars'):
+            with mock.patch.object(fastpath, 'MAX_PLANS', 2):
+                serializer.fields = {name: HotelSerializer().fields[name] for name in fields.split(',')}
+                self.assertIsNotNone(fastpath.compile_plan(serializer))
+        self.assertEqual([fields for _, fields in fastpath._plans], [('id',), ('stars',)])
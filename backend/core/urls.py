@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('nearby/', views.nearby, name='nearby'),
+    path('map/tiles/', views.map_tiles, name='map-tiles'),
+    path('search/', views.search_catalog, name='search'),
+    path('sync/', views.sync_changes, name='sync'),
+    path('internal/cache-stats/', views.cache_stats, name='cache-stats'),
+    path('internal/metrics/', views.request_metrics, name='metrics'),
+]
@@ -1,3 +1,201 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+from PIL import Image, UnidentifiedImageError
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
-# Create your views here.
+from . import cache, images, mapgrid, metrics, search, sync
+from .poi import parse_poi_types
+from .spatial import find_nearby
+
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 1000.0
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_MAP_ZOOM = 20
+MAX_MAP_POINTS = 500
+DEFAULT_SEARCH_LIMIT = 20
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+THUMBNAIL_CACHE_CONTROL = 'public, max-age=86400'
+
+
+@api_view(['GET'])
+def nearby(request):
+    """Nearest attractions, hotels and services around a coordinate."""
+    params = request.query_params
+    try:
+        lat = float(params['lat'])
+        lon = float(params['lon'])
+        radius_km = float(params.get('radius_km', DEFAULT_RADIUS_KM))
+    except KeyError:
+        return Response({"error": "lat and lon are required"}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response({"error": "lat, lon and radius_km must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return Response({"error": "limit must be a whole number"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        types = parse_poi_types(params.get('types'))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return Response({"error": "Coordinates out of range"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        return Response({"error": f"radius_km must be between 0 and {MAX_RADIUS_KM:g}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    results = find_nearby(lat, lon, radius_km, types, limit)
+    return Response({"count": len(results), "results": results})
+
+
+@api_view(['GET'])
+def map_tiles(request):
+    """
+    Markers for a map viewport: pre-aggregated clusters up to
+    mapgrid.CLUSTER_MAX_ZOOM, individual POIs when zoomed in further.
+    """
+    params = request.query_params
+    try:
+        bbox = [float(v) for v in params['bbox'].split(',')]
+        zoom = int(params['zoom'])
+        types = parse_poi_types(params.get('types'))
+    except KeyError:
+        return Response({"error": "bbox and zoom are required"}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if len(bbox) != 4:
+        return Response({"error": "bbox must be west,south,east,north"}, status=status.HTTP_400_BAD_REQUEST)
+    west, south, east, north = bbox
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        return Response({"error": "bbox must be west,south,east,north"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 <= zoom <= MAX_MAP_ZOOM:
+        return Response({"error": f"zoom must be between 0 and {MAX_MAP_ZOOM}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if zoom <= mapgrid.CLUSTER_MAX_ZOOM:
+        return Response({"zoom": zoom, "clusters": mapgrid.clusters_in_bbox(bbox, zoom, types), "points": []})
+    return Response({"zoom": zoom, "clusters": [], "points": mapgrid.points_in_bbox(bbox, types, MAX_MAP_POINTS)})
+
+
+@api_view(['GET'])
+def search_catalog(request):
+    """Full-text search over attractions, hotels, services, products and artifacts."""
+    params = request.query_params
+    query = params.get('q', '').strip()
+    if not query:
+        return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = max(1, min(int(params.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        return Response({"error": "limit must be a whole number"}, status=status.HTTP_400_BAD_REQUEST)
+    doc_types = list(search.SEARCH_MODELS)
+    if params.get('types'):
+        doc_types = [t.strip() for t in params['types'].split(',') if t.strip()]
+        unknown = [t for t in doc_types if t not in search.SEARCH_MODELS]
+        if unknown:
+            return Response({"error": f"Unknown type(s): {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = search.search(query, doc_types, limit)
+    return Response({"count": len(results), "results": results})
+
+
+@api_view(['GET'])
+def sync_changes(request):
+    """
+    Catalog rows created, updated or deleted since ``?since=<token>``.
+    Without a token (or with one older than the kept tombstones) every row
+    is returned with "full": true.
+    """
+    params = request.query_params
+    try:
+        since = sync.decode_token(params['since']) if params.get('since') else None
+    except (ValueError, OverflowError, OSError):
+        return Response({"error": "Invalid sync token"}, status=status.HTTP_400_BAD_REQUEST)
+    doc_types = list(sync.SYNC_MODELS)
+    if params.get('types'):
+        doc_types = [t.strip() for t in params['types'].split(',') if t.strip()]
+        unknown = [t for t in doc_types if t not in sync.SYNC_MODELS]
+        if unknown:
+            return Response({"error": f"Unknown type(s): {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(sync.changes_since(since, doc_types, {"request": request}))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """Response cache hit/miss counters for this process and the current generations."""
+    return Response({"endpoints": cache.stats.snapshot(), "generations": cache.generations()})
+
+
+@require_safe
+def request_metrics(request):
+    """
+    Per-endpoint request metrics of this process in the Prometheus text
+    format, for staff sessions or ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    bearer = request.headers.get('Authorization', '')
+    if not (request.user.is_staff or (token and constant_time_compare(bearer, f'Bearer {token}'))):
+        return JsonResponse({"error": "Staff login or metrics token required"}, status=403)
+    return HttpResponse(metrics.registry.prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_safe
+def image_thumbnail(request, doc_type, pk, width, height, fmt):
+    """
+    Resized copy of a catalog image, e.g. /img/attraction/3/400x240.webp,
+    cropped to cover the box (a height of 0 keeps the aspect ratio). The
+    original is fetched once; renders are kept in the derivative cache.
+    Only the THUMBNAIL_SIZES the frontend asks for are rendered. With a
+    ``?v=`` matching the current source URL (images.source_version, so a
+    new image gets a new address) the response is cacheable forever.
+    """
+    if doc_type not in images.IMAGE_SOURCES or fmt not in images.THUMBNAIL_FORMATS:
+        raise Http404
+    sizes = [tuple(size) for size in settings.THUMBNAIL_SIZES]
+    if (width, height) not in sizes:
+        return JsonResponse({"error": f"Sizes must be one of {', '.join(f'{w}x{h}' for w, h in sizes)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+    model, field = images.get_image_source(doc_type)
+    url = model.objects.filter(pk=pk).values_list(field, flat=True).first()
+    if not url:
+        raise Http404
+
+    fetched = images.ImageFetcher(revalidate=False).fetch(url)
+    if not fetched.ok:
+        return JsonResponse({"error": f"Could not fetch the original: {fetched.error or fetched.status}"},
+                            status=status.HTTP_502_BAD_GATEWAY)
+    key = images.thumbnail_key(fetched.sha256 or images.file_sha256(fetched.path), width, height, fmt)
+    content_type = images.THUMBNAIL_FORMATS[fmt][1]
+
+    response = get_conditional_response(request, etag=f'"{key[:32]}"')
+    if response is None:
+        derivatives = images.derivative_cache()
+        path = derivatives.get(key, fmt)
+        if path is not None:
+            try:
+                response = FileResponse(open(path, 'rb'), content_type=content_type)
+            except FileNotFoundError:
+                pass  # evicted since get(); render it again
+        if response is None:
+            try:
+                data = images.render_thumbnail(fetched.path, width, height, fmt)
+            except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+                return JsonResponse({"error": "The original is not a readable image"},
+                                    status=status.HTTP_502_BAD_GATEWAY)
+            derivatives.put(key, fmt, data)
+            response = HttpResponse(data, content_type=content_type)
+    response['ETag'] = f'"{key[:32]}"'
+    # A stale or made-up version must not pin this image for a year
+    immutable = request.GET.get('v') == images.source_version(url)
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else THUMBNAIL_CACHE_CONTROL
+    return response
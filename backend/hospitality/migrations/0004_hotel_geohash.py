@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:20
+
+from django.db import migrations, models
+
+from core.geo import geohash_encode
+
+
+def populate_geohash(apps, schema_editor):
+    Hotel = apps.get_model('hospitality', 'Hotel')
+    rows = list(Hotel.objects.only('latitude', 'longitude'))
+    for row in rows:
+        row.geohash = geohash_encode(row.latitude, row.longitude)
+    Hotel.objects.bulk_update(rows, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospitality', '0003_hotel_google_map_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospitality', '0004_hotel_geohash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hotel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from rest_framework import serializers
+
+from core.serializers import SparseFieldsetMixin
 from .models import Hotel
 
-class HotelSerializer(serializers.ModelSerializer):
+class HotelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Hotel
         fields = '__all__'
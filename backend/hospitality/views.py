@@ -1,7 +1,9 @@
 from rest_framework import viewsets
+from core.cache import CachedResponseMixin
+from core.fastpath import FastListMixin
 from .models import Hotel
 from .serializers import HotelSerializer
 
-class HotelViewSet(viewsets.ModelViewSet):
+class HotelViewSet(CachedResponseMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Hotel.objects.all()
     serializer_class = HotelSerializer
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0002_alter_product_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
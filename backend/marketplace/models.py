@@ -9,6 +9,7 @@ class Product(models.Model):
     seller_contact = models.CharField(max_length=50)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
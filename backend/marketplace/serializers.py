@@ -1,7 +1,9 @@
 from rest_framework import serializers
+
+from core.serializers import SparseFieldsetMixin
 from .models import Product
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
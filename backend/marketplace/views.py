@@ -1,7 +1,9 @@
 from rest_framework import viewsets
+from core.cache import CachedResponseMixin
+from core.fastpath import FastListMixin
 from .models import Product
 from .serializers import ProductSerializer
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CachedResponseMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryWatchMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -134,6 +137,58 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5174",
 ]
 
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.StandardCursorPagination',
+    'PAGE_SIZE': 50,
+}
+
+# Full-text search backend (see core.search). Unset, it follows the database:
+# 'core.search.SQLiteFTS5Backend' on SQLite, 'core.search.DatabaseSearchBackend'
+# (icontains) elsewhere
+SEARCH_BACKEND = None
+
+# Response cache for the catalog endpoints (see core.cache). Local memory is
+# per process; with several workers point this at a shared backend, e.g.
+# DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379 (or FileBasedCache + a directory)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'new-valley-hub'),
+    }
+}
+API_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Per-endpoint request metrics (core.middleware.MetricsMiddleware); /api/internal/metrics/
+# is open to staff sessions and to `Authorization: Bearer $METRICS_TOKEN` scrapers
+METRICS_SERVER_TIMING = True
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# N+1 detection (core.querywatch): 'log' warns about query shapes repeated more than
+# QUERY_WATCH_THRESHOLD times in a request, 'raise' fails the request; QUERY_WATCH=raise
+# manage.py test runs the test suite that way
+QUERY_WATCH = os.environ.get('QUERY_WATCH', '')
+QUERY_WATCH_THRESHOLD = 5
+QUERY_WATCH_SLOW_MS = float(os.environ['QUERY_WATCH_SLOW_MS']) if os.environ.get('QUERY_WATCH_SLOW_MS') else None
+
+# Deletions are remembered this long for /api/sync/; older tokens get a full refresh
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Output of `manage.py build_offline_bundle` (content-hashed, served as static files)
+OFFLINE_BUNDLE_DIR = MEDIA_ROOT / 'offline'
+# Output of `manage.py process_media` (responsive variants plus manifest.json)
+MEDIA_VARIANTS_DIR = MEDIA_ROOT / 'variants'
+
+# Remote image originals fetched by `manage.py check_images` (see core.images)
+IMAGE_CACHE_DIR = BASE_DIR / 'cache' / 'images'
+# Wikimedia asks for an identifying User-Agent
+IMAGE_FETCH_USER_AGENT = 'NewValleyHub-ImageFetcher/1.0 (https://github.com/karim238253/new-valley-hub)'
+# Thumbnails rendered by the /img/ proxy; least recently used files go first
+IMAGE_DERIVATIVE_DIR = BASE_DIR / 'cache' / 'derivatives'
+IMAGE_DERIVATIVE_MAX_BYTES = 512 * 1024 * 1024
+# (width, height) the /img/ thumbnail endpoint renders: the 1x and 2x sizes
+# thumbnailProps requests in frontend/src/services/api.js
+THUMBNAIL_SIZES = [(400, 240), (800, 480)]
@@ -22,6 +22,8 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from core.views import image_thumbnail
+
 @api_view(['GET'])
 def api_root(request, format=None):
     return Response({
@@ -31,6 +33,8 @@ def api_root(request, format=None):
         'services-categories': reverse('servicecategory-list', request=request, format=format),
         'hospitality-hotels': reverse('hotel-list', request=request, format=format),
         'marketplace-products': reverse('product-list', request=request, format=format),
+        'nearby': reverse('nearby', request=request, format=format),
+        'sync': reverse('sync', request=request, format=format),
     })
 
 
@@ -41,4 +45,6 @@ urlpatterns = [
     path('api/services/', include('services.urls')),
     path('api/hospitality/', include('hospitality.urls')),
     path('api/marketplace/', include('marketplace.urls')),
+    path('api/', include('core.urls')),
+    path('img/<slug:doc_type>/<int:pk>/<int:width>x<int:height>.<slug:fmt>', image_thumbnail, name='image-thumbnail'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -5,7 +5,8 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'new_valley_hub.settings')
 django.setup()
 
-from tourism.models import GovernorProfile, TeamMember
+from core import seeding
+from tourism.models import GovernorProfile
 
 def seed_governor():
     if GovernorProfile.objects.count() == 0:
@@ -27,30 +28,10 @@ def seed_governor():
         print("Governor Profile already exists.")
 
 def seed_team():
-    members = [
-        {
-            "name": "Sarah Ahmed",
-            "role": "Lead Developer",
-            "profile_url": "https://github.com/sarah-ahmed"
-        },
-        {
-            "name": "Mohamed Ali",
-            "role": "UI/UX Designer",
-            "profile_url": "https://linkedin.com/in/mohamedali"
-        },
-        {
-            "name": "Khaled Omar",
-            "role": "Project Manager",
-            "profile_url": "https://linktr.ee/khaledomar"
-        }
-    ]
-    
-    for member in members:
-        if not TeamMember.objects.filter(name=member["name"]).exists():
-            TeamMember.objects.create(**member)
-            print(f"Created Team Member: {member['name']}")
-        else:
-            print(f"Team Member {member['name']} already exists.")
+    # Team members are part of the catalog dataset; rows not listed there are kept
+    dataset = seeding.read_dataset(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets', 'catalog.json'))
+    counts = seeding.load_dataset({'team': dataset['team']}, delete=False)['team']
+    print(f"Team members: {counts['created']} created, {counts['updated']} updated, {counts['unchanged']} unchanged")
 
 if __name__ == '__main__':
     seed_governor()
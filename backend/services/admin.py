@@ -3,7 +3,7 @@ from .models import Service, ServiceCategory
 
 @admin.register(ServiceCategory)
 class ServiceCategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug', 'parent', 'order')
+    list_display = ('name', 'slug', 'parent', 'order', 'service_count', 'total_services')
     list_filter = ('parent',)
     search_fields = ('name', 'slug')
     prepopulated_fields = {'slug': ('name',)}
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from services import tree
+from services.models import Service, ServiceCategory
+
+
+class Command(BaseCommand):
+    help = "Recompute materialized paths and service counters for every service category"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = tree.rebuild(ServiceCategory, Service)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the category tree; {len(changed)} categories changed"))
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:28
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_tree(apps, schema_editor):
+    # Frozen copy of services.tree.rebuild as of this migration
+    ServiceCategory = apps.get_model('services', 'ServiceCategory')
+    Service = apps.get_model('services', 'Service')
+    categories = list(ServiceCategory.objects.only('id', 'parent_id'))
+    by_id = {c.id: c for c in categories}
+    paths = {}
+
+    def resolve(category):
+        if category.id not in paths:
+            parent = by_id.get(category.parent_id)
+            paths[category.id] = (resolve(parent) if parent else '') + f"{category.id:08d}/"
+        return paths[category.id]
+
+    direct = Counter({
+        row['category_id']: row['n']
+        for row in Service.objects.order_by().values('category_id').annotate(n=Count('id'))
+    })
+    totals = Counter()
+    for category in categories:
+        path = resolve(category)
+        for ancestor in (int(path[i:i + 8]) for i in range(0, len(path), 9)):
+            totals[ancestor] += direct[category.id]
+
+    for category in categories:
+        category.path = paths[category.id]
+        category.depth = len(category.path) // 9 - 1
+        category.service_count = direct[category.id]
+        category.total_services = totals[category.id]
+    ServiceCategory.objects.bulk_update(
+        categories, ['path', 'depth', 'service_count', 'total_services'], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_service_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicecategory',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='servicecategory',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='servicecategory',
+            name='service_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Services directly in this category'),
+        ),
+        migrations.AddField(
+            model_name='servicecategory',
+            name='total_services',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Services in this category and all descendants'),
+        ),
+        migrations.RunPython(build_tree, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0006_servicecategory_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='service',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_emergency', True)), fields=['id'], name='service_emergency_idx'),
+        ),
+    ]
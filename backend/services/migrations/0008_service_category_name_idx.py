@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0007_service_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['category', 'name'], name='service_category_name_idx'),
+        ),
+    ]
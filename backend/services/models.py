@@ -1,4 +1,9 @@
 from django.db import models
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat, Now, Substr
+
+from core.geo import geohash_encode
+from .tree import PATH_STEP, ancestor_ids, build_path, subtree_q
 
 class ServiceCategory(models.Model):
     name = models.CharField(max_length=100)  # e.g., "Dining & Restaurants" or "Fine Dining"
@@ -19,6 +24,14 @@ class ServiceCategory(models.Model):
     order = models.IntegerField(default=0, help_text="Display order within parent")
     description = models.TextField(blank=True, help_text="Category description")
 
+    # Materialized tree (see services.tree) and denormalized counters,
+    # maintained by save() and the Service signals in services.signals
+    path = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    service_count = models.PositiveIntegerField(default=0, editable=False, help_text="Services directly in this category")
+    total_services = models.PositiveIntegerField(default=0, editable=False, help_text="Services in this category and all descendants")
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         verbose_name_plural = "Service Categories"
         ordering = ['parent__order', 'order', 'name']
@@ -32,18 +45,67 @@ class ServiceCategory(models.Model):
         """Check if this is a parent category"""
         return self.parent is None
     
-    def get_all_services(self):
-        """Get all services under this category and its subcategories"""
-        if self.is_parent():
-            # Return services from all subcategories
-            from django.db.models import Q
-            subcategory_ids = self.subcategories.values_list('id', flat=True)
-            return Service.objects.filter(
-                Q(category_id__in=subcategory_ids) | Q(category=self)
-            )
+    # Written only through queryset updates so a stale instance cannot clobber them
+    DERIVED_FIELDS = ('path', 'depth', 'service_count', 'total_services')
+
+    def save(self, *args, **kwargs):
+        old_path = ''
+        if not self._state.adding:
+            old_path = ServiceCategory.objects.filter(pk=self.pk).values_list('path', flat=True).first() or ''
+            update_fields = kwargs.get('update_fields') or [
+                f.name for f in self._meta.concrete_fields if not f.primary_key
+            ]
+            kwargs['update_fields'] = [f for f in update_fields if f not in self.DERIVED_FIELDS]
+        super().save(*args, **kwargs)
+        parent_path = ''
+        if self.parent_id:
+            parent_path = ServiceCategory.objects.filter(pk=self.parent_id).values_list('path', flat=True).first()
+        new_path = build_path(parent_path, self.pk)
+        if new_path != old_path:
+            self._move_subtree(old_path, new_path)
+
+    def _move_subtree(self, old_path, new_path):
+        """Rewrite the paths of this category and its descendants, and move its counts."""
+        categories = ServiceCategory.objects
+        if not old_path:
+            categories.filter(pk=self.pk).update(path=new_path, depth=len(new_path) // PATH_STEP - 1)
         else:
-            # Return services directly under this subcategory
-            return self.services.all()
+            categories.filter(subtree_q(old_path)).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1), output_field=CharField()),
+                depth=F('depth') + (len(new_path) - len(old_path)) // PATH_STEP,
+                updated_at=Now(),
+            )
+            moved = categories.filter(pk=self.pk).values_list('total_services', flat=True).first()
+            if moved:
+                categories.filter(pk__in=ancestor_ids(old_path)[:-1]).update(
+                    total_services=F('total_services') - moved, updated_at=Now(),
+                )
+                categories.filter(pk__in=ancestor_ids(new_path)[:-1]).update(
+                    total_services=F('total_services') + moved, updated_at=Now(),
+                )
+        self.path = new_path
+        self.depth = len(new_path) // PATH_STEP - 1
+
+    @classmethod
+    def adjust_service_counts(cls, category_id, delta):
+        """Add ``delta`` services to a category and the totals of its ancestors."""
+        path = cls.objects.filter(pk=category_id).values_list('path', flat=True).first()
+        if not path:
+            return
+        # Counters are part of the serialized category, so they bump updated_at for sync clients
+        cls.objects.filter(pk=category_id).update(service_count=F('service_count') + delta)
+        cls.objects.filter(pk__in=ancestor_ids(path)).update(total_services=F('total_services') + delta, updated_at=Now())
+
+    def get_descendants(self, include_self=True):
+        """All categories below this one at any depth (single index range scan)."""
+        descendants = ServiceCategory.objects.filter(subtree_q(self.path))
+        if not include_self:
+            descendants = descendants.exclude(pk=self.pk)
+        return descendants
+
+    def get_all_services(self):
+        """Get all services under this category and its subcategories, at any depth"""
+        return Service.objects.filter(subtree_q(self.path, prefix='category__'))
 
 
 class Service(models.Model):
@@ -66,6 +128,7 @@ class Service(models.Model):
     address = models.CharField(max_length=255)
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     
     # Special flags
     is_emergency = models.BooleanField(default=False)
@@ -78,16 +141,31 @@ class Service(models.Model):
     # Metadata
     image = models.URLField(max_length=500, blank=True, help_text="URL to external image (HTTPS)")
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['category', 'name']
+        indexes = [
+            # Partial index: /services/items/emergency/ reads only these rows, in id (cursor) order
+            models.Index(fields=['id'], condition=models.Q(is_emergency=True), name='service_emergency_idx'),
+            # Meta.ordering: unpaginated lists such as a category's services sort without a temp B-tree
+            models.Index(fields=['category', 'name'], name='service_category_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.category.name})"
+
+    def save(self, *args, **kwargs):
+        self.refresh_geohash()
+        super().save(*args, **kwargs)
+
+    def refresh_geohash(self):
+        """Recompute the geohash from the current coordinates."""
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(self.latitude, self.longitude)
     
     def get_full_category_path(self):
-        """Return full category path (e.g., 'Medical Infrastructure > Hospitals')"""
-        if self.category.parent:
-            return f"{self.category.parent.name} > {self.category.name}"
-        return self.category.name
+        """Return full category path (e.g., 'Medical Infrastructure > Hospitals > Clinics')"""
+        ids = ancestor_ids(self.category.path) if self.category.path else [self.category_id]
+        names = dict(ServiceCategory.objects.filter(pk__in=ids).values_list('pk', 'name'))
+        return ' > '.join(names[pk] for pk in ids if pk in names)
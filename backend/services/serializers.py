@@ -1,38 +1,59 @@
 from rest_framework import serializers
+
+from core.serializers import SparseFieldsetMixin
+from . import tree
 from .models import Service, ServiceCategory
 
 
-class ServiceCategorySerializer(serializers.ModelSerializer):
+class ServiceCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for subcategories"""
-    service_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = ServiceCategory
         fields = ['id', 'name', 'slug', 'icon', 'order', 'description', 'service_count']
-    
-    def get_service_count(self, obj):
-        return obj.services.count()
 
 
-class ServiceCategoryHierarchicalSerializer(serializers.ModelSerializer):
+class ServiceCategoryHierarchicalSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for parent categories with nested subcategories"""
     subcategories = ServiceCategorySerializer(many=True, read_only=True)
-    total_services = serializers.SerializerMethodField()
     
     class Meta:
         model = ServiceCategory
         fields = ['id', 'name', 'slug', 'icon', 'order', 'description', 'subcategories', 'total_services']
-    
-    def get_total_services(self, obj):
-        """Get total services across all subcategories"""
-        return obj.get_all_services().count()
 
 
-class ServiceSerializer(serializers.ModelSerializer):
+def parent_category_from_row(row):
+    if row['category__parent'] is None:
+        return None
+    return {
+        'id': row['category__parent'],
+        'name': row['category__parent__name'],
+        'slug': row['category__parent__slug']
+    }
+
+
+def full_category_path_from_row(row, paths):
+    return paths.get(row['category'], '')
+
+
+# Category paths are looked up once per list: the tree is tens of rows at any depth
+full_category_path_from_row.prepare = lambda: tree.full_paths(ServiceCategory)
+
+
+class ServiceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_slug = serializers.CharField(source='category.slug', read_only=True)
     parent_category = serializers.SerializerMethodField()
     full_category_path = serializers.SerializerMethodField()
+
+    # The method fields below computed from a values() row, for core.fastpath
+    values_methods = {
+        'parent_category': (
+            ('category__parent', 'category__parent__name', 'category__parent__slug'), parent_category_from_row,
+        ),
+        'full_category_path': (
+            ('category',), full_category_path_from_row,
+        ),
+    }
     
     class Meta:
         model = Service
@@ -55,5 +76,8 @@ class ServiceSerializer(serializers.ModelSerializer):
         return None
     
     def get_full_category_path(self, obj):
-        """Get full category path as string"""
-        return obj.get_full_category_path()
+        """Get full category path as string (one category query per serialization, not per row)"""
+        root = self.root
+        if not hasattr(root, '_category_paths'):
+            root._category_paths = tree.full_paths(ServiceCategory)
+        return root._category_paths.get(obj.category_id, '')
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.signals import bulk_changed
+from . import tree
+from .models import Service, ServiceCategory
+
+
+@receiver(pre_save, sender=Service)
+def remember_category(sender, instance, raw=False, **kwargs):
+    """Stash the stored category so post_save can detect a move."""
+    instance._previous_category_id = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_category_id = (
+        Service.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Service)
+def update_category_counts(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_category_id', None)
+    if previous == instance.category_id:
+        return
+    if previous is not None:
+        ServiceCategory.adjust_service_counts(previous, -1)
+    ServiceCategory.adjust_service_counts(instance.category_id, 1)
+
+
+@receiver(post_delete, sender=Service)
+def decrement_category_counts(sender, instance, **kwargs):
+    ServiceCategory.adjust_service_counts(instance.category_id, -1)
+
+
+@receiver(bulk_changed, sender=Service)
+@receiver(bulk_changed, sender=ServiceCategory)
+def rebuild_category_counts(sender, **kwargs):
+    """Bulk writes skip save() and the per-row counters above; recompute the tree in one pass."""
+    tree.rebuild(ServiceCategory, Service)
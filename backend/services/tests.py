@@ -1,3 +1,194 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from core.models import POIIndex
+
+from . import tree
+from .models import Service, ServiceCategory
+
+
+class ServiceCategoryHierarchyTests(TestCase):
+    url = '/api/services/categories/hierarchy/'
+
+    def make_tree(self, prefix, parents=2, children=2, services=2):
+        for p in range(parents):
+            parent = ServiceCategory.objects.create(name=f"{prefix} parent {p}", slug=f"{prefix}-p{p}", order=p)
+            for c in range(children):
+                child = ServiceCategory.objects.create(
+                    name=f"{prefix} child {p}.{c}", slug=f"{prefix}-p{p}-c{c}", parent=parent, order=c,
+                )
+                for s in range(services):
+                    Service.objects.create(
+                        name=f"{prefix} service {p}.{c}.{s}", description="", category=child,
+                        address="Kharga", latitude=25.44, longitude=30.55,
+                    )
+
+    def hierarchy_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_query_count_does_not_grow_with_categories(self):
+        self.make_tree('small')
+        small_count, _ = self.hierarchy_query_count()
+
+        self.make_tree('large', parents=4, children=5, services=3)
+        large_count, data = self.hierarchy_query_count()
+
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len(data), 6)
+
+    def test_counts(self):
+        self.make_tree('t', parents=1, children=3, services=2)
+        parent = ServiceCategory.objects.get(slug='t-p0')
+        Service.objects.create(
+            name="Directly under parent", description="", category=parent,
+            address="Kharga", latitude=25.44, longitude=30.55,
+        )
+
+        _, data = self.hierarchy_query_count()
+
+        self.assertEqual(data[0]['total_services'], 7)
+        self.assertEqual([sub['service_count'] for sub in data[0]['subcategories']], [2, 2, 2])
+
+
+class ServiceCategoryTreeTests(TestCase):
+    def make_service(self, category, name="Clinic"):
+        return Service.objects.create(
+            name=name, description="", category=category,
+            address="Kharga", latitude=25.44, longitude=30.55,
+        )
+
+    def counts(self):
+        return {
+            c.slug: (c.service_count, c.total_services)
+            for c in ServiceCategory.objects.all()
+        }
+
+    def setUp(self):
+        self.medical = ServiceCategory.objects.create(name="Medical", slug="medical")
+        self.hospitals = ServiceCategory.objects.create(name="Hospitals", slug="hospitals", parent=self.medical)
+        self.clinics = ServiceCategory.objects.create(name="Clinics", slug="clinics", parent=self.hospitals)
+        self.transport = ServiceCategory.objects.create(name="Transport", slug="transport")
+
+    def test_paths_cover_arbitrary_depth(self):
+        self.assertEqual(self.clinics.depth, 2)
+        self.assertTrue(self.clinics.path.startswith(self.hospitals.path))
+        self.assertEqual(
+            set(self.medical.get_descendants().values_list('slug', flat=True)),
+            {'medical', 'hospitals', 'clinics'},
+        )
+
+    def test_full_category_path_covers_every_level(self):
+        service = self.make_service(self.clinics)
+        expected = "Medical > Hospitals > Clinics"
+
+        self.assertEqual(service.get_full_category_path(), expected)
+        listed = self.client.get('/api/services/items/').json()['results']
+        self.assertEqual([s['full_category_path'] for s in listed], [expected])
+        detail = self.client.get(f'/api/services/items/{service.pk}/').json()
+        self.assertEqual(detail['full_category_path'], expected)
+        self.assertEqual(POIIndex.objects.get(poi_type='service', object_id=service.pk).category, expected)
+
+    def test_counts_follow_service_changes(self):
+        service = self.make_service(self.clinics)
+        self.make_service(self.hospitals, name="General Hospital")
+        self.assertEqual(self.counts()['medical'], (0, 2))
+        self.assertEqual(self.counts()['clinics'], (1, 1))
+        self.assertEqual(self.medical.get_all_services().count(), 2)
+
+        service.category = self.transport
+        service.save()
+        self.assertEqual(self.counts()['medical'], (0, 1))
+        self.assertEqual(self.counts()['transport'], (1, 1))
+
+        service.delete()
+        self.assertEqual(self.counts()['transport'], (0, 0))
+
+    def test_moving_a_subtree_moves_its_counts(self):
+        self.make_service(self.clinics)
+        self.hospitals.parent = self.transport
+        self.hospitals.save()
+
+        self.clinics.refresh_from_db()
+        self.assertTrue(self.clinics.path.startswith(self.transport.path))
+        self.assertEqual(self.counts()['medical'], (0, 0))
+        self.assertEqual(self.counts()['transport'], (0, 1))
+
+    def test_rebuild_matches_incremental_maintenance(self):
+        self.make_service(self.clinics)
+        self.make_service(self.medical, name="Pharmacy")
+        incremental = self.counts()
+        ServiceCategory.objects.update(path='', service_count=0, total_services=0)
+
+        tree.rebuild(ServiceCategory, Service)
+
+        self.assertEqual(self.counts(), incremental)
+
+    def test_rebuild_writes_only_changed_categories(self):
+        self.assertEqual(tree.rebuild(ServiceCategory, Service), [])
+        stamps = dict(ServiceCategory.objects.values_list('slug', 'updated_at'))
+        Service.objects.bulk_create([Service(
+            name="Kharga Clinic", description="", category=self.clinics,
+            address="Kharga", latitude=25.44, longitude=30.55,
+        )])
+
+        changed = tree.rebuild(ServiceCategory, Service)
+
+        self.assertEqual(sorted(changed), sorted([self.medical.pk, self.hospitals.pk, self.clinics.pk]))
+        after = dict(ServiceCategory.objects.values_list('slug', 'updated_at'))
+        self.assertEqual(after['transport'], stamps['transport'])
+        self.assertGreater(after['clinics'], stamps['clinics'])
+
+
+class ServiceListTests(TestCase):
+    url = '/api/services/items/'
+
+    def setUp(self):
+        self.transport = ServiceCategory.objects.create(name="Transport", slug="transport")
+
+    def make_service(self, name):
+        return Service.objects.create(
+            name=name, description="", category=self.transport,
+            address="Kharga", latitude=25.44, longitude=30.55,
+        )
+
+    def ids(self, page):
+        return [s['id'] for s in page['results']]
+
+    def test_paginated_list_is_in_id_order(self):
+        # Cursor pagination orders by id, not Service.Meta.ordering (see core.pagination)
+        first = self.make_service("Taxi Rank")
+        second = self.make_service("Bus Station")
+        self.assertEqual(self.ids(self.client.get(self.url, {'fields': 'id'}).json()), [first.pk, second.pk])
+
+    def test_fields_trims_the_payload(self):
+        service = self.make_service("Taxi Rank")
+
+        results = self.client.get(self.url, {'fields': 'id,name,no_such_field'}).json()['results']
+        self.assertEqual(results, [{'id': service.pk, 'name': "Taxi Rank"}])
+
+        detail = self.client.get(f'{self.url}{service.pk}/', {'fields': 'full_category_path'}).json()
+        self.assertEqual(detail, {'full_category_path': "Transport"})
+
+        full = self.client.get(self.url).json()['results'][0]
+        self.assertIn('parent_category', full)
+        self.assertIn('category_name', full)
+
+    def test_cursor_pages_are_stable_across_writes(self):
+        services = [self.make_service(f"Stop {i}") for i in range(5)]
+        pks = [s.pk for s in services]
+        page = self.client.get(self.url, {'fields': 'id', 'page_size': 2}).json()
+        self.assertEqual(self.ids(page), pks[:2])
+
+        # Rows removed before the cursor or added after it do not shift the next page
+        services[0].delete()
+        added = self.make_service("Stop 5")
+        seen = self.ids(page)
+        while page['next']:
+            page = self.client.get(page['next']).json()
+            seen += self.ids(page)
+
+        self.assertEqual(seen, pks + [added.pk])
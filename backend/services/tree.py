@@ -0,0 +1,89 @@
+"""
+Materialized-path helpers for ServiceCategory.
+
+Every category stores ``path``: the zero-padded ids of its ancestors and
+itself, e.g. ``00000003/00000011/``. A subtree is then the index range
+[path, path with the trailing '/' replaced by '0') because '/' sorts just
+before '0', so subtree queries never walk the parent chain.
+"""
+from collections import Counter
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+PATH_STEP = 9  # 8 digits + '/'
+
+
+def path_segment(pk):
+    return f"{pk:08d}/"
+
+
+def build_path(parent_path, pk):
+    return (parent_path or '') + path_segment(pk)
+
+
+def subtree_q(path, prefix=''):
+    """Q object matching every category whose path starts with ``path``."""
+    return Q(**{f'{prefix}path__gte': path, f'{prefix}path__lt': path[:-1] + '0'})
+
+
+def ancestor_ids(path):
+    """Primary keys on a path, root first, including the category itself."""
+    return [int(path[i:i + PATH_STEP - 1]) for i in range(0, len(path), PATH_STEP)]
+
+
+def full_paths(category_model):
+    """{category id: 'Medical > Hospitals > Clinics'} for every category, in one query."""
+    rows = list(category_model.objects.values_list('pk', 'name', 'path'))
+    names = {pk: name for pk, name, _ in rows}
+    return {
+        pk: ' > '.join(names[ancestor] for ancestor in ancestor_ids(path) if ancestor in names) if path else name
+        for pk, name, path in rows
+    }
+
+
+def rebuild(category_model, service_model):
+    """
+    Recompute path, depth and both counters for every category and write
+    the categories where one of them changed, bumping their updated_at
+    (the counters are serialized, so sync clients need to see the change).
+    Returns the ids written. Takes the model classes so data migrations can
+    pass historical models.
+    """
+    fields = ['path', 'depth', 'service_count', 'total_services']
+    categories = list(category_model.objects.only('id', 'parent_id', *fields))
+    by_id = {c.id: c for c in categories}
+    paths = {}
+
+    def resolve(category):
+        if category.id not in paths:
+            parent = by_id.get(category.parent_id)
+            paths[category.id] = build_path(resolve(parent) if parent else '', category.id)
+        return paths[category.id]
+
+    direct = Counter({
+        row['category_id']: row['n']
+        for row in service_model.objects.order_by().values('category_id').annotate(n=Count('id'))
+    })
+    totals = Counter()
+    for category in categories:
+        for ancestor in ancestor_ids(resolve(category)):
+            totals[ancestor] += direct[category.id]
+
+    changed = []
+    for category in categories:
+        before = [getattr(category, field) for field in fields]
+        category.path = paths[category.id]
+        category.depth = len(category.path) // PATH_STEP - 1
+        category.service_count = direct[category.id]
+        category.total_services = totals[category.id]
+        if [getattr(category, field) for field in fields] != before:
+            changed.append(category)
+    if any(f.name == 'updated_at' for f in category_model._meta.concrete_fields):
+        now = timezone.now()
+        for category in changed:
+            category.updated_at = now
+        fields.append('updated_at')
+    category_model.objects.bulk_update(changed, fields, batch_size=500)
+    return [category.id for category in changed]
+
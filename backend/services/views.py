@@ -1,43 +1,54 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.cache import CachedResponseMixin, cache_response
+from core.fastpath import FastListMixin, serialize_list
 from .models import Service, ServiceCategory
 from .serializers import ServiceSerializer, ServiceCategorySerializer, ServiceCategoryHierarchicalSerializer
 
 
-class ServiceCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ServiceCategoryViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ServiceCategory.objects.all()
     serializer_class = ServiceCategorySerializer
+    # Small tree displayed in its own 'order'; cursor pagination would force pk order
+    pagination_class = None
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def hierarchy(self, request):
         """Get hierarchical structure of all categories"""
-        # Get only parent categories
-        parents = ServiceCategory.objects.filter(parent=None).order_by('order')
-        serializer = ServiceCategoryHierarchicalSerializer(parents, many=True)
+        # Get only parent categories; counts are denormalized columns and
+        # subcategories are prefetched, so the tree costs two queries
+        parents = ServiceCategory.objects.filter(parent=None).order_by('order').prefetch_related('subcategories')
+        serializer = ServiceCategoryHierarchicalSerializer(parents, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def services(self, request, pk=None):
         """Get all services for a specific category (including subcategories if parent)"""
         category = self.get_object()
-        services = category.get_all_services()
-        serializer = ServiceSerializer(services, many=True)
-        return Response(serializer.data)
+        services = category.get_all_services().select_related('category', 'category__parent')
+        data = serialize_list(ServiceSerializer(context=self.get_serializer_context()), services)
+        if data is None:
+            data = ServiceSerializer(services, many=True, context=self.get_serializer_context()).data
+        return Response(data)
 
 
-class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
+class ServiceViewSet(CachedResponseMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
+    # Lists come in id (cursor) order rather than Meta.ordering; see core.pagination
     queryset = Service.objects.select_related('category', 'category__parent').all()
     serializer_class = ServiceSerializer
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def emergency(self, request):
         """Get all emergency services"""
-        services = Service.objects.filter(is_emergency=True)
-        serializer = self.get_serializer(services, many=True)
-        return Response(serializer.data)
+        services = self.get_queryset().filter(is_emergency=True)
+        return self.list_response(services)
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def by_parent_category(self, request):
         """Get services grouped by parent category"""
         parent_slug = request.query_params.get('parent', None)
@@ -45,11 +56,10 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
         if parent_slug:
             try:
                 parent = ServiceCategory.objects.get(slug=parent_slug, parent=None)
-                services = parent.get_all_services()
+                services = parent.get_all_services().select_related('category', 'category__parent')
             except ServiceCategory.DoesNotExist:
                 return Response({"error": "Parent category not found"}, status=404)
         else:
-            services = Service.objects.all()
+            services = self.get_queryset()
         
-        serializer = self.get_serializer(services, many=True)
-        return Response(serializer.data)
+        return self.list_response(services)
@@ -1,72 +1,248 @@
+import heapq
+import threading
+
+import numpy as np
+
+from . import routing
 from .models import Attraction
 
+# Budget Levels:
+# Low: 550 EGP/day
+# Medium: 1300 EGP/day
+# High: 3500 EGP/day
+DAILY_RATES = {
+    'low': 550,
+    'medium': 1300,
+    'high': 3500
+}
+# Longest plan the API accepts
+MAX_DAYS = 14
+
+
+
+class AttractionSnapshot:
+    """
+    In-memory, versioned copy of the attraction columns the planner reads.
+
+    Rows are loaded per attraction_type on first use (the interest filter
+    runs in the database) and kept until invalidate() is called from the
+    post_save/post_delete signals, so repeated plans issue no queries.
+    """
+    FIELDS = (
+        'id', 'name', 'description', 'image', 'ticket_price', 'attraction_type',
+        'latitude', 'longitude', 'visit_duration_minutes', 'opening_time', 'closing_time',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_type = {}
+        self._merged = {}
+        self._complete = False
+        self.version = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._by_type = {}
+            self._merged = {}
+            self._complete = False
+            self.version += 1
+
+    def _store(self, version, rows, types, complete=False):
+        grouped = {t: [] for t in types}
+        for row in rows:
+            grouped.setdefault(row['attraction_type'], []).append(row)
+        with self._lock:
+            # Drop the result if the data changed while we were querying
+            if version != self.version:
+                return grouped
+            for attraction_type, bucket in grouped.items():
+                self._by_type.setdefault(attraction_type, bucket)
+            self._complete = self._complete or complete
+        return grouped
+
+    def _merge(self, version, key, buckets):
+        merged = tuple(heapq.merge(*buckets, key=lambda r: r['id']))
+        with self._lock:
+            if version == self.version:
+                self._merged[key] = merged
+        return merged
+
+    def by_types(self, types):
+        """Rows whose attraction_type is in ``types``, in primary key order."""
+        key = frozenset(types)
+        version = self.version
+        merged = self._merged.get(key)
+        if merged is not None:
+            return merged
+        buckets = dict(self._by_type)
+        missing = [t for t in key if t not in buckets]
+        if missing and not self._complete:
+            rows = Attraction.objects.filter(attraction_type__in=missing).order_by('id').values(*self.FIELDS)
+            buckets.update(self._store(version, rows, missing))
+        return self._merge(version, key, [buckets.get(t, []) for t in key])
+
+    def all(self):
+        """Every attraction, in primary key order."""
+        version = self.version
+        merged = self._merged.get(None)
+        if merged is not None:
+            return merged
+        buckets = dict(self._by_type)
+        if not self._complete:
+            rows = Attraction.objects.exclude(attraction_type__in=list(buckets)).order_by('id').values(*self.FIELDS)
+            buckets.update(self._store(version, rows, [], complete=True))
+        return self._merge(version, None, buckets.values())
+
+
+snapshot = AttractionSnapshot()
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _time_label(minutes):
+    if minutes < 12 * 60:
+        return "Morning"
+    if minutes < 17 * 60:
+        return "Afternoon"
+    return "Evening"
+
+
+def _format_clock(minutes):
+    minutes = int(round(minutes))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class _PreparedPools:
+    """Per-oasis arrays for one candidate list, reused while the snapshot is unchanged."""
+
+    def __init__(self, candidates, pool_key):
+        self.candidates = candidates
+        lat = np.array([float(a['latitude']) for a in candidates])
+        lon = np.array([float(a['longitude']) for a in candidates])
+        self.duration = np.array([a['visit_duration_minutes'] for a in candidates], dtype=float)
+        opening = np.array([_minutes(a['opening_time']) for a in candidates], dtype=float)
+        closing = np.array([_minutes(a['closing_time']) for a in candidates], dtype=float)
+        # A closing time at or before opening means the site stays open past midnight
+        self.opening = opening
+        self.closing = np.where(closing <= opening, closing + 24 * 60, closing)
+
+        oasis_of = routing.nearest_oasis(lat, lon)
+        self.pools = {}
+        for oasis in np.unique(oasis_of):
+            oasis = int(oasis)
+            _, centre_lat, centre_lon = routing.OASES[oasis]
+            members = np.flatnonzero(oasis_of == oasis)
+            start_km = routing.haversine_matrix(
+                np.radians([centre_lat]), np.radians([centre_lon]),
+                np.radians(lat[members]), np.radians(lon[members]),
+            )[0]
+            if len(members) > routing.MAX_POOL_PER_OASIS:
+                keep = np.argpartition(start_km, routing.MAX_POOL_PER_OASIS)[:routing.MAX_POOL_PER_OASIS]
+                keep.sort()
+                members, start_km = members[keep], start_km[keep]
+            matrix = routing.matrix_for((pool_key, oasis))
+            positions = matrix.sync([candidates[i]['id'] for i in members], lat[members], lon[members])
+            self.pools[oasis] = (members, start_km, matrix.submatrix(positions))
+        self.weights = {
+            oasis: float(self.duration[members].sum()) for oasis, (members, _, _) in self.pools.items()
+        }
+
+
+_prepared = {}
+_prepared_version = None
+
+
+def _prepare(candidates, pool_key):
+    global _prepared, _prepared_version
+    version = snapshot.version
+    if _prepared_version != version:
+        _prepared, _prepared_version = {}, version
+    prepared = _prepared.get(pool_key)
+    if prepared is None:
+        prepared = _prepared[pool_key] = _PreparedPools(candidates, pool_key)
+    return prepared
+
+
+def _route_days(candidates, days, pool_key):
+    """
+    Group candidates by nearest oasis, give each oasis whole days and order
+    every day with nearest-neighbour + 2-opt under the opening hours.
+    Returns one (oasis name, [(attraction, start minutes, leg km), ...]) per day.
+    """
+    prepared = _prepare(candidates, pool_key)
+    available = {oasis: np.ones(len(members), dtype=bool) for oasis, (members, _, _) in prepared.pools.items()}
+    routes = []
+    for oasis in routing.allocate_days(prepared.weights, days):
+        members, start_km, dist = prepared.pools[oasis]
+        order, starts, _ = routing.plan_day(
+            available[oasis], start_km, dist,
+            prepared.duration[members], prepared.opening[members], prepared.closing[members],
+        )
+        stops = []
+        previous = None
+        for local, start in zip(order, starts):
+            leg_km = start_km[local] if previous is None else dist[previous, local]
+            stops.append((prepared.candidates[members[local]], start, float(leg_km)))
+            available[oasis][local] = False
+            previous = local
+        routes.append((routing.OASES[oasis][0], stops))
+    return routes
+
+
 def generate_itinerary(days, budget_level, interests):
     """
-    Generates a simple itinerary based on rules.
-    budget_level: 1 (Low), 2 (Medium), 3 (High)
+    Generates an itinerary based on rules.
+    budget_level: 'low', 'medium' or 'high'
     interests: list of strings ['natural', 'historical', 'cultural']
+    Days are spent one oasis at a time and each day's stops are ordered to
+    minimise driving while respecting visit durations and opening hours.
     """
-    all_attractions = Attraction.objects.all()
-    
-    # Simple Mock "AI" Logic
     # 1. Filter by Interest
-    relevant_attractions = [
-        a for a in all_attractions 
-        if a.attraction_type in interests or not interests
-    ]
-    
+    matching = snapshot.by_types(interests) if interests else snapshot.all()
+    candidates = matching
+    pool_key = frozenset(interests) if interests else None
+
     # 2. Add some filler if not enough specific interests
-    if len(relevant_attractions) < days:
-        other_attractions = [a for a in all_attractions if a not in relevant_attractions]
-        relevant_attractions.extend(other_attractions)
-    
-
-    # 4. Calculate Costs
-    # Budget Levels:
-    # Low: 550 EGP/day
-    # Medium: 1300 EGP/day
-    # High: 3500 EGP/day
-    
-    daily_rates = {
-        'low': 550,
-        'medium': 1300,
-        'high': 3500
-    }
-    
+    if len(matching) < days:
+        chosen = {a['id'] for a in matching}
+        candidates = list(matching) + [a for a in snapshot.all() if a['id'] not in chosen]
+        pool_key = (pool_key, 'padded')
+
+    # 3. Calculate Costs
     # Normalize budget string (handle different casings if needed)
-    budget_key = str(budget_level).lower() if str(budget_level).lower() in daily_rates else 'medium'
-    daily_cost = daily_rates[budget_key]
-    
+    budget_key = str(budget_level).lower() if str(budget_level).lower() in DAILY_RATES else 'medium'
+    daily_cost = DAILY_RATES[budget_key]
+
     base_cost = daily_cost * days
-    
-    # A better approach: Sum prices during the loop in Step 3
-    # Let's refactor Step 3 slightly to sum up tickets.
-    
+
+    # 4. Route the days, summing ticket prices as we go
+    routes = _route_days(candidates, days, pool_key) if candidates and days > 0 else []
+
     total_ticket_price = 0
-    # Refill the itinerary loop to include price calculation
     itinerary = []
-    items_per_day = 2 # Basic rule
-    current_idx = 0
     for day in range(1, days + 1):
+        oasis, stops = routes[day - 1] if day <= len(routes) else (None, [])
         day_plan = {
             "day": day,
+            "oasis": oasis,
             "activities": []
         }
-        
-        # Add 1-2 activities per day
-        for _ in range(items_per_day):
-            if current_idx < len(relevant_attractions):
-                attr = relevant_attractions[current_idx]
-                day_plan["activities"].append({
-                    "name": attr.name,
-                    "time": "Morning" if _ == 0 else "Afternoon",
-                    "description": attr.description,
-                    "image": attr.image if attr.image else None,
-                    "price": float(attr.ticket_price)
-                })
-                total_ticket_price += float(attr.ticket_price)
-                current_idx += 1
-        
+
+        for attr, start, leg_km in stops:
+            day_plan["activities"].append({
+                "name": attr['name'],
+                "time": _time_label(start),
+                "start_time": _format_clock(start),
+                "duration_minutes": attr['visit_duration_minutes'],
+                "travel_km": round(leg_km * routing.ROAD_FACTOR, 1),
+                "description": attr['description'],
+                "image": attr['image'] if attr['image'] else None,
+                "price": float(attr['ticket_price'])
+            })
+            total_ticket_price += float(attr['ticket_price'])
+
         itinerary.append(day_plan)
 
     total_estimated_cost = base_cost + total_ticket_price
@@ -75,4 +251,3 @@ def generate_itinerary(days, budget_level, interests):
         "itinerary": itinerary,
         "total_estimated_cost": total_estimated_cost
     }
-
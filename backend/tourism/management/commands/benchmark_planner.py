@@ -0,0 +1,83 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from tourism.ai_planner import generate_itinerary, snapshot
+from tourism.models import Attraction
+
+TYPES = [choice for choice, _ in Attraction.TYPE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark of generate_itinerary: plans/sec at several catalog sizes. "
+        "Runs against a throwaway test database; the configured one is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,1000,100000', help="Comma separated attraction counts")
+        parser.add_argument('--seconds', type=float, default=1.0, help="Time budget per size for warm runs")
+        parser.add_argument('--days', type=int, default=3)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',')]
+        # The catalog has to hold exactly ``size`` attractions, so work on an
+        # empty test database (in memory on SQLite) rather than the real one
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write(f"{'attractions':>12} {'cold ms':>10} {'plans/sec':>12} {'queries/plan':>13}")
+            for size in sizes:
+                with transaction.atomic():
+                    self._populate(size)
+                    cold_ms, rate, queries = self._measure(options['days'], options['seconds'])
+                    transaction.set_rollback(True)
+                self.stdout.write(f"{size:>12} {cold_ms:>10.2f} {rate:>12.0f} {queries:>13}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            snapshot.invalidate()
+
+    def _populate(self, size):
+        rng = random.Random(size)
+        Attraction.objects.bulk_create(
+            [
+                Attraction(
+                    name=f"Benchmark attraction {i}",
+                    description="Synthetic row for planner benchmarking.",
+                    latitude=round(rng.uniform(22.0, 28.5), 6),
+                    longitude=round(rng.uniform(27.0, 31.5), 6),
+                    address="New Valley",
+                    attraction_type=rng.choice(TYPES),
+                    visit_duration_minutes=rng.choice([60, 90, 120, 180]),
+                    opening_time=datetime.time(8, 0),
+                    closing_time=datetime.time(17, 0),
+                    ticket_price=rng.choice([0, 5, 20, 60]),
+                )
+                for i in range(size)
+            ],
+            batch_size=2000,
+        )
+        # bulk_create does not send post_save, so reset the snapshot by hand
+        snapshot.invalidate()
+
+    def _measure(self, days, seconds):
+        interests = ['historical', 'natural']
+
+        start = time.perf_counter()
+        generate_itinerary(days, 'medium', interests)
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        with CaptureQueriesContext(connection) as ctx:
+            generate_itinerary(days, 'medium', interests)
+        queries = len(ctx.captured_queries)
+
+        plans = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            generate_itinerary(days, 'medium', interests)
+            plans += 1
+        rate = plans / (time.perf_counter() - start)
+        return cold_ms, rate, queries
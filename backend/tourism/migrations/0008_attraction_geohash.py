@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:20
+
+from django.db import migrations, models
+
+from core.geo import geohash_encode
+
+
+def populate_geohash(apps, schema_editor):
+    Attraction = apps.get_model('tourism', 'Attraction')
+    rows = list(Attraction.objects.only('latitude', 'longitude'))
+    for row in rows:
+        row.geohash = geohash_encode(row.latitude, row.longitude)
+    Attraction.objects.bulk_update(rows, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0007_governorprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attraction',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0008_attraction_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='digitalartifact',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='governorprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
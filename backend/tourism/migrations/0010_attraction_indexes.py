@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0009_digitalartifact_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attraction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='digitalartifact',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['attraction_type'], name='attraction_type_idx'),
+        ),
+    ]
@@ -14,6 +14,12 @@ class Attraction(BaseLocationModel):
     closing_time = models.TimeField()
     ticket_price = models.DecimalField(max_digits=8, decimal_places=2, default=0.00)
 
+    class Meta:
+        indexes = [
+            # The planner loads attractions by interest (attraction_type IN ...)
+            models.Index(fields=['attraction_type'], name='attraction_type_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -38,6 +44,7 @@ class DigitalArtifact(models.Model):
         blank=True, 
         related_name='artifacts'
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     @property
     def final_image_src(self):
@@ -54,6 +61,7 @@ class TeamMember(models.Model):
     photo = models.ImageField(upload_to='team_photos/', blank=True, null=True)
     photo_url = models.URLField(blank=True, null=True)
     profile_url = models.URLField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     @property
     def final_photo(self):
@@ -74,6 +82,7 @@ class GovernorProfile(models.Model):
     welcome_heading = models.CharField(max_length=200, default="كلمة السيد المحافظ")
     welcome_message = models.TextField(default="يسعدني ويشرفني أن أكون بين أهلي في محافظة الوادي الجديد فالمواطن أول اهتماماتي وأقسمت اليمين لأرعى مصالحه وأن أحافظ عليه. أما تعظيم الموارد المتاحة بالمحافظة وترشيد الاستهلاك والتواصل بين جميع الجهات الإدارية لتوفير الكثير من الجهد والوقت وضرورة حسن معاملة المواطنين والعمل بروح الفريق والالتزام الكامل بتوفير الخدمات من أساسيات العمل بالمحافظة.")
     career_highlights = models.TextField(default="تاريخ التخرج: الكلية الحربية 1/4/1980.\nتولى الوظائف القيادية في سلاح المشاة حتى قائد الفرقة 16 مشاة.\nمساعد قائد المنطقة الشمالية العسكرية.\nرئيس أركان الجيش الثاني الميداني.\nرئيس أركان المنطقة المركزية العسكرية.\nقائد المنطقة الشمالية العسكرية.\nرئيس هيئة البحوث العسكرية.\nالأوسمة: ميدالية الخدمة الطويلة، نوط الواجب العسكري، نوط الخدمة الممتازة.")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         self.pk = 1
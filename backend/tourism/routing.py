@@ -0,0 +1,259 @@
+"""
+Geographic helpers for the itinerary planner: a cached, incrementally
+maintained distance matrix and a time-window aware day router.
+"""
+import threading
+
+import numpy as np
+
+from core.geo import EARTH_RADIUS_KM
+
+# Oasis centres in road order (Baris -> Kharga -> Dakhla -> Farafra).
+# Days are spent in one oasis at a time, following this order.
+OASES = [
+    ('Baris', 24.6700, 30.6010),
+    ('Kharga', 25.4390, 30.5586),
+    ('Dakhla', 25.4950, 28.9790),
+    ('Farafra', 27.0580, 27.9700),
+]
+
+# Desert roads are far from straight lines; scale great-circle distance
+ROAD_FACTOR = 1.3
+AVG_SPEED_KMH = 60.0
+DAY_START_MINUTES = 8 * 60
+DAY_END_MINUTES = 19 * 60
+MAX_STOPS_PER_DAY = 4
+# Candidates considered per oasis (closest to its centre); bounds matrix size
+MAX_POOL_PER_OASIS = 400
+# Cached DistanceMatrix objects; the least recently used one is dropped past this
+MAX_MATRICES = 128
+
+
+def haversine_matrix(lat1, lon1, lat2, lon2):
+    """Pairwise great-circle distances (km) between two sets of points in radians."""
+    dlat = lat2[np.newaxis, :] - lat1[:, np.newaxis]
+    dlon = lon2[np.newaxis, :] - lon1[:, np.newaxis]
+    a = (np.sin(dlat / 2) ** 2
+         + np.cos(lat1)[:, np.newaxis] * np.cos(lat2)[np.newaxis, :] * np.sin(dlon / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class DistanceMatrix:
+    """
+    Symmetric attraction-to-attraction distance matrix keyed by primary key.
+
+    sync() adds unseen attractions and recomputes only the rows/columns of
+    those whose coordinates changed, so a coordinate edit costs O(N) rather
+    than rebuilding the O(N^2) matrix. Storage grows by doubling.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = {}
+        self._ids = []
+        self._lat = np.empty(0)
+        self._lon = np.empty(0)
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _reserve(self, size):
+        capacity = self._matrix.shape[0]
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2, 64)
+        matrix = np.zeros((new_capacity, new_capacity), dtype=np.float32)
+        matrix[:capacity, :capacity] = self._matrix
+        lat = np.zeros(new_capacity)
+        lon = np.zeros(new_capacity)
+        lat[:capacity] = self._lat
+        lon[:capacity] = self._lon
+        self._matrix, self._lat, self._lon = matrix, lat, lon
+
+    def _refresh(self, positions):
+        """Recompute the rows and columns at ``positions`` against every point."""
+        n = len(self._ids)
+        distances = haversine_matrix(
+            self._lat[positions], self._lon[positions], self._lat[:n], self._lon[:n]
+        ).astype(np.float32)
+        self._matrix[positions, :n] = distances
+        self._matrix[:n, positions] = distances.T
+
+    def sync(self, ids, latitudes, longitudes):
+        """Make sure every id is present with the given coordinates; returns their positions."""
+        lat = np.radians(np.asarray(latitudes, dtype=float))
+        lon = np.radians(np.asarray(longitudes, dtype=float))
+        with self._lock:
+            positions = np.empty(len(ids), dtype=np.intp)
+            known = len(self._ids)
+            new_ids = []
+            for i, pk in enumerate(ids):
+                pos = self._index.get(pk)
+                if pos is None:
+                    pos = len(self._ids) + len(new_ids)
+                    new_ids.append(pk)
+                positions[i] = pos
+
+            if new_ids:
+                self._reserve(len(self._ids) + len(new_ids))
+                for pk in new_ids:
+                    self._index[pk] = len(self._ids)
+                    self._ids.append(pk)
+
+            changed = (positions >= known) | (self._lat[positions] != lat) | (self._lon[positions] != lon)
+            stale = positions[changed]
+            if len(stale):
+                self._lat[stale] = lat[changed]
+                self._lon[stale] = lon[changed]
+                self._refresh(stale)
+            return positions
+
+    def remove(self, pk):
+        """Forget an attraction by moving the last entry into its slot."""
+        with self._lock:
+            pos = self._index.pop(pk, None)
+            if pos is None:
+                return
+            last = len(self._ids) - 1
+            if pos != last:
+                last_pk = self._ids[last]
+                self._ids[pos] = last_pk
+                self._index[last_pk] = pos
+                self._lat[pos] = self._lat[last]
+                self._lon[pos] = self._lon[last]
+                self._matrix[pos, :] = self._matrix[last, :]
+                self._matrix[:, pos] = self._matrix[:, last]
+                self._matrix[pos, pos] = 0.0
+            self._ids.pop()
+
+    def submatrix(self, positions):
+        return self._matrix[np.ix_(positions, positions)]
+
+
+_matrices = {}
+_matrices_lock = threading.Lock()
+
+
+def matrix_for(key):
+    """Shared DistanceMatrix for one candidate pool (e.g. interests + oasis), LRU-bounded."""
+    with _matrices_lock:
+        matrix = _matrices.pop(key, None)
+        if matrix is None or len(matrix) > 2 * MAX_POOL_PER_OASIS:
+            # Rebuild once pool churn has left too many unused entries behind
+            matrix = DistanceMatrix()
+        _matrices[key] = matrix
+        while len(_matrices) > MAX_MATRICES:
+            del _matrices[next(iter(_matrices))]
+        return matrix
+
+
+def forget(pk):
+    """Drop a deleted attraction from every cached matrix."""
+    with _matrices_lock:
+        matrices = list(_matrices.values())
+    for matrix in matrices:
+        matrix.remove(pk)
+
+
+def nearest_oasis(latitudes, longitudes):
+    """Index into OASES of the closest oasis for each point (degrees)."""
+    oasis_lat = np.radians([o[1] for o in OASES])
+    oasis_lon = np.radians([o[2] for o in OASES])
+    distances = haversine_matrix(
+        np.radians(np.asarray(latitudes, dtype=float)), np.radians(np.asarray(longitudes, dtype=float)),
+        oasis_lat, oasis_lon,
+    )
+    return distances.argmin(axis=1)
+
+
+def travel_minutes(km):
+    return km * ROAD_FACTOR / AVG_SPEED_KMH * 60.0
+
+
+def schedule(order, start_km, dist, duration, opening, closing):
+    """
+    Simulate a day visiting ``order`` (indices into the local arrays).
+    Returns (start_minutes list, total_km) or None if a time window is missed.
+    """
+    clock = DAY_START_MINUTES
+    starts = []
+    total_km = 0.0
+    previous = None
+    for stop in order:
+        km = start_km[stop] if previous is None else dist[previous, stop]
+        total_km += km
+        begin = max(clock + travel_minutes(km), opening[stop])
+        finish = begin + duration[stop]
+        if finish > min(closing[stop], DAY_END_MINUTES):
+            return None
+        starts.append(begin)
+        clock = finish
+        previous = stop
+    return starts, total_km
+
+
+def two_opt(order, start_km, dist, duration, opening, closing):
+    """Reverse segments while it shortens the route and keeps every window."""
+    best = list(order)
+    best_result = schedule(best, start_km, dist, duration, opening, closing)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(best) - 1):
+            for j in range(i + 1, len(best)):
+                candidate = best[:i] + best[i:j + 1][::-1] + best[j + 1:]
+                result = schedule(candidate, start_km, dist, duration, opening, closing)
+                if result and result[1] + 1e-9 < best_result[1]:
+                    best, best_result = candidate, result
+                    improved = True
+    return best, best_result
+
+
+def plan_day(available, start_km, dist, duration, opening, closing):
+    """
+    Greedy nearest-neighbour route from the oasis centre over the
+    ``available`` boolean mask, then 2-opt. Returns (order, starts, km).
+    """
+    order = []
+    clock = float(DAY_START_MINUTES)
+    current_km = start_km
+    remaining = available.copy()
+    while len(order) < MAX_STOPS_PER_DAY:
+        begin = np.maximum(clock + travel_minutes(current_km), opening)
+        feasible = remaining & (begin + duration <= np.minimum(closing, DAY_END_MINUTES))
+        if not feasible.any():
+            break
+        stop = int(np.where(feasible, current_km, np.inf).argmin())
+        order.append(stop)
+        remaining[stop] = False
+        clock = float(begin[stop] + duration[stop])
+        current_km = dist[stop]
+
+    if not order:
+        return [], [], 0.0
+    order, (starts, total_km) = two_opt(order, start_km, dist, duration, opening, closing)
+    return order, starts, total_km
+
+
+def allocate_days(weights, days):
+    """
+    Split ``days`` between oases given {oasis_index: visit minutes}.
+    Every oasis gets a day if there are enough; the rest follow the weights.
+    Returns oasis indices, one per day, in road order.
+    """
+    oases = sorted(weights)
+    if not oases or days <= 0:
+        return []
+    if days < len(oases):
+        oases = sorted(sorted(oases, key=lambda o: -weights[o])[:days])
+    allocation = {o: 1 for o in oases}
+    extra = days - len(oases)
+    total = sum(weights[o] for o in oases) or 1
+    shares = {o: extra * weights[o] / total for o in oases}
+    for o in oases:
+        allocation[o] += int(shares[o])
+    leftover = days - sum(allocation.values())
+    for o in sorted(oases, key=lambda o: shares[o] - int(shares[o]), reverse=True)[:leftover]:
+        allocation[o] += 1
+    return [o for o in oases for _ in range(allocation[o])]
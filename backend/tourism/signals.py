@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.signals import bulk_changed
+
+from . import routing
+from .ai_planner import snapshot
+from .models import Attraction
+
+
+@receiver([post_save, post_delete, bulk_changed], sender=Attraction)
+def invalidate_planner_snapshot(sender, **kwargs):
+    snapshot.invalidate()
+
+
+@receiver(post_delete, sender=Attraction)
+def forget_planner_distances(sender, instance, **kwargs):
+    routing.forget(instance.pk)
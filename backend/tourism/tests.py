@@ -1,3 +1,193 @@
+import random
+from datetime import time
+
+import numpy as np
 from django.test import TestCase
 
-# Create your tests here.
+from core.signals import bulk_changed
+from . import routing
+from .ai_planner import generate_itinerary, snapshot
+from .models import Attraction
+
+
+class GeneratePlanInputTests(TestCase):
+    url = '/api/tourism/attractions/generate_plan/'
+
+    def setUp(self):
+        Attraction.objects.create(
+            name="Hibis Temple", description="", latitude=25.49, longitude=30.55, address="Kharga",
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+
+    def post(self, body):
+        return self.client.post(self.url, body, content_type='application/json')
+
+    def test_rejects_unknown_interests_and_days(self):
+        for body in (
+            {'interests': ['spaceships']},
+            {'interests': 'natural'},
+            {'interests': [{'type': 'natural'}]},
+            {'days': 0},
+            {'days': 365},
+            {'days': 'many'},
+        ):
+            with self.subTest(body=body):
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+        response = self.post({'days': 2, 'interests': ['historical']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['itinerary']), 2)
+
+    def test_matrix_cache_is_bounded(self):
+        for i in range(routing.MAX_MATRICES + 10):
+            routing.matrix_for(('test', i))
+        self.assertLessEqual(len(routing._matrices), routing.MAX_MATRICES)
+        self.assertIn(('test', routing.MAX_MATRICES + 9), routing._matrices)
+
+
+class AttractionSnapshotTests(TestCase):
+    url = '/api/tourism/attractions/generate_plan/'
+
+    def setUp(self):
+        snapshot.invalidate()
+        self.temple = Attraction.objects.create(
+            name="Hibis Temple", description="", latitude=25.49, longitude=30.55, address="Kharga",
+            attraction_type='historical', visit_duration_minutes=60, opening_time=time(8), closing_time=time(17),
+        )
+        self.desert = Attraction.objects.create(
+            name="White Desert", description="", latitude=27.1, longitude=27.98, address="Farafra",
+            attraction_type='natural', visit_duration_minutes=120, opening_time=time(8), closing_time=time(17),
+        )
+
+    def names(self, interests, days=1):
+        plan = generate_itinerary(days, 'medium', interests)
+        return sorted(a['name'] for day in plan['itinerary'] for a in day['activities'])
+
+    def test_warm_plans_issue_no_queries(self):
+        body = {'days': 2, 'budget': 'medium', 'interests': ['historical', 'natural']}
+        self.client.post(self.url, body, content_type='application/json')
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, body, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(['historical', 'natural'], days=2), ["Hibis Temple", "White Desert"])
+
+    def test_save_and_delete_invalidate(self):
+        self.assertEqual(self.names(['historical']), ["Hibis Temple"])
+        version = snapshot.version
+
+        self.temple.name = "Temple of Hibis"
+        self.temple.save()
+        self.assertGreater(snapshot.version, version)
+        self.assertEqual(self.names(['historical']), ["Temple of Hibis"])
+
+        version = snapshot.version
+        self.temple.delete()
+        self.assertGreater(snapshot.version, version)
+        # No historical sites left, so the plan is padded with the rest
+        self.assertEqual(self.names(['historical']), ["White Desert"])
+
+    def test_bulk_changed_resets(self):
+        self.assertEqual(self.names(['natural']), ["White Desert"])
+        Attraction.objects.filter(pk=self.desert.pk).update(name="Crystal Mountain")
+        # queryset.update() sends no signal, so the snapshot is stale until bulk_changed
+        self.assertEqual(self.names(['natural']), ["White Desert"])
+        bulk_changed.send(sender=Attraction, pks=[self.desert.pk])
+        self.assertEqual(self.names(['natural']), ["Crystal Mountain"])
+
+
+class RoutingTests(TestCase):
+    def setUp(self):
+        snapshot.invalidate()
+        rng = random.Random(7)
+        for i in range(24):
+            _, lat, lon = routing.OASES[i % len(routing.OASES)]
+            opening = rng.choice([8, 9, 13])
+            Attraction.objects.create(
+                name=f"Site {i}", description="", address="New Valley",
+                latitude=round(lat + rng.uniform(-0.15, 0.15), 6), longitude=round(lon + rng.uniform(-0.15, 0.15), 6),
+                attraction_type=rng.choice(['historical', 'natural']), visit_duration_minutes=rng.choice([45, 60, 90]),
+                opening_time=time(opening), closing_time=time(opening + rng.choice([3, 5, 8])),
+            )
+        self.by_name = {a.name: a for a in Attraction.objects.all()}
+
+    def test_each_day_stays_in_one_oasis(self):
+        plan = generate_itinerary(6, 'medium', ['historical', 'natural'])
+        oasis_names = [name for name, _, _ in routing.OASES]
+        for day in plan['itinerary']:
+            stops = [self.by_name[a['name']] for a in day['activities']]
+            self.assertTrue(stops)
+            nearest = routing.nearest_oasis([a.latitude for a in stops], [a.longitude for a in stops])
+            self.assertEqual({oasis_names[i] for i in nearest}, {day['oasis']})
+        # Days follow the road order and every oasis gets one
+        visited = [oasis_names.index(day['oasis']) for day in plan['itinerary']]
+        self.assertEqual(visited, sorted(visited))
+        self.assertEqual(set(visited), set(range(len(oasis_names))))
+
+    def test_time_windows_are_respected(self):
+        plan = generate_itinerary(6, 'medium', [])
+        for day in plan['itinerary']:
+            clock = routing.DAY_START_MINUTES
+            for activity in day['activities']:
+                attraction = self.by_name[activity['name']]
+                hours, minutes = map(int, activity['start_time'].split(':'))
+                start = hours * 60 + minutes
+                opening = attraction.opening_time.hour * 60 + attraction.opening_time.minute
+                closing = attraction.closing_time.hour * 60 + attraction.closing_time.minute
+                self.assertGreaterEqual(start, opening)
+                self.assertGreaterEqual(start + 1, clock)
+                clock = start + activity['duration_minutes']
+                # start_time is rounded to the minute
+                self.assertLessEqual(clock, min(closing, routing.DAY_END_MINUTES) + 1)
+
+    def test_two_opt_never_lengthens_the_route(self):
+        rng = np.random.default_rng(3)
+        for _ in range(50):
+            size = int(rng.integers(2, 7))
+            lat, lon = np.radians(rng.uniform(25, 25.5, size)), np.radians(rng.uniform(30.3, 30.8, size))
+            dist = routing.haversine_matrix(lat, lon, lat, lon)
+            start_km = rng.uniform(0, 30, size)
+            duration = np.full(size, 30.0)
+            opening = np.full(size, float(routing.DAY_START_MINUTES))
+            closing = np.full(size, float(routing.DAY_END_MINUTES))
+            order = [int(i) for i in rng.permutation(size)]
+            _, before = routing.schedule(order, start_km, dist, duration, opening, closing)
+
+            improved, (starts, after) = routing.two_opt(order, start_km, dist, duration, opening, closing)
+
+            self.assertLessEqual(after, before + 1e-9)
+            self.assertEqual(sorted(improved), sorted(order))
+            self.assertEqual(routing.schedule(improved, start_km, dist, duration, opening, closing)[1], after)
+
+    def test_two_opt_keeps_windows_that_a_shorter_order_would_miss(self):
+        # Visiting B (near the start) first is shorter, but A then closes before we arrive
+        start_km = np.array([60.0, 5.0])
+        dist = np.array([[0.0, 60.0], [60.0, 0.0]])
+        duration = np.array([60.0, 60.0])
+        opening = np.array([8 * 60.0, 8 * 60.0])
+        closing = np.array([11 * 60.0, 19 * 60.0])
+        self.assertIsNone(routing.schedule([1, 0], start_km, dist, duration, opening, closing))
+
+        order, (starts, _) = routing.two_opt([0, 1], start_km, dist, duration, opening, closing)
+
+        self.assertEqual(order, [0, 1])
+        for stop, start in zip(order, starts):
+            self.assertGreaterEqual(start, opening[stop])
+            self.assertLessEqual(start + duration[stop], closing[stop])
+
+
+class AttractionListTests(TestCase):
+    def test_filter_by_type(self):
+        for name, attraction_type in (("Hibis Temple", 'historical'), ("White Desert", 'natural')):
+            Attraction.objects.create(
+                name=name, description="", latitude=25.49, longitude=30.55, address="Kharga",
+                attraction_type=attraction_type, visit_duration_minutes=60,
+                opening_time=time(8), closing_time=time(17),
+            )
+
+        response = self.client.get('/api/tourism/attractions/', {'attraction_type': 'natural', 'fields': 'name'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'name': "White Desert"}])
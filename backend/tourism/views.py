@@ -1,32 +1,54 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.cache import CachedResponseMixin
+from core.fastpath import FastListMixin
 from .models import Attraction, DigitalArtifact, TeamMember, GovernorProfile
 from .serializers import AttractionSerializer, DigitalArtifactSerializer, TeamMemberSerializer, GovernorProfileSerializer
-from .ai_planner import generate_itinerary
+from .ai_planner import MAX_DAYS, generate_itinerary
 
-class AttractionViewSet(viewsets.ModelViewSet):
+class AttractionViewSet(CachedResponseMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Attraction.objects.all()
     serializer_class = AttractionSerializer
 
+    def get_queryset(self):
+        """Lists can be narrowed to one type with ?attraction_type= (the tabs of the attractions page)."""
+        queryset = super().get_queryset()
+        attraction_type = self.request.query_params.get('attraction_type')
+        if attraction_type and self.action == 'list':
+            queryset = queryset.filter(attraction_type=attraction_type)
+        return queryset
+
     @action(detail=False, methods=['post'])
     def generate_plan(self, request):
-        days = int(request.data.get('days', 3))
+        try:
+            days = int(request.data.get('days', 3))
+        except (TypeError, ValueError):
+            return Response({"error": "days must be a whole number"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= MAX_DAYS:
+            return Response({"error": f"days must be between 1 and {MAX_DAYS}"}, status=status.HTTP_400_BAD_REQUEST)
         budget = request.data.get('budget', 'medium') # low, medium, high
         interests = request.data.get('interests', []) # list of types
+        known_types = {value for value, _ in Attraction.TYPE_CHOICES}
+        # Interest sets key the planner's caches; only the known types may reach them
+        if not isinstance(interests, list) or not all(isinstance(i, str) and i in known_types for i in interests):
+            return Response(
+                {"error": f"interests must be a list of: {', '.join(sorted(known_types))}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         result = generate_itinerary(days, budget, interests)
         return Response(result)
 
-class DigitalArtifactViewSet(viewsets.ModelViewSet):
+class DigitalArtifactViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = DigitalArtifact.objects.all()
     serializer_class = DigitalArtifactSerializer
 
-class TeamMemberViewSet(viewsets.ModelViewSet):
+class TeamMemberViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
 
-class GovernorProfileViewSet(viewsets.ModelViewSet):
+class GovernorProfileViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = GovernorProfile.objects.all()
     serializer_class = GovernorProfileSerializer
     
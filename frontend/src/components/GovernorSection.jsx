@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import { getGovernorProfiles } from '../services/api';
 
 const GovernorSection = () => {
     const [profile, setProfile] = useState(null);
@@ -7,8 +8,7 @@ const GovernorSection = () => {
     useEffect(() => {
         const fetchProfile = async () => {
             try {
-                const response = await fetch('http://127.0.0.1:8000/api/tourism/governor/');
-                const data = await response.json();
+                const { data } = await getGovernorProfiles();
                 if (data && data.length > 0) {
                     setProfile(data[0]);
                 }
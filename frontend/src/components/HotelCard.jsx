@@ -1,11 +1,12 @@
 import React from 'react';
+import { thumbnailProps } from '../services/api';
 
 const HotelCard = ({ hotel }) => {
     return (
         <div className="bg-white shadow-md rounded-lg overflow-hidden border border-gray-200 hover:shadow-xl transition-shadow duration-300 flex flex-col">
             <div className="h-48 overflow-hidden relative">
                 {hotel.image ? (
-                    <img src={hotel.image} alt={hotel.name} className="w-full h-full object-cover" />
+                    <img {...thumbnailProps('hotel', hotel, 400, 240)} alt={hotel.name} className="w-full h-full object-cover" />
                 ) : (
                     <div className="w-full h-full bg-gray-300 flex items-center justify-center text-gray-500">No Image</div>
                 )}
@@ -0,0 +1,35 @@
+import React, { useEffect, useRef } from 'react';
+
+// Loads the next page of a usePagedList when scrolled into view, with a
+// button for browsers without IntersectionObserver (or a failed page).
+const LoadMore = ({ hasMore, loading, onLoadMore }) => {
+    const sentinel = useRef(null);
+
+    useEffect(() => {
+        if (!hasMore || !sentinel.current || !('IntersectionObserver' in window)) return;
+        const observer = new IntersectionObserver(
+            entries => {
+                if (entries[0].isIntersecting) onLoadMore();
+            },
+            { rootMargin: '400px' }
+        );
+        observer.observe(sentinel.current);
+        return () => observer.disconnect();
+    }, [hasMore, onLoadMore]);
+
+    if (!hasMore) return null;
+
+    return (
+        <div ref={sentinel} className="text-center mt-10">
+            <button
+                onClick={onLoadMore}
+                disabled={loading}
+                className="px-6 py-3 rounded-full font-semibold bg-white text-gray-700 hover:bg-gray-100 shadow-md disabled:opacity-50"
+            >
+                {loading ? 'Loading...' : 'Load more'}
+            </button>
+        </div>
+    );
+};
+
+export default LoadMore;
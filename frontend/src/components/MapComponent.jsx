@@ -1,6 +1,6 @@
-import React, { useEffect, useState } from 'react';
-import { MapContainer, TileLayer, Marker, Popup } from 'react-leaflet';
-import { getAttractions, getServices, getHotels } from '../services/api';
+import React, { useCallback, useEffect, useState } from 'react';
+import { MapContainer, TileLayer, Marker, Popup, useMapEvents } from 'react-leaflet';
+import { getMapTiles } from '../services/api';
 import 'leaflet/dist/leaflet.css';
 import L from 'leaflet';
 
@@ -18,9 +18,77 @@ let DefaultIcon = L.icon({
 
 L.Marker.prototype.options.icon = DefaultIcon;
 
+const TYPE_LABELS = { attraction: 'Attraction', service: 'Service', hotel: 'Hotel' };
+
+const clusterIcon = (count) => L.divIcon({
+    html: `<div class="flex items-center justify-center w-10 h-10 rounded-full bg-blue-600 text-white font-bold border-2 border-white shadow">${count}</div>`,
+    className: '',
+    iconSize: [40, 40],
+    iconAnchor: [20, 20]
+});
+
+// Fetches only the markers inside the current viewport: server-side
+// clusters when zoomed out, individual POIs when zoomed in.
+const ViewportMarkers = () => {
+    const [clusters, setClusters] = useState([]);
+    const [points, setPoints] = useState([]);
+
+    const loadViewport = useCallback((map) => {
+        const bounds = map.getBounds();
+        const clamp = (value, limit) => Math.max(-limit, Math.min(limit, value));
+        const bbox = [
+            clamp(bounds.getWest(), 180),
+            clamp(bounds.getSouth(), 90),
+            clamp(bounds.getEast(), 180),
+            clamp(bounds.getNorth(), 90)
+        ].map(v => v.toFixed(5)).join(',');
+
+        getMapTiles({ bbox, zoom: map.getZoom() })
+            .then(res => {
+                setClusters(res.data.clusters);
+                setPoints(res.data.points);
+            })
+            .catch(error => console.error("Error loading map data:", error));
+    }, []);
+
+    const map = useMapEvents({
+        moveend: () => loadViewport(map)
+    });
+
+    useEffect(() => {
+        loadViewport(map);
+    }, [map, loadViewport]);
+
+    return (
+        <>
+            {clusters.map(cluster => (
+                <Marker
+                    key={`cluster-${cluster.latitude}-${cluster.longitude}`}
+                    position={[cluster.latitude, cluster.longitude]}
+                    icon={cluster.count > 1 ? clusterIcon(cluster.count) : DefaultIcon}
+                    eventHandlers={{
+                        click: () => map.setView([cluster.latitude, cluster.longitude], map.getZoom() + 2)
+                    }}
+                />
+            ))}
+
+            {points.map(loc => (
+                <Marker key={`${loc.type}-${loc.id}`} position={[loc.latitude, loc.longitude]}>
+                    <Popup>
+                        <div className="p-1">
+                            <h3 className="font-bold text-gray-900">{loc.name}</h3>
+                            <div className="badge badge-sm mb-2 text-xs font-semibold uppercase tracking-wider text-gray-500">
+                                {TYPE_LABELS[loc.type] || loc.type}
+                            </div>
+                        </div>
+                    </Popup>
+                </Marker>
+            ))}
+        </>
+    );
+};
+
 const MapComponent = () => {
-    const [locations, setLocations] = useState([]);
-    const [loading, setLoading] = useState(true);
     const [isOffline, setIsOffline] = useState(!navigator.onLine);
 
     useEffect(() => {
@@ -31,45 +99,12 @@ const MapComponent = () => {
         window.addEventListener('online', handleOnline);
         window.addEventListener('offline', handleOffline);
 
-        const fetchData = async () => {
-            // If we are offline initially, don't try to fetch
-            if (!navigator.onLine) {
-                setLoading(false);
-                return;
-            }
-
-            try {
-                const [attractionsRes, servicesRes, hotelsRes] = await Promise.all([
-                    getAttractions(),
-                    getServices(),
-                    getHotels()
-                ]);
-
-                const combinedLocations = [
-                    ...attractionsRes.data.map(item => ({ ...item, type: 'Attraction', color: 'blue' })),
-                    ...servicesRes.data.map(item => ({ ...item, type: 'Service', color: 'green' })),
-                    ...hotelsRes.data.map(item => ({ ...item, type: 'Hotel', color: 'orange' }))
-                ];
-
-                setLocations(combinedLocations);
-            } catch (error) {
-                console.error("Error loading map data:", error);
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        fetchData();
-
         return () => {
             window.removeEventListener('online', handleOnline);
             window.removeEventListener('offline', handleOffline);
         };
     }, []);
 
-    // Initial Loading State (only if online)
-    if (loading && !isOffline) return <div className="text-center p-10">Loading Map...</div>;
-
     // Default center: Kharga Oasis (roughly)
     const center = [25.4390, 30.5586];
 
@@ -95,19 +130,7 @@ const MapComponent = () => {
                         attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
                     />
 
-                    {locations.map(loc => (
-                        <Marker key={`${loc.type}-${loc.id}`} position={[loc.latitude, loc.longitude]}>
-                            <Popup>
-                                <div className="p-1">
-                                    <h3 className="font-bold text-gray-900">{loc.name}</h3>
-                                    <div className="badge badge-sm mb-2 text-xs font-semibold uppercase tracking-wider text-gray-500">
-                                        {loc.type}
-                                    </div>
-                                    <p className="text-sm text-gray-600 line-clamp-2 my-1">{loc.description}</p>
-                                </div>
-                            </Popup>
-                        </Marker>
-                    ))}
+                    <ViewportMarkers />
                 </MapContainer>
             )}
         </div>
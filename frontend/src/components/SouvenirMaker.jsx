@@ -1,5 +1,5 @@
 import React, { useState, useRef, useEffect } from 'react';
-import axios from 'axios';
+import { getArtifacts } from '../services/api';
 import './SouvenirMaker.css';
 
 const SouvenirMaker = () => {
@@ -15,7 +15,7 @@ const SouvenirMaker = () => {
         // Fetch Digital Artifacts from API
         const fetchArtifacts = async () => {
             try {
-                const response = await axios.get('http://127.0.0.1:8000/api/tourism/artifacts/');
+                const response = await getArtifacts();
                 setApiArtifacts(response.data);
                 // Automatically select first artifact if available
                 if (response.data.length > 0) {
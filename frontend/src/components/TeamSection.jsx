@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import axios from 'axios';
+import { getTeamMembers } from '../services/api';
 import { FaGithub, FaLinkedin, FaGlobe } from 'react-icons/fa';
 import { SiLinktree } from 'react-icons/si';
 
@@ -10,7 +10,7 @@ const TeamSection = () => {
     useEffect(() => {
         const fetchTeam = async () => {
             try {
-                const response = await axios.get('http://127.0.0.1:8000/api/tourism/team/');
+                const response = await getTeamMembers();
                 setTeamMembers(response.data);
             } catch (error) {
                 console.error("Error fetching team members:", error);
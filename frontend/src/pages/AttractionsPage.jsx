@@ -1,27 +1,17 @@
-import React, { useEffect, useState } from 'react';
-import { getAttractions } from '../services/api';
+import React, { useCallback, useState } from 'react';
+import { getAttractions, ATTRACTION_CARD_FIELDS } from '../services/api';
+import usePagedList from '../services/usePagedList';
 import AttractionCard from '../components/AttractionCard';
+import LoadMore from '../components/LoadMore';
 
 const AttractionsPage = () => {
-    const [attractions, setAttractions] = useState([]);
-    const [loading, setLoading] = useState(true);
     const [filter, setFilter] = useState('all');
-
-    useEffect(() => {
-        getAttractions()
-            .then(res => {
-                setAttractions(res.data);
-                setLoading(false);
-            })
-            .catch(err => {
-                console.error("Error fetching attractions:", err);
-                setLoading(false);
-            });
-    }, []);
-
-    const filteredAttractions = filter === 'all'
-        ? attractions
-        : attractions.filter(attr => attr.attraction_type === filter);
+    // Filtered on the server: only the first page of the list is loaded
+    const fetchAttractions = useCallback(() => getAttractions({
+        fields: ATTRACTION_CARD_FIELDS,
+        ...(filter !== 'all' && { attraction_type: filter }),
+    }), [filter]);
+    const { items: filteredAttractions, loading, loadingMore, hasMore, loadMore } = usePagedList(fetchAttractions);
 
     if (loading) return (
         <div className="flex justify-center items-center h-screen">
@@ -39,7 +29,7 @@ const AttractionsPage = () => {
                 <div className="container mx-auto text-center">
                     <h1 className="text-4xl md:text-5xl font-bold mb-4">Explore New Valley</h1>
                     <p className="text-xl text-orange-100 max-w-2xl mx-auto">
-                        Discover {attractions.length} breathtaking destinations across the New Valley Governorate
+                        Discover breathtaking destinations across the New Valley Governorate
                     </p>
                 </div>
             </div>
@@ -57,9 +47,6 @@ const AttractionsPage = () => {
                                 }`}
                         >
                             {type === 'all' ? '🌍 All' : type === 'natural' ? '🏜️ Natural' : type === 'historical' ? '🏛️ Historical' : '🎨 Cultural'}
-                            <span className="ml-2 text-sm">
-                                ({type === 'all' ? attractions.length : attractions.filter(a => a.attraction_type === type).length})
-                            </span>
                         </button>
                     ))}
                 </div>
@@ -70,6 +57,7 @@ const AttractionsPage = () => {
                         <AttractionCard key={attr.id} attraction={attr} />
                     ))}
                 </div>
+                <LoadMore hasMore={hasMore} loading={loadingMore} onLoadMore={loadMore} />
 
                 {filteredAttractions.length === 0 && (
                     <div className="text-center text-gray-500 mt-16 p-12 bg-gray-50 rounded-xl">
@@ -1,20 +1,18 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { getAttractions } from '../services/api';
+import { getAttractions, ATTRACTION_CARD_FIELDS } from '../services/api';
 import WeatherWidget from '../components/WeatherWidget';
 import TeamSection from '../components/TeamSection';
 import GovernorSection from '../components/GovernorSection';
 
 const HomePage = () => {
     const [topAttractions, setTopAttractions] = useState([]);
-    const [totalAttractions, setTotalAttractions] = useState(0);
 
     useEffect(() => {
         // Fetch top 3 attractions for highlights
-        getAttractions()
+        getAttractions({ fields: ATTRACTION_CARD_FIELDS, page_size: 3 })
             .then(res => {
-                setTopAttractions(res.data.slice(0, 3));
-                setTotalAttractions(res.data.length);
+                setTopAttractions(res.data);
             })
             .catch(err => console.error("Error fetching attractions:", err));
     }, []);
@@ -166,7 +164,7 @@ const HomePage = () => {
                             to="/attractions"
                             className="inline-block bg-gradient-to-r from-orange-500 to-orange-600 hover:from-orange-600 hover:to-orange-700 text-white px-10 py-4 rounded-full font-bold text-lg shadow-xl transition-all duration-300 hover:scale-105"
                         >
-                            View All {totalAttractions} Attractions →
+                            View All Attractions →
                         </Link>
                     </div>
                 </div>
@@ -1,22 +1,12 @@
-import React, { useEffect, useState } from 'react';
-import { getHotels } from '../services/api';
+import React, { useCallback } from 'react';
+import { getHotels, HOTEL_CARD_FIELDS } from '../services/api';
+import usePagedList from '../services/usePagedList';
 import HotelCard from '../components/HotelCard';
+import LoadMore from '../components/LoadMore';
 
 const HotelsPage = () => {
-    const [hotels, setHotels] = useState([]);
-    const [loading, setLoading] = useState(true);
-
-    useEffect(() => {
-        getHotels()
-            .then(res => {
-                setHotels(res.data);
-                setLoading(false);
-            })
-            .catch(err => {
-                console.error("Error fetching hotels:", err);
-                setLoading(false);
-            });
-    }, []);
+    const fetchHotels = useCallback(() => getHotels({ fields: HOTEL_CARD_FIELDS }), []);
+    const { items: hotels, loading, loadingMore, hasMore, loadMore } = usePagedList(fetchHotels);
 
     if (loading) return <div className="text-center p-10">Loading Hotels...</div>;
 
@@ -28,6 +18,7 @@ const HotelsPage = () => {
                     <HotelCard key={hotel.id} hotel={hotel} />
                 ))}
             </div>
+            <LoadMore hasMore={hasMore} loading={loadingMore} onLoadMore={loadMore} />
             {hotels.length === 0 && (
                 <div className="text-center text-gray-500 mt-10">No hotels found.</div>
             )}
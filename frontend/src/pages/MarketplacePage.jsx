@@ -1,23 +1,10 @@
-import React, { useEffect, useState } from 'react';
+import React from 'react';
 import { getProducts } from '../services/api';
+import usePagedList from '../services/usePagedList';
+import LoadMore from '../components/LoadMore';
 
 const MarketplacePage = () => {
-    const [products, setProducts] = useState([]);
-    const [loading, setLoading] = useState(true);
-    const [error, setError] = useState(null);
-
-    useEffect(() => {
-        getProducts()
-            .then(res => {
-                setProducts(res.data);
-                setLoading(false);
-            })
-            .catch(err => {
-                console.error("Error fetching products:", err);
-                setError(err.message);
-                setLoading(false);
-            });
-    }, []);
+    const { items: products, loading, loadingMore, error, hasMore, loadMore } = usePagedList(getProducts);
 
     if (loading) return (
         <div className="flex justify-center items-center h-screen">
@@ -109,6 +96,7 @@ const MarketplacePage = () => {
                                 </div>
                             ))}
                         </div>
+                        <LoadMore hasMore={hasMore} loading={loadingMore} onLoadMore={loadMore} />
 
                         {/* Info Banner */}
                         <div className="mt-16 bg-gradient-to-r from-blue-50 to-indigo-50 border-l-4 border-blue-500 p-6 rounded-lg">
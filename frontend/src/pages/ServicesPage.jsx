@@ -1,45 +1,31 @@
-import React, { useEffect, useState } from 'react';
-import axios from 'axios';
+import React, { useCallback, useEffect, useState } from 'react';
+import { getServiceHierarchy, getServices, getServicesByParent } from '../services/api';
+import usePagedList from '../services/usePagedList';
+import LoadMore from '../components/LoadMore';
 
 const ServicesPage = () => {
     const [hierarchy, setHierarchy] = useState([]);
-    const [services, setServices] = useState([]);
-    const [totalServicesCount, setTotalServicesCount] = useState(0);
     const [selectedParent, setSelectedParent] = useState(null);
-    const [loading, setLoading] = useState(true);
 
     useEffect(() => {
         // Fetch hierarchical categories
-        axios.get('http://127.0.0.1:8000/api/services/categories/hierarchy/')
+        getServiceHierarchy()
             .then(res => {
                 setHierarchy(res.data);
             })
             .catch(err => console.error("Error fetching hierarchy:", err));
-
-        // Fetch all services
-        axios.get('http://127.0.0.1:8000/api/services/items/')
-            .then(res => {
-                setServices(res.data);
-                setTotalServicesCount(res.data.length);
-                setLoading(false);
-            })
-            .catch(err => {
-                console.error("Error fetching services:", err);
-                setLoading(false);
-            });
     }, []);
 
+    // Services are paged; the totals come from the category counters
+    const fetchServices = useCallback(
+        () => (selectedParent ? getServicesByParent(selectedParent) : getServices()),
+        [selectedParent]
+    );
+    const { items: services, loading, loadingMore, hasMore, loadMore } = usePagedList(fetchServices);
+    const totalServicesCount = hierarchy.reduce((total, parent) => total + parent.total_services, 0);
+
     const filterByParent = (parentSlug) => {
         setSelectedParent(parentSlug);
-        if (parentSlug) {
-            axios.get(`http://127.0.0.1:8000/api/services/items/by_parent_category/?parent=${parentSlug}`)
-                .then(res => setServices(res.data))
-                .catch(err => console.error(err));
-        } else {
-            axios.get('http://127.0.0.1:8000/api/services/items/')
-                .then(res => setServices(res.data))
-                .catch(err => console.error(err));
-        }
     };
 
     if (loading) return (
@@ -172,6 +158,7 @@ const ServicesPage = () => {
                         </div>
                     ))}
                 </div>
+                <LoadMore hasMore={hasMore} loading={loadingMore} onLoadMore={loadMore} />
 
                 {services.length === 0 && (
                     <div className="text-center py-16">
@@ -7,12 +7,83 @@ const api = axios.create({
     },
 });
 
-export const getAttractions = () => api.get('tourism/attractions/');
-export const getArtifacts = () => api.get('tourism/artifacts/');
-export const getServices = () => api.get('services/items/');
+// List endpoints are cursor-paginated: getters resolve to one page as
+// { data: [...], next }, and getNextPage(next) to the page after it (see
+// usePagedList). Only the offline bundle below holds the whole catalog.
+// Pass { fields: 'id,name,...' } to receive only the fields a page renders.
+export const getPage = async (url, params) => {
+    const res = await api.get(url, { params });
+    return { data: res.data.results, next: res.data.next };
+};
+export const getNextPage = (next) => getPage(next); // `next` already carries the query string
+
+// Sparse fieldsets for the card grids
+export const ATTRACTION_CARD_FIELDS = 'id,name,description,image,attraction_type,visit_duration_minutes,ticket_price';
+export const HOTEL_CARD_FIELDS = 'id,name,description,image,stars,price_range,booking_url,google_map_url';
+
+export const getAttractions = (params) => getPage('tourism/attractions/', params);
+export const getArtifacts = (params) => getPage('tourism/artifacts/', params);
+export const getTeamMembers = (params) => getPage('tourism/team/', params);
+export const getGovernorProfiles = () => getPage('tourism/governor/');
+export const getServices = (params) => getPage('services/items/', params);
+export const getServicesByParent = (parent, params) => getPage('services/items/by_parent_category/', { ...params, parent });
 export const getServiceCategories = () => api.get('services/categories/');
-export const getHotels = () => api.get('hospitality/hotels/');
+export const getServiceHierarchy = () => api.get('services/categories/hierarchy/');
+export const getHotels = (params) => getPage('hospitality/hotels/', params);
 export const generateItinerary = (data) => api.post('tourism/attractions/generate_plan/', data);
-export const getProducts = () => api.get('marketplace/products/');
+export const getProducts = (params) => getPage('marketplace/products/', params);
+export const getNearby = (params) => api.get('nearby/', { params });
+export const getMapTiles = (params) => api.get('map/tiles/', { params });
+export const searchCatalog = (q, params) => api.get('search/', { params: { ...params, q } });
+// Delta sync: pass the `token` from the previous response as `since`;
+// apply `deleted` ids first, then upsert `changes` by id ("full" means replace)
+export const getChanges = (since, params) => api.get('sync/', { params: { ...params, since } });
+
+// Offline bundle (manage.py build_offline_bundle): the manifest names one
+// content-hashed part per app; parts are columnar, rows are rebuilt here.
+const BUNDLE_URL = 'http://127.0.0.1:8000/media/offline/';
+export const getOfflineBundle = async () => {
+    const { data: manifest } = await axios.get(`${BUNDLE_URL}manifest.json`);
+    const parts = await Promise.all(
+        Object.values(manifest.parts).map((part) => axios.get(BUNDLE_URL + part.file))
+    );
+    const bundle = { version: manifest.version };
+    for (const { data } of parts) {
+        for (const [type, { count, columns }] of Object.entries(data)) {
+            const names = Object.keys(columns);
+            bundle[type] = Array.from({ length: count }, (_, i) =>
+                Object.fromEntries(names.map((name) => [name, columns[name][i]]))
+            );
+        }
+    }
+    return bundle;
+};
 
 export default api;
+
+// Resized copies from the image proxy (/img/<type>/<id>/<w>x<h>.webp). `v` is
+// a hash of the source URL (checked by the server, see images.source_version),
+// so a new image gets a new address and old ones can be cached forever. The
+// proxy only renders THUMBNAIL_SIZES: new sizes (1x and 2x) go there as well.
+const IMAGE_PROXY_URL = 'http://127.0.0.1:8000/img/';
+const hashUrl = (url) => {
+    let hash = 5381;
+    for (let i = 0; i < url.length; i++) {
+        hash = ((hash << 5) + hash + url.charCodeAt(i)) | 0;
+    }
+    return (hash >>> 0).toString(36);
+};
+export const thumbnailUrl = (type, item, width, height) =>
+    `${IMAGE_PROXY_URL}${type}/${item.id}/${width}x${height}.webp?v=${hashUrl(item.image)}`;
+export const thumbnailProps = (type, item, width, height) => ({
+    src: thumbnailUrl(type, item, width, height),
+    srcSet: `${thumbnailUrl(type, item, width * 2, height * 2)} 2x`,
+    loading: 'lazy',
+    // Fall back to the original if the proxy cannot serve it
+    onError: (event) => {
+        if (event.currentTarget.src !== item.image) {
+            event.currentTarget.removeAttribute('srcset');
+            event.currentTarget.src = item.image;
+        }
+    },
+});
@@ -0,0 +1,53 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { getNextPage } from './api';
+
+// A cursor-paginated list, one page at a time: `fetchFirst` calls a getter
+// from ./api (e.g. useCallback(() => getHotels(params), [params])) and
+// `loadMore` appends the next page. The list starts over when it changes.
+const usePagedList = (fetchFirst) => {
+    const [items, setItems] = useState([]);
+    // `next` link and the generation of the list it belongs to
+    const [next, setNext] = useState({ url: null, generation: 0 });
+    const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [error, setError] = useState(null);
+    // Responses for a list that has since started over are dropped; the old
+    // items stay on screen until the new first page arrives
+    const generation = useRef(0);
+
+    useEffect(() => {
+        const current = ++generation.current;
+        fetchFirst()
+            .then(res => {
+                if (current !== generation.current) return;
+                setItems(res.data);
+                setNext({ url: res.next, generation: current });
+                setError(null);
+            })
+            .catch(err => {
+                console.error("Error fetching list:", err);
+                if (current === generation.current) setError(err.message);
+            })
+            .finally(() => {
+                if (current === generation.current) setLoading(false);
+            });
+    }, [fetchFirst]);
+
+    const loadMore = useCallback(() => {
+        const current = generation.current;
+        if (!next.url || next.generation !== current || loadingMore) return;
+        setLoadingMore(true);
+        getNextPage(next.url)
+            .then(res => {
+                if (current !== generation.current) return;
+                setItems(previous => previous.concat(res.data));
+                setNext({ url: res.next, generation: current });
+            })
+            .catch(err => console.error("Error fetching the next page:", err))
+            .finally(() => setLoadingMore(false));
+    }, [next, loadingMore]);
+
+    return { items, loading, loadingMore, error, hasMore: Boolean(next.url), loadMore };
+};
+
+export default usePagedList;
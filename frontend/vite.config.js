@@ -11,6 +11,27 @@ export default defineConfig({
     VitePWA({
       registerType: 'autoUpdate',
       devOptions: { enabled: true },
+      workbox: {
+        runtimeCaching: [
+          {
+            // Content-hashed offline bundle parts never change
+            urlPattern: /\/media\/offline\/[a-z]+\.[0-9a-f]{12}\.json$/,
+            handler: 'CacheFirst',
+            options: { cacheName: 'offline-bundle', expiration: { maxEntries: 16 } }
+          },
+          {
+            urlPattern: /\/media\/offline\/manifest\.json$/,
+            handler: 'NetworkFirst',
+            options: { cacheName: 'offline-bundle-manifest' }
+          },
+          {
+            // Proxy thumbnails are versioned by their source URL (?v=)
+            urlPattern: /\/img\/[a-z]+\/\d+\/\d+x\d+\.webp\?v=/,
+            handler: 'CacheFirst',
+            options: { cacheName: 'thumbnails', expiration: { maxEntries: 300 } }
+          }
+        ]
+      },
       manifest: {
         name: "New Valley Hub",
         short_name: "NV Hub",
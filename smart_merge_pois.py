@@ -1,10 +1,7 @@
 import os
 import django
 import sys
-import json
 from pathlib import Path
-from decimal import Decimal
-from difflib import SequenceMatcher
 
 # Setup Django
 BASE_DIR = Path(__file__).resolve().parent / "backend"
@@ -12,10 +9,7 @@ sys.path.append(str(BASE_DIR))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'new_valley_hub.settings')
 django.setup()
 
-from tourism.models import Attraction
-from hospitality.models import Hotel
-from services.models import Service, ServiceCategory
-from marketplace.models import Product
+from core.merge import merge_dataset
 
 # JSON Dataset
 DATASET = [
@@ -272,210 +266,29 @@ DATASET = [
   }
 ]
 
-# Similarity threshold for name matching
-SIMILARITY_THRESHOLD = 0.8
-
-def similarity(a, b):
-    """Calculate similarity ratio between two strings"""
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-
-def find_matching_attraction(name_en):
-    """Find existing attraction by name similarity"""
-    attractions = Attraction.objects.all()
-    for attr in attractions:
-        if similarity(attr.name, name_en) >= SIMILARITY_THRESHOLD:
-            return attr
-    return None
-
-def find_matching_hotel(name_en):
-    """Find existing hotel by name similarity"""
-    hotels = Hotel.objects.all()
-    for hotel in hotels:
-        if similarity(hotel.name, name_en) >= SIMILARITY_THRESHOLD:
-            return hotel
-    return None
-
-def find_matching_service(name_en):
-    """Find existing service by name similarity"""
-    services = Service.objects.all()
-    for service in services:
-        if similarity(service.name, name_en) >= SIMILARITY_THRESHOLD:
-            return service
-    return None
-
-def map_category_to_attraction_type(category, sub_category):
-    """Map JSON category to our attraction_type"""
-    if "Heritage" in category or "Historical" in category:
-        return "historical"
-    elif "Nature" in category or "Safari" in category:
-        return "natural"
-    elif "Wellness" in category or "Culture" in category:
-        return "cultural"
-    return "cultural"
-
-def extract_star_rating(rating_str):
-    """Extract numeric star rating from string like '4 Stars'"""
-    if not rating_str:
-        return 3
-    try:
-        return int(rating_str.split()[0])
-    except:
-        return 3
-
-def get_price_range(rating):
-    """Map star rating to price range"""
-    if rating >= 4:
-        return "$$$"
-    elif rating >= 3:
-        return "$$"
-    return "$"
-
-def process_dataset():
-    """Smart merge process"""
-    stats = {
-        "new_attractions": 0,
-        "updated_attractions": 0,
-        "new_hotels": 0,
-        "updated_hotels": 0,
-        "new_services": 0,
-        "updated_services": 0,
-        "new_products": 0,
-        "skipped": 0
-    }
-
-    # Get or create service categories
-    restaurant_cat, _ = ServiceCategory.objects.get_or_create(name="Restaurant", defaults={"slug": "restaurant"})
-    hospital_cat, _ = ServiceCategory.objects.get_or_create(name="Hospital", defaults={"slug": "hospital"})
-    bank_cat, _ = ServiceCategory.objects.get_or_create(name="Bank", defaults={"slug": "bank"})
-
-    for item in DATASET:
-        category = item.get("category", "")
-        name_en = item.get("name_en", "")
-        name_ar = item.get("name_ar", "")
-        description = item.get("description", "")
-        location = item.get("location", "New Valley, Egypt")
-        notes = item.get("notes", "")
-
-        # Merge description and notes
-        full_description = f"{description} {notes}".strip()
-
-        try:
-            # ACCOMMODATION -> Hotel
-            if category == "Accommodation":
-                existing = find_matching_hotel(name_en)
-                
-                if existing:
-                    # Enrich existing
-                    if not existing.description or len(full_description) > len(existing.description):
-                        existing.description = full_description
-                    if not existing.phone_number and item.get("contact"):
-                        existing.phone_number = item["contact"]
-                    existing.save()
-                    stats["updated_hotels"] += 1
-                    print(f"✓ ENRICHED Hotel: {name_en}")
-                else:
-                    # Create new
-                    Hotel.objects.create(
-                        name=name_en,
-                        description=full_description,
-                        stars=extract_star_rating(item.get("rating", "3 Stars")),
-                        price_range=get_price_range(extract_star_rating(item.get("rating", "3 Stars"))),
-                        phone_number=item.get("contact", "+20 92 7XX XXXX"),
-                        booking_url="https://www.booking.com/searchresults.html?ss=New+Valley+Egypt",
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=location
-                    )
-                    stats["new_hotels"] += 1
-                    print(f"✓ NEW Hotel: {name_en}")
-
-            # HISTORICAL, NATURE, CULTURE, WELLNESS -> Attraction
-            elif category in ["Historical & Heritage", "Nature & Safari", "Culture & Museums", "Wellness"]:
-                existing = find_matching_attraction(name_en)
-                
-                if existing:
-                    # Enrich existing
-                    if not existing.description or len(full_description) > len(existing.description):
-                        existing.description = full_description
-                    existing.save()
-                    stats["updated_attractions"] += 1
-                    print(f"✓ ENRICHED Attraction: {name_en}")
-                else:
-                    # Create new
-                    Attraction.objects.create(
-                        name=name_en,
-                        description=full_description,
-                        attraction_type=map_category_to_attraction_type(category, item.get("sub_category", "")),
-                        visit_duration_minutes=90,
-                        opening_time="08:00",
-                        closing_time="17:00",
-                        ticket_price=0.00,
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=location
-                    )
-                    stats["new_attractions"] += 1
-                    print(f"✓ NEW Attraction: {name_en}")
-
-            # DINING, MEDICAL SERVICES, SERVICES -> Service
-            elif category in ["Dining", "Medical Services", "Services"]:
-                existing = find_matching_service(name_en)
-                
-                # Map to category
-                if "Dining" in category:
-                    cat = restaurant_cat
-                elif "Medical" in category:
-                    cat = hospital_cat
-                elif "Banking" in category:
-                    cat = bank_cat
-                else:
-                    cat = restaurant_cat
-
-                if existing:
-                    # Enrich existing
-                    if not existing.description or len(full_description) > len(existing.description):
-                        existing.description = full_description
-                    if not existing.phone_number and item.get("contact"):
-                        existing.phone_number = item["contact"]
-                    existing.save()
-                    stats["updated_services"] += 1
-                    print(f"✓ ENRICHED Service: {name_en}")
-                else:
-                    # Create new
-                    Service.objects.create(
-                        name=name_en,
-                        description=full_description,
-                        category=cat,
-                        is_emergency=("Hospital" in name_en or "Emergency" in name_en),
-                        phone_number=item.get("contact", "N/A"),
-                        latitude=25.4400,
-                        longitude=30.5500,
-                        address=item.get("address", location)
-                    )
-                    stats["new_services"] += 1
-                    print(f"✓ NEW Service: {name_en}")
-
-            # LOCAL INDUSTRY -> Product
-            elif category == "Local Industry":
-                Product.objects.create(
-                    name=name_en,
-                    description=full_description,
-                    price=Decimal("15.00"),
-                    seller_name="New Valley Artisans",
-                    seller_contact="+20 100 XXX XXXX"
-                )
-                stats["new_products"] += 1
-                print(f"✓ NEW Product: {name_en}")
+def process_dataset(dry_run=False):
+    """Smart merge process (trigram blocking + bulk writes, see core.merge)"""
+    result = merge_dataset(DATASET, dry_run=dry_run)
 
+    for doc_type in ("attraction", "hotel", "service", "product"):
+        for entry in result[doc_type]["report"]:
+            if entry["action"] == "create":
+                print(f"✓ NEW {doc_type.title()}: {entry['name']}")
             else:
-                stats["skipped"] += 1
-                print(f"⊘ SKIPPED (unknown category): {name_en}")
+                print(f"✓ ENRICHED {doc_type.title()}: {entry['name']} (matched '{entry['match']}')")
+    for name in result["skipped"]:
+        print(f"⊘ SKIPPED (unknown category): {name}")
 
-        except Exception as e:
-            print(f"✗ ERROR processing {name_en}: {e}")
-            stats["skipped"] += 1
-
-    return stats
+    return {
+        "new_attractions": result["attraction"]["created"],
+        "updated_attractions": result["attraction"]["updated"],
+        "new_hotels": result["hotel"]["created"],
+        "updated_hotels": result["hotel"]["updated"],
+        "new_services": result["service"]["created"],
+        "updated_services": result["service"]["updated"],
+        "new_products": result["product"]["created"],
+        "skipped": len(result["skipped"]),
+    }
 
 if __name__ == "__main__":
     print("=" * 70)
@@ -483,7 +296,7 @@ if __name__ == "__main__":
     print("=" * 70)
     print("\n🔄 Processing dataset with deduplication...\n")
 
-    stats = process_dataset()
+    stats = process_dataset(dry_run="--dry-run" in sys.argv)
 
     print("\n" + "=" * 70)
     print(" MERGE SUMMARY")